@@ -24,12 +24,20 @@ class MarketRegimeAgent:
         self,
         context: ToolContext,
         candles: pd.DataFrame,
+        higher_candles: Dict[str, pd.DataFrame] | None = None,
     ) -> Tuple[Dict[str, Dict[str, pd.DataFrame]], MarketRegime]:
-        """Возвращает словарь признаков по символам и режим."""
+        """Возвращает словарь признаков по символам и режим.
+
+        ``higher_candles`` — свечи старших таймфреймов символа; с ними словарь
+        признаков дополняется объединённым кадром (``joined_key``).
+        """
 
         start = time.perf_counter()
         feature_tool = self.registry.resolve("calc_features")
-        features = feature_tool.execute(context, candles=candles)
+        if higher_candles:
+            features = feature_tool.execute(context, candles=candles, higher_candles=higher_candles)
+        else:
+            features = feature_tool.execute(context, candles=candles)
         latency = time.perf_counter() - start
         self.telemetry.record_agent_tool("market_regime", "calc_features", 1, latency)
 
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Dict, Sequence
 import time
 
 import pandas as pd
@@ -15,6 +15,7 @@ from brain_orchestrator.agents.strategy_selection_agent import StrategySelection
 from brain_orchestrator.regimes import MarketRegime
 from brain_orchestrator.tools import ToolRegistry
 from brain_orchestrator.tools.base import ToolContext
+from prod_core.data.multi_timeframe import joined_key
 from prod_core.exec.portfolio import PortfolioController
 from prod_core.monitor.telemetry import TelemetryExporter
 from prod_core.persist import LatencyPayload, PersistDAO
@@ -60,6 +61,7 @@ class BrainOrchestrator:
         mode: str,
         symbol: str,
         timeframe: str,
+        higher_candles: Dict[str, pd.DataFrame] | None = None,
     ) -> None:
         # Получаем последнюю цену из свечей
         last_price = float(candles['close'].iloc[-1]) if not candles.empty else None
@@ -71,10 +73,13 @@ class BrainOrchestrator:
         )
 
         start = time.perf_counter()
-        features_map, regime = self.market_agent.run(tool_context, candles)
+        features_map, regime = self.market_agent.run(tool_context, candles, higher_candles)
         self._observe_latency("market_regime", start)
 
-        primary_features = features_map.get(symbol, {}).get(timeframe, pd.DataFrame())
+        symbol_features = features_map.get(symbol, {})
+        primary_features = symbol_features.get(timeframe, pd.DataFrame())
+        # со свечами старших таймфреймов стратегии видят объединённый кадр признаков
+        primary_features = symbol_features.get(joined_key(timeframe), primary_features)
 
         locked, reason = self._evaluate_daily_lock(state)
         self.telemetry.record_daily_lock(locked, reason)
@@ -109,6 +114,7 @@ class BrainOrchestrator:
         if candles.empty:
             return
         price = float(candles["close"].iloc[-1])
+        # признаки этого кадра уже посчитал calc_features (через общий кэш)
         for strategy in self.challengers:
             strategy_id = getattr(strategy, "shadow_id", strategy.name)
             signals = strategy.generate_signals(candles, features, regime)
@@ -2,10 +2,21 @@
 
 from __future__ import annotations
 
+import threading
+import weakref
 from enum import Enum, IntEnum
+from functools import partial
+from typing import Dict, Tuple
 
+import numpy as np
 import pandas as pd
 
+# пороги эвристики; общие для построчного и векторного расчёта
+PANIC_VOLATILITY = 0.04
+PANIC_RETURN = -0.02
+TREND_BAND = 0.001
+HIGH_VOLATILITY = 0.02
+
 
 class MarketRegime(IntEnum):
     """Коды рыночных режимов, используемые в телеметрии."""
@@ -18,11 +29,71 @@ class MarketRegime(IntEnum):
 
 
 class RegimeDetector:
-    """Простая эвристика определения режима."""
+    """Простая эвристика определения режима.
+
+    ``detect`` запоминает режим по версии признаков — самому объекту кадра: общий
+    ``FeatureCache`` на неизменных свечах отдаёт тот же DataFrame, а правка истории
+    даёт новый. Кадры признаков не изменяются на месте, поэтому повторный вызов с
+    тем же объектом возвращает запомненный режим без разбора строки.
+    """
+
+    def __init__(self) -> None:
+        # id(кадра) -> (слабая ссылка на кадр, режим)
+        self._labels: Dict[int, Tuple[weakref.ref, MarketRegime]] = {}
+        # RLock: колбэк слабой ссылки может сработать, пока блокировка уже взята
+        self._lock = threading.RLock()
+        self.cache_hits = 0
 
     def detect(self, features: pd.DataFrame) -> MarketRegime:
         """Возвращает текущий режим на основе последней строки признаков."""
 
+        key = id(features)
+        with self._lock:
+            entry = self._labels.get(key)
+            if entry is not None and entry[0]() is features:
+                self.cache_hits += 1
+                return entry[1]
+        regime = self._classify(features)
+        try:
+            ref = weakref.ref(features, partial(self._forget, key))
+        except TypeError:  # pragma: no cover - объект без слабых ссылок
+            return regime
+        with self._lock:
+            self._labels[key] = (ref, regime)
+        return regime
+
+    def detect_series(self, features: pd.DataFrame) -> pd.Series:
+        """
+        Режим на каждом баре кадра за один векторный проход.
+
+        Правила и пороги те же, что у ``detect``: значение ряда на баре ``i`` равно
+        ``detect(features.iloc[: i + 1])``. Ряд содержит коды ``MarketRegime``
+        (``int64``) с индексом ``features``.
+        """
+
+        ema_fast = self._column(features, "ema_fast")
+        ema_slow = self._column(features, "ema_slow")
+        volatility = self._column(features, "volatility")
+        returns = self._column(features, "return_lag")
+        codes = np.select(
+            [
+                (volatility > PANIC_VOLATILITY) & (returns < PANIC_RETURN),
+                ema_fast > ema_slow * (1 + TREND_BAND),
+                ema_fast < ema_slow * (1 - TREND_BAND),
+                volatility > HIGH_VOLATILITY,
+            ],
+            [
+                MarketRegime.PANIC.value,
+                MarketRegime.TREND_UP.value,
+                MarketRegime.TREND_DOWN.value,
+                MarketRegime.RANGE_HIGHVOL.value,
+            ],
+            default=MarketRegime.RANGE_LOWVOL.value,
+        )
+        return pd.Series(codes.astype(np.int64), index=features.index, name="regime")
+
+    @staticmethod
+    def _classify(features: pd.DataFrame) -> MarketRegime:
         if features.empty:
             return MarketRegime.RANGE_LOWVOL
         row = features.iloc[-1]
@@ -31,12 +102,24 @@ class RegimeDetector:
         volatility = float(row.get("volatility", 0.0))
         returns = float(row.get("return_lag", 0.0))
 
-        if volatility > 0.04 and returns < -0.02:
+        if volatility > PANIC_VOLATILITY and returns < PANIC_RETURN:
             return MarketRegime.PANIC
-        if ema_fast > ema_slow * 1.001:
+        if ema_fast > ema_slow * (1 + TREND_BAND):
             return MarketRegime.TREND_UP
-        if ema_fast < ema_slow * 0.999:
+        if ema_fast < ema_slow * (1 - TREND_BAND):
             return MarketRegime.TREND_DOWN
-        if volatility > 0.02:
+        if volatility > HIGH_VOLATILITY:
             return MarketRegime.RANGE_HIGHVOL
         return MarketRegime.RANGE_LOWVOL
+
+    @staticmethod
+    def _column(features: pd.DataFrame, name: str) -> np.ndarray:
+        if name not in features.columns:
+            return np.zeros(len(features))
+        return features[name].to_numpy(dtype=np.float64)
+
+    def _forget(self, key: int, _ref: weakref.ref | None = None) -> None:
+        with self._lock:
+            entry = self._labels.get(key)
+            if entry is not None and entry[0]() is None:
+                del self._labels[key]
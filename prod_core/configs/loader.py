@@ -85,6 +85,7 @@ class SymbolEntry(BaseModel):
     min_liquidity_usd: float = Field(gt=0)
     max_spread_pct: float = Field(gt=0, le=5)
     poll_interval_seconds: float = Field(gt=0, le=60)
+    aggregate_timeframes: bool = False
 
     @field_validator("primary_timeframe")
     @classmethod
@@ -136,6 +137,7 @@ class SymbolsConfig(BaseModel):
                     min_liquidity_usd=entry.min_liquidity_usd,
                     max_spread_pct=entry.max_spread_pct,
                     poll_interval_seconds=entry.poll_interval_seconds,
+                    aggregate_timeframes=entry.aggregate_timeframes,
                 )
             )
         return specs
@@ -1,6 +1,7 @@
 """Модули загрузки и подготовки рыночного фида."""
 
-from .feed import FeedHealthStatus, FeedIntegrityError, MarketDataFeed, SymbolFeedSpec
+from .events import BarClosedEvent, BarCloseSubscription
+from .feed import CandleView, FeedHealthStatus, FeedIntegrityError, MarketDataFeed, SymbolFeedSpec
 from .features import FeatureEngineer
 from .mock_feed import MockMarketDataFeed
 
@@ -8,6 +9,9 @@ __all__ = [
     "MarketDataFeed",
     "MockMarketDataFeed",
     "SymbolFeedSpec",
+    "CandleView",
+    "BarClosedEvent",
+    "BarCloseSubscription",
     "FeedIntegrityError",
     "FeedHealthStatus",
     "FeatureEngineer",
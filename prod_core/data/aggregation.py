@@ -0,0 +1,171 @@
+"""Агрегация свечей младшего таймфрейма в старшие (5m/15m/1h/4h из 1m).
+
+Бакеты выравниваются по эпохе UTC (как у бирж): бар 15m с меткой 10:15 включает
+минутные бары 10:15..10:29 и закрывается в 10:30. Один и тот же код используется
+живым фидом и оффлайн-исследованиями.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .timeframes import timeframe_to_milliseconds
+
+
+@dataclass(slots=True)
+class AggregatedBars:
+    """Результат агрегации: по одному элементу на бакет старшего таймфрейма."""
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    first_ts: np.ndarray
+    last_ts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def aligned_start(self) -> np.ndarray:
+        """Маска бакетов, в которых есть бар на открытии (бакет не обрезан слева)."""
+
+        return self.first_ts == self.ts
+
+    def closed(self, base_ms: int, bucket_ms: int) -> np.ndarray:
+        """Маска бакетов, в которых присутствует последний базовый бар."""
+
+        return self.last_ts + base_ms >= self.ts + bucket_ms
+
+    def select(self, mask: np.ndarray) -> AggregatedBars:
+        return AggregatedBars(
+            ts=self.ts[mask],
+            open=self.open[mask],
+            high=self.high[mask],
+            low=self.low[mask],
+            close=self.close[mask],
+            volume=self.volume[mask],
+            first_ts=self.first_ts[mask],
+            last_ts=self.last_ts[mask],
+        )
+
+
+def can_aggregate(base_timeframe: str, timeframe: str) -> bool:
+    """Можно ли собрать ``timeframe`` из баров ``base_timeframe``."""
+
+    base_ms = timeframe_to_milliseconds(base_timeframe)
+    target_ms = timeframe_to_milliseconds(timeframe)
+    return target_ms > base_ms and target_ms % base_ms == 0
+
+
+def derivable_timeframes(base_timeframe: str, timeframes: Iterable[str]) -> Tuple[str, ...]:
+    """Таймфреймы из списка, которые можно получить агрегацией базового."""
+
+    return tuple(tf for tf in timeframes if tf != base_timeframe and can_aggregate(base_timeframe, tf))
+
+
+def aggregate_ohlcv(
+    ts_ms: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    bucket_ms: int,
+) -> AggregatedBars:
+    """Сворачивает отсортированные по времени бары в бакеты длиной ``bucket_ms``."""
+
+    ts_ms = np.asarray(ts_ms, dtype=np.int64)
+    if len(ts_ms) == 0:
+        empty_ts = np.empty(0, dtype=np.int64)
+        empty = np.empty(0, dtype=np.float64)
+        return AggregatedBars(empty_ts, empty, empty, empty, empty, empty, empty_ts, empty_ts)
+
+    buckets = ts_ms - np.mod(ts_ms, bucket_ms)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(ts_ms))
+    return AggregatedBars(
+        ts=buckets[starts],
+        open=np.asarray(open_, dtype=np.float64)[starts],
+        high=np.maximum.reduceat(np.asarray(high, dtype=np.float64), starts),
+        low=np.minimum.reduceat(np.asarray(low, dtype=np.float64), starts),
+        close=np.asarray(close, dtype=np.float64)[ends - 1],
+        volume=np.add.reduceat(np.asarray(volume, dtype=np.float64), starts),
+        first_ts=ts_ms[starts],
+        last_ts=ts_ms[ends - 1],
+    )
+
+
+def aggregate_frame(
+    candles: pd.DataFrame,
+    timeframe: str,
+    *,
+    base_timeframe: str | None = None,
+    drop_partial: bool = True,
+) -> pd.DataFrame:
+    """Агрегирует DataFrame свечей (индекс — время открытия) в старший таймфрейм.
+
+    ``drop_partial`` отбрасывает бакеты, обрезанные на краях истории: первый — если
+    в нём нет бара на открытии, последний — если он ещё не закрыт.
+    """
+
+    columns = ["open", "high", "low", "close", "volume"]
+    if candles.empty:
+        return candles.reindex(columns=[c for c in candles.columns if c in columns or c == "funding_rate"])
+
+    index = pd.DatetimeIndex(candles.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    ts_ms = index.as_unit("ms").asi8
+    if base_timeframe is not None:
+        base_ms = timeframe_to_milliseconds(base_timeframe)
+    else:
+        diffs = np.diff(ts_ms)
+        base_ms = int(np.median(diffs)) if len(diffs) else timeframe_to_milliseconds(timeframe)
+    bucket_ms = timeframe_to_milliseconds(timeframe)
+    if bucket_ms % base_ms != 0 or bucket_ms < base_ms:
+        raise ValueError(f"Нельзя агрегировать бары {base_ms} мс в таймфрейм {timeframe}")
+
+    bars = aggregate_ohlcv(
+        ts_ms,
+        candles["open"].to_numpy(),
+        candles["high"].to_numpy(),
+        candles["low"].to_numpy(),
+        candles["close"].to_numpy(),
+        candles["volume"].to_numpy(),
+        bucket_ms,
+    )
+    data = {
+        "open": bars.open,
+        "high": bars.high,
+        "low": bars.low,
+        "close": bars.close,
+        "volume": bars.volume,
+    }
+    if "funding_rate" in candles.columns:
+        last_positions = np.searchsorted(ts_ms, bars.last_ts)
+        data["funding_rate"] = candles["funding_rate"].to_numpy(dtype=np.float64)[last_positions]
+    frame = pd.DataFrame(
+        data,
+        index=pd.DatetimeIndex(pd.to_datetime(bars.ts, unit="ms", utc=True), name=candles.index.name),
+    )
+    if drop_partial and len(frame):
+        keep = np.ones(len(frame), dtype=bool)
+        keep[0] = bool(bars.aligned_start()[0])
+        keep[-1] &= bool(bars.closed(base_ms, bucket_ms)[-1])
+        frame = frame.loc[keep]
+    return frame
+
+
+__all__ = [
+    "AggregatedBars",
+    "aggregate_frame",
+    "aggregate_ohlcv",
+    "can_aggregate",
+    "derivable_timeframes",
+]
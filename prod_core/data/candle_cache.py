@@ -0,0 +1,120 @@
+"""Дисковый кэш свечей для тёплого старта фида.
+
+Каждый ряд ``(биржа, символ, таймфрейм)`` хранится одним ``.npy``-файлом формы
+``(6, N)`` float64: timestamp в мс и OHLCV. Файл открывается через ``mmap`` и
+перезаписывается атомарно (``os.replace``), поэтому оборванная запись не портит кэш.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .timeframes import timeframe_to_milliseconds
+
+if TYPE_CHECKING:  # pragma: no cover - только для аннотаций
+    from .feed import CandleView
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, frozen=True)
+class CachedCandles:
+    """Непрерывный хвост ряда, прочитанный из кэша."""
+
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def last_timestamp_ms(self) -> int | None:
+        return int(self.ts[-1]) if len(self.ts) else None
+
+
+def _sanitize(part: str) -> str:
+    return part.replace("/", "_").replace(":", "_").replace("-", "_")
+
+
+class CandleCache:
+    """Хранит свечи на диске с разбиением по бирже, символу и таймфрейму."""
+
+    def __init__(self, root: str | Path = "storage/candles", exchange_id: str = "binanceusdm") -> None:
+        self.root = Path(root)
+        self.exchange_id = exchange_id
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        return self.root / _sanitize(self.exchange_id) / _sanitize(symbol) / f"{timeframe}.npy"
+
+    def load(self, symbol: str, timeframe: str) -> CachedCandles | None:
+        """Читает ряд из кэша; возвращает последний непрерывный участок без дубликатов."""
+
+        path = self.path(symbol, timeframe)
+        if not path.exists():
+            return None
+        try:
+            data = np.load(path, mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError) as exc:
+            logger.warning("Кэш свечей %s повреждён (%s) — игнорируем.", path, exc)
+            return None
+        if data.ndim != 2 or data.shape[0] != 6 or data.dtype != np.float64:
+            logger.warning("Кэш свечей %s имеет неожиданную форму %s — игнорируем.", path, data.shape)
+            return None
+
+        ts = data[0].astype(np.int64)
+        if len(ts) == 0:
+            return None
+        steps = np.diff(ts)
+        if np.any(steps <= 0):
+            logger.warning("Кэш свечей %s не упорядочен или содержит дубликаты — игнорируем.", path)
+            return None
+        breaks = np.flatnonzero(steps != timeframe_to_milliseconds(timeframe))
+        start = int(breaks[-1]) + 1 if len(breaks) else 0
+        if start:
+            logger.warning(
+                "Кэш свечей %s содержит %s разрыв(ов) — используем хвост из %s баров.",
+                path,
+                len(breaks),
+                len(ts) - start,
+            )
+        return CachedCandles(
+            ts=ts[start:],
+            open=data[1, start:],
+            high=data[2, start:],
+            low=data[3, start:],
+            close=data[4, start:],
+            volume=data[5, start:],
+        )
+
+    @staticmethod
+    def pack(view: CandleView) -> np.ndarray:
+        """Копирует срез буфера в массив формата кэша."""
+
+        return np.vstack(
+            (view.ts.astype(np.float64), view.open, view.high, view.low, view.close, view.volume)
+        )
+
+    def write(self, symbol: str, timeframe: str, data: np.ndarray) -> Path:
+        """Атомарно записывает подготовленный ``pack`` массив."""
+
+        path = self.path(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.tmp.npy")
+        np.save(tmp_path, np.ascontiguousarray(data, dtype=np.float64), allow_pickle=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def save(self, view: CandleView) -> Path:
+        return self.write(view.symbol, view.timeframe, self.pack(view))
+
+
+__all__ = ["CachedCandles", "CandleCache"]
@@ -0,0 +1,143 @@
+"""Компактное хранение свечей и признаков: ``float32`` и категориальные метаданные.
+
+Режим опциональный и рассчитан на исследовательские прогоны, которым нужно держать в
+памяти годы 1m-истории по сотням символов. Боевой цикл по умолчанию работает в
+``float64``.
+
+Граница погрешности ``float32``. Значение ``x`` в нормальном диапазоне float32
+(``1.2e-38 ≤ |x| ≤ 3.4e38``) хранится с округлением к ближайшему, поэтому
+``|x32 − x| ≤ 2⁻²⁴·|x|`` (``FLOAT32_RELATIVE_ERROR`` ≈ 6e-8). Для цены 100 000 это
+≤ 0.006, то есть меньше тика любой ликвидной пары. Признаки, посчитанные в
+``float64`` по таким свечам:
+
+* EMA, ATR, каналы — выпуклые комбинации и средние входов, относительная
+  погрешность та же, ≤ 2⁻²⁴;
+* доходности ``x₁/x₀ − 1`` теряют относительную точность на вычитании; абсолютная
+  погрешность ≤ 2·2⁻²⁴ ≈ 1.2e-7 (для минутной доходности 1e-3 это ~1e-4 относительно),
+  скользящее std доходностей наследует ту же абсолютную границу.
+
+Сохранение готовых признаков в ``float32`` добавляет ещё ≤ 2⁻²⁴ относительной
+погрешности. Колонки, значения которых выходят за диапазон float32, остаются
+``float64``. Фактическую погрешность кадра показывает ``max_relative_error``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# единичная ошибка округления float32 (round-to-nearest)
+FLOAT32_RELATIVE_ERROR = 2.0**-24
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def compact_frame(frame: pd.DataFrame, *, categorical_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Копия кадра с ``float32`` вместо ``float64`` и категориями вместо строк.
+
+    Строковая колонка становится категориальной, если уникальных значений не больше
+    ``categorical_ratio`` от числа строк: константные ``tf``/``symbol`` хранятся один
+    раз, на строку остаётся байтовый код.
+    """
+
+    columns: Dict[str, object] = {}
+    for column in frame.columns:
+        series = frame[column]
+        if series.dtype == np.float64:
+            values = series.to_numpy()
+            finite = values[np.isfinite(values)]
+            if finite.size == 0 or np.abs(finite).max() <= _FLOAT32_MAX:
+                series = series.astype(np.float32)
+        elif series.dtype == object:
+            unique = series.nunique(dropna=False)
+            if unique <= max(1, categorical_ratio * len(series)):
+                series = series.astype("category")
+        columns[column] = series
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def restore_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Обратное преобразование: ``float64`` и строковые колонки вместо категорий."""
+
+    columns: Dict[str, object] = {}
+    for column in frame.columns:
+        series = frame[column]
+        if series.dtype == np.float32:
+            series = series.astype(np.float64)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        columns[column] = series
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def max_relative_error(original: pd.DataFrame, compact: pd.DataFrame) -> float:
+    """Наибольшая относительная погрешность числовых колонок ``compact`` против ``original``."""
+
+    worst = 0.0
+    for column in original.columns:
+        if original[column].dtype.kind != "f" or column not in compact.columns:
+            continue
+        exact = original[column].to_numpy(dtype=np.float64)
+        stored = compact[column].to_numpy(dtype=np.float64)
+        mask = np.isfinite(exact) & (exact != 0)
+        if mask.any():
+            error = np.abs(stored[mask] - exact[mask]) / np.abs(exact[mask])
+            worst = max(worst, float(error.max()))
+    return worst
+
+
+def frame_memory(frame: pd.DataFrame) -> int:
+    """Полный объём кадра в байтах, включая строки object-колонок и индекс."""
+
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(frames: Dict[str, Dict[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Память по (symbol, timeframe) в исходном и компактном виде.
+
+    ``frames`` — ``{symbol: {timeframe: DataFrame}}`` (свечи, признаки или кадры
+    бэктеста). Колонка ``max_rel_error`` — фактическая погрешность ``compact_frame``.
+    """
+
+    rows: List[Dict[str, object]] = []
+    for symbol, per_timeframe in frames.items():
+        for timeframe, frame in per_timeframe.items():
+            compact = compact_frame(frame)
+            original_bytes = frame_memory(frame)
+            compact_bytes = frame_memory(compact)
+            rows.append(
+                {
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "rows": len(frame),
+                    "bytes": original_bytes,
+                    "compact_bytes": compact_bytes,
+                    "bytes_per_row": compact_bytes / max(len(frame), 1),
+                    "ratio": compact_bytes / max(original_bytes, 1),
+                    "max_rel_error": max_relative_error(frame, compact),
+                }
+            )
+    columns = [
+        "symbol",
+        "timeframe",
+        "rows",
+        "bytes",
+        "compact_bytes",
+        "bytes_per_row",
+        "ratio",
+        "max_rel_error",
+    ]
+    return pd.DataFrame(rows, columns=columns)
+
+
+__all__ = [
+    "FLOAT32_RELATIVE_ERROR",
+    "compact_frame",
+    "frame_memory",
+    "max_relative_error",
+    "memory_report",
+    "restore_frame",
+]
@@ -0,0 +1,131 @@
+"""События закрытия баров и шина их доставки подписчикам."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+
+@dataclass(slots=True, frozen=True)
+class BarClosedEvent:
+    """Бар ``open_ts_ms`` закрылся: в буфере появился следующий бар."""
+
+    symbol: str
+    timeframe: str
+    open_ts_ms: int
+    close_ts_ms: int
+    detected_at: float
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.symbol, self.timeframe)
+
+
+class BarCloseSubscription:
+    """Асинхронный поток событий закрытия баров для одного подписчика.
+
+    Очередь ограничена: если потребитель не успевает, самые старые события
+    отбрасываются — актуальное состояние всегда доступно в буфере фида.
+    """
+
+    def __init__(
+        self,
+        bus: BarCloseBus,
+        keys: Iterable[Tuple[str, str]] | None,
+        maxsize: int,
+    ) -> None:
+        self._bus = bus
+        self.keys = frozenset(keys) if keys is not None else None
+        self._queue: asyncio.Queue[BarClosedEvent | None] = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+        self.dropped = 0
+
+    def wants(self, event: BarClosedEvent) -> bool:
+        return self.keys is None or event.key in self.keys
+
+    def offer(self, item: BarClosedEvent | None) -> None:
+        """Кладёт событие в очередь без ожидания (``None`` — конец потока)."""
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()
+            self.dropped += 1
+            self._queue.put_nowait(item)
+
+    async def get(self, *, timeout: float | None = None) -> BarClosedEvent | None:
+        """Ждёт следующее событие; ``None`` при таймауте или закрытии потока."""
+
+        if self.closed:
+            return None
+        try:
+            item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if item is None:
+            self.closed = True
+        return item
+
+    def drain(self) -> List[BarClosedEvent]:
+        """Забирает все накопившиеся события без ожидания."""
+
+        events: List[BarClosedEvent] = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is None:
+                self.closed = True
+                break
+            events.append(item)
+        return events
+
+    def close(self) -> None:
+        """Отписывается от шины."""
+
+        self._bus.unsubscribe(self)
+        self.closed = True
+
+    def __aiter__(self) -> BarCloseSubscription:
+        return self
+
+    async def __anext__(self) -> BarClosedEvent:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class BarCloseBus:
+    """Раздаёт события закрытия баров всем подписчикам фида."""
+
+    def __init__(self) -> None:
+        self._subscribers: List[BarCloseSubscription] = []
+
+    def subscribe(
+        self,
+        keys: Iterable[Tuple[str, str]] | None = None,
+        *,
+        maxsize: int = 1024,
+    ) -> BarCloseSubscription:
+        subscription = BarCloseSubscription(self, keys, maxsize=maxsize)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: BarCloseSubscription) -> None:
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def publish(self, event: BarClosedEvent) -> None:
+        for subscription in self._subscribers:
+            if subscription.wants(event):
+                subscription.offer(event)
+
+    def close(self) -> None:
+        """Завершает все потоки подписчиков."""
+
+        for subscription in self._subscribers:
+            subscription.offer(None)
+        self._subscribers.clear()
+
+
+__all__ = ["BarClosedEvent", "BarCloseBus", "BarCloseSubscription"]
@@ -0,0 +1,226 @@
+"""Общий кэш признаков для оркестратора, shadow-челленджеров и бэктестов.
+
+Одни и те же свечи проходят через ``FeatureEngineer`` несколько раз: в
+``MarketRegimeAgent`` на каждом цикле, в shadow-режиме и в бэктестах кандидатов с
+общим символом/таймфреймом. ``FeatureCache`` хранит готовые DataFrame признаков по
+ключу (symbol, timeframe, версия свечей, хэш ``FeatureConfig``) и вытесняет записи
+по LRU при превышении лимита записей или байтов.
+
+Версия свечей считается за O(1): длина кадра, метки первого и последнего бара и
+значения последнего закрытого бара. Признаки сдвинуты на бар, поэтому тики
+формирующейся свечи ключ не меняют, а новый бар, досыпанный разрыв (сдвигает длину
+или первый бар кольцевого буфера) и правка последнего закрытого бара — меняют.
+Правки более старых баров ключ не отслеживает; вызывающий код с версией буфера
+(``CandleView.version``) передаёт её через ``version``.
+
+Промах кэша — единственное место, где признаки считаются заново, поэтому здесь же
+подключается выборочная проверка look-ahead (``LookaheadVerifier``): её бюджет
+отсчитывается от времени построения.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from .features import FeatureConfig
+from .lookahead import LookaheadVerifier
+
+logger = logging.getLogger(__name__)
+
+# колонки, от которых зависят признаки FeatureEngineer
+_VERSION_COLUMNS = ("high", "low", "close", "funding_rate")
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureCacheKey:
+    """Ключ записи кэша признаков."""
+
+    symbol: str
+    timeframe: str
+    version: Hashable
+    config_hash: str
+
+
+def config_fingerprint(config: FeatureConfig | None) -> str:
+    """Стабильный хэш параметров ``FeatureConfig``."""
+
+    payload = json.dumps(asdict(config or FeatureConfig()), sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+def candles_version(candles: pd.DataFrame) -> Hashable:
+    """Версия кадра свечей: (длина, первый бар, последний бар, последний закрытый бар)."""
+
+    if candles.empty:
+        return (0, None, None, b"")
+    index = candles.index
+    closed = b""
+    if len(candles) > 1:
+        # байты, а не float: NaN в кортеже ключа не равен сам себе
+        values = [candles[column].iat[-2] for column in _VERSION_COLUMNS if column in candles]
+        closed = np.asarray(values, dtype=np.float64).tobytes()
+    return (len(candles), index[0], index[-1], closed)
+
+
+def frame_nbytes(frame: pd.DataFrame) -> int:
+    """Объём DataFrame в байтах (данные и индекс, без глубокого обхода object)."""
+
+    return int(frame.memory_usage(index=True, deep=False).sum())
+
+
+class FeatureCache:
+    """LRU-кэш DataFrame признаков с лимитом по числу записей и по байтам."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 256 * 1024 * 1024,
+        *,
+        on_metrics: Callable[[str, bool, int], None] | None = None,
+        verifier: LookaheadVerifier | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (потребитель, попадание, текущий объём кэша в байтах)
+        self.on_metrics = on_metrics
+        self.verifier = verifier
+        self._entries: OrderedDict[FeatureCacheKey, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        config: FeatureConfig | None = None,
+        version: Hashable | None = None,
+    ) -> FeatureCacheKey:
+        """Ключ для кадра свечей; ``version`` (например, версия буфера) заменяет дайджест."""
+
+        return FeatureCacheKey(
+            symbol=symbol,
+            timeframe=timeframe,
+            version=candles_version(candles) if version is None else version,
+            config_hash=config_fingerprint(config),
+        )
+
+    def get(self, key: FeatureCacheKey) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: FeatureCacheKey, features: pd.DataFrame) -> None:
+        size = frame_nbytes(features)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (features, size)
+            self.bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_build(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        build: Callable[[], pd.DataFrame],
+        *,
+        config: FeatureConfig | None = None,
+        version: Hashable | None = None,
+        consumer: str = "default",
+    ) -> pd.DataFrame:
+        """Возвращает признаки из кэша или строит их через ``build`` и сохраняет.
+
+        Результат разделяется между потребителями и не должен изменяться на месте.
+        """
+
+        key = self.key(symbol, timeframe, candles, config=config, version=version)
+        features = self.get(key)
+        hit = features is not None
+        if features is None:
+            started = time.perf_counter()
+            features = build()
+            elapsed = time.perf_counter() - started
+            self.put(key, features)
+            if self.verifier is not None:
+                self.verifier.observe(symbol, timeframe, candles, features, elapsed, config=config)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._report(consumer, hit)
+        return features
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _report(self, consumer: str, hit: bool) -> None:
+        if self.on_metrics is None:
+            return
+        try:
+            self.on_metrics(consumer, hit, self.bytes)
+        except Exception:  # pragma: no cover - обработка пользовательского хука
+            logger.exception("on_metrics кэша признаков вызвал исключение")
+
+
+_CACHE: FeatureCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_feature_cache() -> FeatureCache:
+    """Возвращает общий кэш признаков процесса (создаётся при первом обращении)."""
+
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = FeatureCache()
+        return _CACHE
+
+
+def register_feature_cache(cache: FeatureCache) -> None:
+    """Подменяет общий кэш (конфигурация раннера или тесты)."""
+
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = cache
+
+
+__all__ = [
+    "FeatureCache",
+    "FeatureCacheKey",
+    "candles_version",
+    "config_fingerprint",
+    "get_feature_cache",
+    "register_feature_cache",
+]
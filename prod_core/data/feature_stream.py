@@ -0,0 +1,382 @@
+"""Потоковый (инкрементальный) расчёт признаков ``FeatureEngineer``.
+
+``FeatureEngineer.build`` на каждом цикле пересчитывает EMA, ATR, pct_change и
+скользящее std по всей истории буфера. ``FeatureStream`` держит бегущее состояние
+этих индикаторов для одной пары (symbol, timeframe) и продвигает его только на
+новые закрытые бары — O(1) на бар.
+
+Ядра повторяют онлайн-алгоритмы pandas (``ewm(adjust=False)``, ``rolling().mean()``
+с суммированием Кахана, ``rolling().var()`` по Уэлфорду с компенсацией), включая
+порядок операций с плавающей точкой, поэтому результат побитово совпадает с
+``build()`` на той же истории (от первого бара, увиденного потоком).
+
+Признаки бара ``t`` зависят только от баров ``≤ t-1``: последний бар кадра (он может
+ещё формироваться) в состояние не попадает, его признаки берутся из состояния после
+предпоследнего бара — тот же сдвиг на один бар, что и в ``build()``.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:  # pragma: no cover - только для аннотаций
+    from .features import FeatureConfig
+
+FEATURE_COLUMNS: tuple[str, ...] = ("ema_fast", "ema_slow", "atr", "return_lag", "volatility")
+
+
+class _EwmState:
+    """``Series.ewm(span, adjust=False).mean()`` по одному значению."""
+
+    __slots__ = ("factor", "new_wt", "nobs", "old_wt", "started", "weighted")
+
+    def __init__(self, span: int) -> None:
+        alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.factor = 1.0 - alpha
+        self.new_wt = alpha
+        self.started = False
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def push(self, value: float) -> float:
+        if not self.started:
+            self.started = True
+            self.weighted = value
+            self.nobs = int(not math.isnan(value))
+            self.old_wt = 1.0
+        else:
+            observed = not math.isnan(value)
+            self.nobs += observed
+            if not math.isnan(self.weighted):
+                self.old_wt *= self.factor
+                if observed:
+                    # как в pandas: константный ряд не накапливает ошибку округления
+                    if self.weighted != value:
+                        weighted = self.old_wt * self.weighted + self.new_wt * value
+                        self.weighted = weighted / (self.old_wt + self.new_wt)
+                    self.old_wt = 1.0
+            elif observed:
+                self.weighted = value
+        return self.weighted if self.nobs >= 1 else math.nan
+
+
+class _RollingMeanState:
+    """``Series.rolling(window, min_periods).mean()`` по одному значению."""
+
+    __slots__ = (
+        "comp_add",
+        "comp_remove",
+        "count",
+        "min_periods",
+        "neg",
+        "nobs",
+        "prev",
+        "same",
+        "sum",
+        "values",
+        "window",
+    )
+
+    def __init__(self, window: int, min_periods: int) -> None:
+        self.window = window
+        self.min_periods = min_periods
+        self.values: Deque[float] = deque()
+        self.count = 0
+        self._reset(math.nan)
+
+    def _reset(self, first: float) -> None:
+        self.sum = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.nobs = 0
+        self.neg = 0
+        self.same = 0
+        self.prev = first
+
+    def push(self, value: float) -> float:
+        if self.count == 0 or self.window <= 1:
+            self._reset(value)
+        elif len(self.values) == self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                t = self.sum + y
+                self.comp_remove = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg -= 1
+        self.values.append(value)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        self.count += 1
+        if not math.isnan(value):
+            self.nobs += 1
+            y = value - self.comp_add
+            t = self.sum + y
+            self.comp_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, value) < 0:
+                self.neg += 1
+            self.same = self.same + 1 if value == self.prev else 1
+            self.prev = value
+
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return math.nan
+        result = self.sum / self.nobs
+        if self.same >= self.nobs:
+            return self.prev
+        if self.neg == 0 and result < 0:
+            return 0.0
+        if self.neg == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _RollingVarState:
+    """``Series.rolling(window).var(ddof=1)`` по одному значению (Уэлфорд + Кахан)."""
+
+    __slots__ = (
+        "comp_add",
+        "comp_remove",
+        "count",
+        "mean",
+        "min_periods",
+        "nobs",
+        "prev",
+        "same",
+        "ssqdm",
+        "values",
+        "window",
+    )
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.min_periods = max(window, 1)
+        self.values: Deque[float] = deque()
+        self.count = 0
+        self._reset(math.nan)
+
+    def _reset(self, first: float) -> None:
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.nobs = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev = first
+
+    def push(self, value: float) -> float:
+        if self.count == 0 or self.window <= 1:
+            self._reset(value)
+        elif len(self.values) == self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.comp_remove
+                    y = old - self.comp_remove
+                    t = y - self.mean
+                    self.comp_remove = t + self.mean - y
+                    self.mean = self.mean - t / self.nobs
+                    self.ssqdm = self.ssqdm - (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+        self.values.append(value)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        self.count += 1
+        if not math.isnan(value):
+            self.nobs += 1
+            self.same = self.same + 1 if value == self.prev else 1
+            self.prev = value
+            prev_mean = self.mean - self.comp_add
+            y = value - self.comp_add
+            t = y - self.mean
+            self.comp_add = t + self.mean - y
+            self.mean = self.mean + t / self.nobs
+            self.ssqdm = self.ssqdm + (value - prev_mean) * (value - self.mean)
+
+        if self.nobs < self.min_periods or self.nobs <= 1:
+            return math.nan
+        if self.same >= self.nobs:
+            return 0.0
+        return self.ssqdm / (self.nobs - 1.0)
+
+
+class FeatureStream:
+    """Бегущее состояние признаков одной пары (symbol, timeframe).
+
+    Состояние привязано к первому увиденному бару. Признаки учтённых баров лежат в
+    преаллоцированном массиве, как в ``CandleBuffer``: живое окно ``[start, stop)``
+    непрерывно, следующий за ним слот хранит признаки ещё не учтённого бара, а при
+    упоре в конец окно переносится в новый массив вдвое больше окна (амортизированно
+    O(1)). Записанные слоты не меняются, поэтому ``update`` отдаёт признаки
+    представлением массива без копии (только для чтения).
+
+    Пока кадр только дописывается справа (и обрезается слева кольцевым буфером),
+    ``update`` обрабатывает лишь новые закрытые бары, а непрерывность проверяет по
+    последнему учтённому бару и числу баров до него. Если последний учтённый бар
+    изменился, появились более ранние бары или кадр стал короче, поток
+    пересобирается с начала кадра (``rebuilds``); правки более старых баров не
+    отслеживаются — после них состояние сбрасывается ``FeatureEngineer.reset_streams``.
+    """
+
+    def __init__(self, config: FeatureConfig) -> None:
+        self.config = config
+        self.rebuilds = 0
+        self.bars_consumed = 0
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        cfg = self.config
+        self._ema_fast = _EwmState(cfg.ema_fast)
+        self._ema_slow = _EwmState(cfg.ema_slow)
+        self._atr = _RollingMeanState(cfg.atr_period, 1)
+        self._volatility = _RollingVarState(cfg.volatility_window)
+        self._closes: Deque[float] = deque(maxlen=max(cfg.returns_lag, 1) + 1)
+        self._prev_close = math.nan
+        # метки учтённых баров и признаки каждого бара; слот ``stop`` — признаки
+        # следующего (ещё не учтённого) бара
+        capacity = max(2 * capacity, 16)
+        self._ts: np.ndarray = np.empty(capacity, dtype=np.int64)
+        self._out: np.ndarray = np.empty((capacity, len(FEATURE_COLUMNS)), dtype=np.float64)
+        self._out[0] = (math.nan, math.nan, math.nan, 0.0, 0.0)
+        self._start = 0
+        self._stop = 0
+        # первый бар потока: только у него EMA/ATR не определены
+        self._origin = 0
+        # (high, low, close) последнего учтённого бара
+        self._last: Tuple[float, float, float] = (math.nan, math.nan, math.nan)
+
+    def update(self, candles: pd.DataFrame) -> pd.DataFrame | None:
+        """Продвигает состояние по кадру и возвращает признаки как ``build()``.
+
+        ``None`` — кадр не подходит для потокового режима (не ``DatetimeIndex``,
+        неупорядоченные метки или нечисловые значения); вызывающий код считает
+        признаки полным ``build()``.
+        """
+
+        index = candles.index
+        if candles.empty or not isinstance(index, pd.DatetimeIndex):
+            return None
+        if not index.is_monotonic_increasing:
+            return None
+        ts = index.asi8
+        columns = [
+            candles["high"].to_numpy(dtype=np.float64),
+            candles["low"].to_numpy(dtype=np.float64),
+            candles["close"].to_numpy(dtype=np.float64),
+        ]
+        first = self._align(ts, columns)
+        if first is None:
+            self.rebuilds += 1
+            self._reset(len(ts))
+            first = 0
+        else:
+            self._start = first
+
+        consumed = self._stop - self._start
+        closed = max(len(ts) - 1, consumed)
+        new_raw = np.vstack([column[consumed:closed] for column in columns])
+        if not np.isfinite(new_raw).all():
+            self._reset(0)
+            return None
+        if new_raw.shape[1]:
+            self._reserve(new_raw.shape[1])
+            self._advance(new_raw)
+            self._ts[self._stop - new_raw.shape[1] : self._stop] = ts[consumed:closed]
+        return self._frame(candles)
+
+    def _align(self, ts: np.ndarray, columns: List[np.ndarray]) -> int | None:
+        """Слот первого бара кадра в окне или ``None``, если нужен пересчёт.
+
+        Сверяются последний учтённый бар (метка и значения) и число баров от начала
+        кадра до него — O(log n) без сравнения всей истории.
+        """
+
+        start, stop = self._start, self._stop
+        if stop == start:
+            return start
+        last_ts = self._ts[stop - 1]
+        position = int(np.searchsorted(ts, last_ts))
+        # последний учтённый бар должен остаться закрытым баром кадра
+        if position >= len(ts) - 1 or ts[position] != last_ts:
+            return None
+        values = (columns[0][position], columns[1][position], columns[2][position])
+        if values != self._last:
+            return None
+        first = start + int(np.searchsorted(self._ts[start:stop], ts[0]))
+        if first >= stop or self._ts[first] != ts[0] or stop - 1 - first != position:
+            return None
+        return first
+
+    def _reserve(self, count: int) -> None:
+        """Освобождает место под ``count`` баров и слот признаков следующего бара."""
+
+        if self._stop + count < len(self._ts):
+            return
+        start, stop = self._start, self._stop
+        size = stop - start
+        capacity = max(2 * (size + count + 1), 16)
+        # новый массив, а не сдвиг на месте: ранее отданные представления не меняются
+        ts = np.empty(capacity, dtype=np.int64)
+        out = np.empty((capacity, len(FEATURE_COLUMNS)), dtype=np.float64)
+        ts[:size] = self._ts[start:stop]
+        out[: size + 1] = self._out[start : stop + 1]
+        self._ts, self._out = ts, out
+        self._origin -= start
+        self._start, self._stop = 0, size
+
+    def _advance(self, raw: np.ndarray) -> None:
+        """Учитывает новые бары: признаки бара ``j`` пишутся в слот ``stop + j``."""
+
+        lag = self.config.returns_lag
+        closes = self._closes
+        out = self._out
+        slot = self._stop
+        for high, low, close in raw.T.tolist():
+            prev_close = self._prev_close
+            if math.isnan(prev_close):
+                true_range = high - low
+            else:
+                true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            closes.append(close)
+            return_lag = close / closes[-1 - lag] - 1 if len(closes) > lag else 0.0
+            variance = self._volatility.push(close / prev_close - 1)
+            slot += 1
+            out[slot] = (
+                self._ema_fast.push(close),
+                self._ema_slow.push(close),
+                self._atr.push(true_range),
+                return_lag,
+                # std = sqrt(var); NaN прогрева и отрицательный шум дают 0, как fillna(0)
+                math.sqrt(variance) if variance > 0 else 0.0,
+            )
+            self._prev_close = close
+            self._last = (high, low, close)
+        self._stop = slot
+        self.bars_consumed += raw.shape[1]
+
+    def _frame(self, candles: pd.DataFrame) -> pd.DataFrame:
+        values = self._out[self._start : self._stop + 1].view()
+        values.flags.writeable = False
+        features = pd.DataFrame(
+            values, index=candles.index, columns=list(FEATURE_COLUMNS), copy=False
+        )
+        if "funding_rate" in candles.columns:
+            features["funding_rate"] = candles["funding_rate"].astype(float).shift(1).fillna(0.0)
+        # dropna() из build(): пропуски бывают только в EMA/ATR первого бара потока
+        if self._start == self._origin:
+            return features.iloc[1:]
+        return features
+
+
+__all__ = ["FEATURE_COLUMNS", "FeatureStream"]
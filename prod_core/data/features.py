@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Final
+from dataclasses import astuple, dataclass, fields
+from typing import Callable, Dict, Final, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
 
-from prod_core.indicators import TechnicalIndicators
+from prod_core.indicators import TechnicalIndicators, kernels
+
+from .feature_stream import FeatureStream
 
 
 @dataclass(slots=True)
@@ -31,8 +34,17 @@ class FeatureEngineer:
         "volatility",
     )
 
-    def __init__(self, indicators: TechnicalIndicators | None = None) -> None:
+    def __init__(
+        self,
+        indicators: TechnicalIndicators | None = None,
+        *,
+        streaming: bool = False,
+    ) -> None:
         self._indicators = indicators or TechnicalIndicators()
+        # Потоковый режим повторяет формулы базового TechnicalIndicators; с
+        # переопределёнными индикаторами признаки всегда считаются через build().
+        self.streaming = streaming and type(self._indicators) is TechnicalIndicators
+        self._streams: Dict[Tuple[str, str], FeatureStream] = {}
 
     def build(self, candles: pd.DataFrame, config: FeatureConfig | None = None) -> pd.DataFrame:
         """
@@ -73,21 +85,261 @@ class FeatureEngineer:
         features = features.dropna()
         return features
 
+    def update(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        config: FeatureConfig | None = None,
+    ) -> pd.DataFrame:
+        """
+        Потоковый аналог ``build``: продвигает состояние (symbol, timeframe) только
+        на новые закрытые бары.
+
+        Результат побитово совпадает с ``build()`` на истории, начиная с первого
+        бара, переданного потоку; при правке уже учтённых баров поток пересобирается.
+        """
+
+        cfg = config or FeatureConfig()
+        key = (symbol, timeframe)
+        stream = self._streams.get(key)
+        if stream is None or stream.config != cfg:
+            stream = FeatureStream(cfg)
+            self._streams[key] = stream
+        features = stream.update(candles)
+        if features is None:
+            self._streams.pop(key, None)
+            return self.build(candles, config=cfg)
+        return features
+
+    def reset_streams(self) -> None:
+        """Сбрасывает состояние потокового режима для всех пар."""
+
+        self._streams.clear()
+
+    def build_panel(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        config: FeatureConfig | None = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Признаки для набора символов одного таймфрейма за один проход по панели.
+
+        Символы с одинаковым индексом складываются в матрицы «бары × символы», и
+        каждый признак считается по столбцам одним вызовом ядра. Результат по символу —
+        срез общей панели, побитово равный ``build()``; символы с отличающимся
+        индексом или пропусками в ценах считаются поштучно.
+        """
+
+        cfg = config or FeatureConfig()
+        result: Dict[str, pd.DataFrame] = {}
+        if type(self._indicators) is not TechnicalIndicators:
+            groups = [[symbol] for symbol in frames]
+        else:
+            groups = self._panel_groups(frames)
+        for symbols in groups:
+            if len(symbols) > 1:
+                result.update(self._build_panel_group(symbols, frames, cfg))
+        for symbol, frame in frames.items():
+            if symbol not in result:
+                result[symbol] = self.build(frame, config=cfg)
+        return {symbol: result[symbol] for symbol in frames}
+
+    @staticmethod
+    def _panel_groups(frames: Dict[str, pd.DataFrame]) -> List[List[str]]:
+        """Группирует символы с совпадающим индексом и одинаковым набором признаков."""
+
+        groups: Dict[tuple, List[List[str]]] = {}
+        for symbol, frame in frames.items():
+            index = frame.index
+            if len(index) == 0:
+                continue
+            key = (len(index), index[0], index[-1], "funding_rate" in frame.columns)
+            candidates = groups.setdefault(key, [])
+            for group in candidates:
+                if frames[group[0]].index.equals(index):
+                    group.append(symbol)
+                    break
+            else:
+                candidates.append([symbol])
+        return [group for candidates in groups.values() for group in candidates]
+
+    def _build_panel_group(
+        self,
+        symbols: List[str],
+        frames: Dict[str, pd.DataFrame],
+        cfg: FeatureConfig,
+    ) -> Dict[str, pd.DataFrame]:
+        """Считает группу одной панелью; символы с пропусками в ценах не возвращаются."""
+
+        index = frames[symbols[0]].index
+        columns = list(self.FEATURE_COLUMNS)
+        with_funding = "funding_rate" in frames[symbols[0]].columns
+
+        def stack(column: str) -> np.ndarray:
+            # (символы × бары) построчно; .T — логическая матрица «бары × символы»
+            rows = [frames[symbol][column].to_numpy(dtype=np.float64) for symbol in symbols]
+            return np.vstack(rows).T
+
+        high, low, close = stack("high"), stack("low"), stack("close")
+        # pct_change в build() подставляет предыдущую цену вместо NaN — такие
+        # символы пересчитываются поштучно
+        gaps = np.isnan(high).any(axis=0) | np.isnan(low).any(axis=0) | np.isnan(close).any(axis=0)
+        return_lag = kernels.shift(kernels.pct_change(close, cfg.returns_lag))
+        volatility = kernels.shift(
+            kernels.rolling_std(kernels.pct_change(close), cfg.volatility_window)
+        )
+        blocks = [
+            kernels.shift(kernels.ema(close, cfg.ema_fast)),
+            kernels.shift(kernels.ema(close, cfg.ema_slow)),
+            kernels.shift(kernels.atr(high, low, close, cfg.atr_period)),
+            np.where(np.isnan(return_lag), 0.0, return_lag),
+            np.where(np.isnan(volatility), 0.0, volatility),
+        ]
+        if with_funding:
+            funding = kernels.shift(stack("funding_rate"))
+            blocks.append(np.where(np.isnan(funding), 0.0, funding))
+            columns.append("funding_rate")
+        # (символы × бары × признаки): кадр символа — непрерывный срез панели
+        panel = np.empty((len(symbols), len(index), len(columns)))
+        for position, values in enumerate(blocks):
+            panel[:, :, position] = values.T
+        keep = np.asarray(~np.isnan(panel[:, :, :3]).any(axis=2), dtype=bool)
+
+        result: Dict[str, pd.DataFrame] = {}
+        for row, symbol in enumerate(symbols):
+            if gaps[row]:
+                continue
+            features = pd.DataFrame(panel[row], index=index, columns=columns)
+            mask = keep[row]
+            first = int(mask.argmax())
+            if mask[first:].all():
+                result[symbol] = features.iloc[first:]
+            else:
+                result[symbol] = features.iloc[mask]
+        return result
+
+    def sweep(
+        self,
+        candles: pd.DataFrame,
+        configs: Sequence[FeatureConfig],
+    ) -> pd.DataFrame:
+        """
+        Признаки одного кадра свечей сразу для набора ``FeatureConfig``.
+
+        Колонки — MultiIndex из полей конфигурации и имени признака, так что блок
+        ``result.xs(..., axis=1)`` конфигурации побитово равен ``build(candles, config)``
+        на общих строках. Промежуточные ряды (true range, доходности, EMA/ATR/std по
+        каждому уникальному окну) считаются один раз на весь набор; строки —
+        пересечение строк ``build()`` по всем конфигурациям.
+        """
+
+        unique: List[FeatureConfig] = []
+        for config in configs:
+            if config not in unique:
+                unique.append(config)
+        names = [field.name for field in fields(FeatureConfig)]
+        with_funding = "funding_rate" in candles.columns
+        feature_names = list(self.FEATURE_COLUMNS) + (["funding_rate"] if with_funding else [])
+        columns = pd.MultiIndex.from_tuples(
+            [astuple(config) + (name,) for config in unique for name in feature_names],
+            names=names + ["feature"],
+        )
+        if not unique or candles.empty:
+            return pd.DataFrame(index=candles.index[:0], columns=columns, dtype=float)
+
+        close = kernels.as_array(candles["close"])
+        high = kernels.as_array(candles["high"])
+        low = kernels.as_array(candles["low"])
+        if (
+            type(self._indicators) is not TechnicalIndicators
+            or np.isnan(close).any()
+            or np.isnan(high).any()
+            or np.isnan(low).any()
+        ):
+            # переопределённые индикаторы и пропуски в ценах — поштучно через build()
+            blocks = [self.build(candles, config=config) for config in unique]
+            joined = pd.concat(blocks, axis=1, join="inner")
+            joined.columns = columns
+            return joined
+
+        def memo(
+            cache: Dict[int, np.ndarray],
+            period: int,
+            compute: Callable[[int], np.ndarray],
+        ) -> np.ndarray:
+            if period not in cache:
+                cache[period] = compute(period)
+            return cache[period]
+
+        true_range = kernels.true_range(high, low, close)
+        returns = kernels.pct_change(close)
+        emas: Dict[int, np.ndarray] = {}
+        atrs: Dict[int, np.ndarray] = {}
+        lags: Dict[int, np.ndarray] = {}
+        vols: Dict[int, np.ndarray] = {}
+
+        def zero_filled(values: np.ndarray) -> np.ndarray:
+            shifted = kernels.shift(values)
+            return np.where(np.isnan(shifted), 0.0, shifted)
+
+        funding = None
+        if with_funding:
+            funding = zero_filled(kernels.as_array(candles["funding_rate"]))
+        panel = np.empty((len(candles), len(columns)))
+        position = 0
+        for cfg in unique:
+            blocks = [
+                memo(emas, cfg.ema_fast, lambda p: kernels.shift(kernels.ema(close, p))),
+                memo(emas, cfg.ema_slow, lambda p: kernels.shift(kernels.ema(close, p))),
+                memo(
+                    atrs,
+                    cfg.atr_period,
+                    lambda p: kernels.shift(kernels.rolling_mean(true_range, p, min_periods=1)),
+                ),
+                memo(lags, cfg.returns_lag, lambda p: zero_filled(kernels.pct_change(close, p))),
+                memo(
+                    vols,
+                    cfg.volatility_window,
+                    lambda p: zero_filled(kernels.rolling_std(returns, p)),
+                ),
+            ]
+            if funding is not None:
+                blocks.append(funding)
+            for values in blocks:
+                panel[:, position] = values
+                position += 1
+        # build() отбрасывает строки с NaN в EMA/ATR — у каждой конфигурации свои
+        checked = columns.get_level_values("feature").isin(("ema_fast", "ema_slow", "atr"))
+        keep = ~np.isnan(panel[:, checked]).any(axis=1)
+        return pd.DataFrame(panel[keep], index=candles.index[keep], columns=columns)
+
     def build_map(
         self,
         candles_map: Dict[str, Dict[str, pd.DataFrame]],
         config: FeatureConfig | None = None,
     ) -> Dict[str, Dict[str, pd.DataFrame]]:
-        """Возвращает словарь признаков {symbol: {timeframe: DataFrame}}."""
+        """Возвращает словарь признаков {symbol: {timeframe: DataFrame}}.
+
+        Вне потокового режима символы каждого таймфрейма считаются панелью
+        (``build_panel``).
+        """
 
         result: Dict[str, Dict[str, pd.DataFrame]] = {}
+        by_timeframe: Dict[str, Dict[str, pd.DataFrame]] = {}
         for symbol, per_timeframe in candles_map.items():
             result[symbol] = {}
             for timeframe, frame in per_timeframe.items():
                 if frame.empty:
                     result[symbol][timeframe] = frame.copy()
-                    continue
-                result[symbol][timeframe] = self.build(frame, config=config)
+                elif self.streaming:
+                    result[symbol][timeframe] = self.update(symbol, timeframe, frame, config=config)
+                else:
+                    result[symbol][timeframe] = frame
+                    by_timeframe.setdefault(timeframe, {})[symbol] = frame
+        for timeframe, frames in by_timeframe.items():
+            for symbol, features in self.build_panel(frames, config=config).items():
+                result[symbol][timeframe] = features
         return result
 
     @staticmethod
@@ -5,15 +5,30 @@ from __future__ import annotations
 import asyncio
 import logging
 import random
-from collections import OrderedDict, defaultdict
+import time
+from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta, timezone
 from enum import IntEnum
 from typing import Any, Callable, Dict, Iterable, List, Optional
 
+import ccxt  # type: ignore[import-untyped]
+import numpy as np
 import pandas as pd
 
-import ccxt  # type: ignore[import-untyped]
+from prod_core.exchange_io import ExchangeCallTimeout, ExchangeExecutor, get_exchange_executor
+from prod_core.rate_limit import (
+    RateLimiter,
+    RequestPriority,
+    get_rate_limiter,
+    ohlcv_weight,
+)
+
+from .aggregation import AggregatedBars, aggregate_ohlcv, derivable_timeframes
+from .candle_cache import CandleCache
+from .events import BarCloseBus, BarClosedEvent, BarCloseSubscription
+from .timeframes import timeframe_to_milliseconds, timeframe_to_timedelta
+from .ws_manager import WebSocketManager, WsShard
 
 try:
     import ccxt.pro as ccxtpro  # type: ignore[import-untyped]
@@ -27,27 +42,6 @@ class FeedIntegrityError(RuntimeError):
     """Выбрасывается при нарушении целостности фида (gap/double)."""
 
 
-def timeframe_to_timedelta(timeframe: str) -> timedelta:
-    """Преобразует строковый таймфрейм CCXT к timedelta."""
-
-    unit = timeframe[-1]
-    value = int(timeframe[:-1])
-    mapping = {
-        "m": timedelta(minutes=value),
-        "h": timedelta(hours=value),
-        "d": timedelta(days=value),
-    }
-    if unit not in mapping:
-        raise ValueError(f"Неподдерживаемый таймфрейм: {timeframe}")
-    return mapping[unit]
-
-
-def timeframe_to_milliseconds(timeframe: str) -> int:
-    """Возвращает длительность таймфрейма в миллисекундах."""
-
-    return int(timeframe_to_timedelta(timeframe).total_seconds() * 1000)
-
-
 @dataclass(slots=True)
 class SymbolFeedSpec:
     """Параметры подписки на символ и список таймфреймов."""
@@ -64,6 +58,7 @@ class SymbolFeedSpec:
     min_liquidity_usd: float
     max_spread_pct: float
     poll_interval_seconds: float = 5.0
+    aggregate_timeframes: bool = False
 
 
 @dataclass(slots=True)
@@ -81,58 +76,376 @@ class CandleRecord:
     source: str
 
 
+@dataclass(slots=True)
+class CandleBatch:
+    """Пакет свечей одного символа/таймфрейма в колоночном виде.
+
+    ``ts`` — int64 timestamp открытия в миллисекундах, ``ohlcv`` — float64 массив ``(5, N)``.
+    Путь ingest работает с пакетом целиком, без объектов на каждую свечу.
+    """
+
+    symbol: str
+    timeframe: str
+    source: str
+    ts: np.ndarray
+    ohlcv: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def last_timestamp_ms(self) -> int | None:
+        return int(self.ts[-1]) if len(self.ts) else None
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: Iterable[Iterable[Any]],
+        symbol: str,
+        timeframe: str,
+        source: str,
+    ) -> CandleBatch:
+        """Строит пакет из ответа ccxt (список ``[ts, o, h, l, c, v]``)."""
+
+        if not isinstance(payload, (list, tuple, np.ndarray)):
+            payload = list(payload)
+        try:
+            data = np.asarray(payload, dtype=np.float64)
+        except ValueError:
+            # строки разной длины (лишние поля у некоторых бирж)
+            data = np.asarray([list(row)[:6] for row in payload], dtype=np.float64)
+        data = data.reshape(len(data), -1) if len(data) else np.empty((0, 6))
+        return cls(
+            symbol=symbol,
+            timeframe=timeframe,
+            source=source,
+            ts=data[:, 0].astype(np.int64),
+            ohlcv=np.ascontiguousarray(data[:, 1:6].T),
+        )
+
+    @classmethod
+    def from_columns(cls, columns: Any, symbol: str, timeframe: str, source: str) -> CandleBatch:
+        """Строит пакет из объекта с колонками ``ts/open/high/low/close/volume``."""
+
+        return cls(
+            symbol=symbol,
+            timeframe=timeframe,
+            source=source,
+            ts=np.asarray(columns.ts, dtype=np.int64),
+            ohlcv=np.vstack(
+                [columns.open, columns.high, columns.low, columns.close, columns.volume]
+            ).astype(np.float64, copy=False),
+        )
+
+    @classmethod
+    def from_records(
+        cls,
+        records: List[CandleRecord],
+        symbol: str,
+        timeframe: str,
+        source: str,
+    ) -> CandleBatch:
+        ts = np.fromiter(
+            (_timestamp_to_ms(record.ts) for record in records), dtype=np.int64, count=len(records)
+        )
+        rows = [[record.open, record.high, record.low, record.close, record.volume] for record in records]
+        ohlcv = np.array(rows, dtype=np.float64).reshape(len(records), 5)
+        return cls(symbol=symbol, timeframe=timeframe, source=source, ts=ts, ohlcv=ohlcv.T)
+
+    def to_records(self) -> List[CandleRecord]:
+        """Материализует пакет в ``CandleRecord`` (совместимость со старым API)."""
+
+        index = pd.to_datetime(self.ts, unit="ms", utc=True)
+        return [
+            CandleRecord(
+                ts=ts,
+                open=float(open_),
+                high=float(high),
+                low=float(low),
+                close=float(close),
+                volume=float(volume),
+                tf=self.timeframe,
+                symbol=self.symbol,
+                source=self.source,
+            )
+            for ts, open_, high, low, close, volume in zip(index, *self.ohlcv)
+        ]
+
+
+@dataclass(slots=True, frozen=True)
+class CandleView:
+    """Версионированный read-only срез буфера без копирования данных.
+
+    Массивы ссылаются на память ``CandleBuffer`` и валидны, пока ``version`` буфера
+    не изменился: следующий upsert может переписать их содержимое. Для долговременного
+    хранения используйте ``to_frame()``, который копирует данные.
+    """
+
+    symbol: str
+    timeframe: str
+    version: int
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    source: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def last_timestamp_ms(self) -> int | None:
+        return int(self.ts[-1]) if len(self.ts) else None
+
+    def to_frame(self) -> pd.DataFrame:
+        """Материализует срез в DataFrame того же формата, что и ``CandleBuffer.to_frame``."""
+
+        index = pd.DatetimeIndex(pd.to_datetime(self.ts, unit="ms", utc=True), name="ts")
+        return pd.DataFrame(
+            {
+                "open": self.open.copy(),
+                "high": self.high.copy(),
+                "low": self.low.copy(),
+                "close": self.close.copy(),
+                "volume": self.volume.copy(),
+                "tf": self.timeframe,
+                "symbol": self.symbol,
+                "source": self.source.copy(),
+            },
+            index=index,
+        )
+
+
 class CandleBuffer:
-    """Кольцевой буфер свечей на один символ/таймфрейм."""
+    """Колоночный кольцевой буфер свечей на один символ/таймфрейм.
+
+    Свечи хранятся в преаллоцированных массивах NumPy: ``int64`` timestamp в миллисекундах
+    и ``float64`` OHLCV. Ёмкость массивов равна ``2 * maxlen``, поэтому живое окно
+    ``[start, stop)`` всегда непрерывно: упорядоченное добавление стоит O(1), а при
+    упоре в конец массива окно одним копированием переносится в начало (амортизированно O(1)).
+    Обновление последнего бара выполняется на месте, бары вне порядка вставляются
+    бинарным поиском.
+
+    ``compact=True`` — режим для исследовательских прогонов: OHLCV в ``float32``
+    (погрешность — ``prod_core.data.compact``), источник бара — байтовый код в таблице
+    источников буфера, а ``to_frame`` отдаёт ``tf``/``symbol``/``source`` категориями.
+    """
+
+    COLUMNS: tuple[str, ...] = ("open", "high", "low", "close", "volume")
 
-    def __init__(self, symbol: str, timeframe: str, maxlen: int = 5000) -> None:
+    def __init__(
+        self,
+        symbol: str,
+        timeframe: str,
+        maxlen: int = 5000,
+        *,
+        compact: bool = False,
+    ) -> None:
+        if maxlen <= 0:
+            raise ValueError("maxlen должен быть положительным.")
         self.symbol = symbol
         self.timeframe = timeframe
         self.maxlen = maxlen
-        self._records: "OrderedDict[pd.Timestamp, CandleRecord]" = OrderedDict()
+        self.compact = compact
+        capacity = 2 * maxlen
+        self._ts = np.empty(capacity, dtype=np.int64)
+        dtype = np.float32 if compact else np.float64
+        self._ohlcv = np.empty((len(self.COLUMNS), capacity), dtype=dtype)
+        # в компактном режиме — коды uint8 в ``_source_names``, иначе строки
+        self._source = np.empty(capacity, dtype=np.uint8 if compact else object)
+        self._source_blank: Any = 0 if compact else None
+        self._source_names: List[str] = []
+        self._start = 0
+        self._stop = 0
+        self.version = 0
 
     def __len__(self) -> int:
-        return len(self._records)
+        return self._stop - self._start
 
     def upsert(self, record: CandleRecord) -> None:
         """Добавляет или обновляет свечу, сохраняя упорядоченность."""
 
-        self._records[record.ts] = record
-        # OrderedDict не гарантирует сортировку по ключам, поэтому пересоздаём.
-        self._records = OrderedDict(sorted(self._records.items(), key=lambda item: item[0]))
-        while len(self._records) > self.maxlen:
-            self._records.popitem(last=False)
+        values = (record.open, record.high, record.low, record.close, record.volume)
+        self.upsert_bar(_timestamp_to_ms(record.ts), values, record.source)
+
+    def upsert_bar(self, ts_ms: int, values: Any, source: str) -> None:
+        """То же, что ``upsert``, для бара в виде timestamp (мс) и пяти значений OHLCV."""
+
+        if self._stop == self._start or ts_ms > self._ts[self._stop - 1]:
+            self._append(ts_ms, values, source)
+            return
+        if ts_ms == self._ts[self._stop - 1]:
+            self._write(self._stop - 1, ts_ms, values, source)
+            return
+
+        # Редкий случай: бар пришёл вне порядка — ищем позицию бинарным поиском.
+        pos = self._start + int(np.searchsorted(self._ts[self._start : self._stop], ts_ms))
+        if self._ts[pos] == ts_ms:
+            self._write(pos, ts_ms, values, source)
+            return
+        if self._stop == len(self._ts):
+            pos -= self._compact()
+        stop = self._stop
+        self._ts[pos + 1 : stop + 1] = self._ts[pos:stop]
+        self._ohlcv[:, pos + 1 : stop + 1] = self._ohlcv[:, pos:stop]
+        self._source[pos + 1 : stop + 1] = self._source[pos:stop]
+        self._stop += 1
+        self._write(pos, ts_ms, values, source)
+        self._trim()
+
+    def extend(self, ts_ms: np.ndarray, ohlcv: np.ndarray, source: str) -> None:
+        """Дописывает блок баров новее последнего одной векторной вставкой.
+
+        ``ts_ms`` — строго возрастающие int64 timestamp, ``ohlcv`` — массив ``(5, N)``.
+        """
+
+        count = len(ts_ms)
+        if count == 0:
+            return
+        last = self.last_timestamp_ms()
+        if last is not None and int(ts_ms[0]) <= last:
+            raise ValueError("extend принимает только бары новее последнего в буфере.")
+        if count > self.maxlen:
+            ts_ms, ohlcv, count = ts_ms[-self.maxlen :], ohlcv[:, -self.maxlen :], self.maxlen
+        if self._stop + count > len(self._ts):
+            # то, что всё равно уйдёт за maxlen, отбрасываем до переноса окна
+            overflow = min(len(self), max(0, len(self) + count - self.maxlen))
+            self._source[self._start : self._start + overflow] = self._source_blank
+            self._start += overflow
+            self._compact()
+        stop = self._stop + count
+        self._ts[self._stop : stop] = ts_ms
+        self._ohlcv[:, self._stop : stop] = ohlcv
+        self._source[self._stop : stop] = self._encode_source(source)
+        self._stop = stop
+        self.version += 1
+        self._trim()
 
     def last_timestamp(self) -> pd.Timestamp | None:
-        try:
-            return next(reversed(self._records))
-        except StopIteration:
+        last_ms = self.last_timestamp_ms()
+        if last_ms is None:
             return None
+        return pd.Timestamp(last_ms, unit="ms", tz=timezone.utc)
+
+    def last_timestamp_ms(self) -> int | None:
+        """Последний timestamp буфера в миллисекундах."""
+
+        if self._stop == self._start:
+            return None
+        return int(self._ts[self._stop - 1])
+
+    def view(self) -> CandleView:
+        """Возвращает read-only представление живого окна без копирования."""
+
+        start, stop = self._start, self._stop
+        arrays = [self._ts[start:stop]]
+        arrays.extend(self._ohlcv[idx, start:stop] for idx in range(len(self.COLUMNS)))
+        arrays.append(self._decode_source(start, stop))
+        for array in arrays:
+            array.flags.writeable = False
+        ts, open_, high, low, close, volume, source = arrays
+        return CandleView(
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            version=self.version,
+            ts=ts,
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
+            volume=volume,
+            source=source,
+        )
 
     def to_frame(self) -> pd.DataFrame:
         """Возвращает DataFrame с индексом времени."""
 
-        if not self._records:
+        if self._stop == self._start:
             columns = ["ts", "open", "high", "low", "close", "volume", "tf", "symbol", "source"]
             return pd.DataFrame(columns=columns).set_index("ts")
 
-        rows = [
-            {
-                "ts": rec.ts,
-                "open": rec.open,
-                "high": rec.high,
-                "low": rec.low,
-                "close": rec.close,
-                "volume": rec.volume,
-                "tf": rec.tf,
-                "symbol": rec.symbol,
-                "source": rec.source,
-            }
-            for rec in self._records.values()
-        ]
-        frame = pd.DataFrame(rows)
-        frame.set_index("ts", inplace=True)
-        frame.sort_index(inplace=True)
-        return frame
+        start, stop = self._start, self._stop
+        index = pd.DatetimeIndex(pd.to_datetime(self._ts[start:stop], unit="ms", utc=True), name="ts")
+        data: Dict[str, Any] = {
+            column: self._ohlcv[idx, start:stop].copy() for idx, column in enumerate(self.COLUMNS)
+        }
+        if self.compact:
+            size = stop - start
+            data["tf"] = pd.Categorical.from_codes(np.zeros(size, dtype=np.int8), [self.timeframe])
+            data["symbol"] = pd.Categorical.from_codes(np.zeros(size, dtype=np.int8), [self.symbol])
+            codes = self._source[start:stop].astype(np.int16)
+            data["source"] = pd.Categorical.from_codes(codes, self._source_names)
+            return pd.DataFrame(data, index=index)
+        data["tf"] = self.timeframe
+        data["symbol"] = self.symbol
+        data["source"] = self._source[start:stop].copy()
+        return pd.DataFrame(data, index=index)
+
+    @property
+    def nbytes(self) -> int:
+        """Объём преаллоцированных массивов буфера в байтах (ёмкость ``2 * maxlen``)."""
+
+        return int(self._ts.nbytes + self._ohlcv.nbytes + self._source.nbytes)
+
+    def _encode_source(self, source: str) -> Any:
+        if not self.compact:
+            return source
+        try:
+            return self._source_names.index(source)
+        except ValueError:
+            if len(self._source_names) >= np.iinfo(np.uint8).max:
+                raise ValueError("Слишком много источников для компактного буфера.") from None
+            self._source_names.append(source)
+            return len(self._source_names) - 1
+
+    def _decode_source(self, start: int, stop: int) -> np.ndarray:
+        if not self.compact:
+            return self._source[start:stop]
+        # компактный срез источников материализуется: строки хранятся один раз на буфер
+        names = np.asarray(self._source_names, dtype=object)
+        return names[self._source[start:stop]] if len(names) else np.empty(0, dtype=object)
+
+    def _append(self, ts_ms: int, values: Any, source: str) -> None:
+        if self._stop == len(self._ts):
+            self._compact()
+        self._write(self._stop, ts_ms, values, source)
+        self._stop += 1
+        self._trim()
+
+    def _write(self, pos: int, ts_ms: int, values: Any, source: str) -> None:
+        self._ts[pos] = ts_ms
+        self._ohlcv[:, pos] = values
+        self._source[pos] = self._encode_source(source)
+        self.version += 1
+
+    def _trim(self) -> None:
+        overflow = len(self) - self.maxlen
+        if overflow > 0:
+            self._source[self._start : self._start + overflow] = self._source_blank
+            self._start += overflow
+
+    def _compact(self) -> int:
+        """Переносит живое окно в начало массивов и возвращает величину сдвига."""
+
+        offset = self._start
+        if offset == 0:
+            return 0
+        size = len(self)
+        self._ts[:size] = self._ts[self._start : self._stop]
+        self._ohlcv[:, :size] = self._ohlcv[:, self._start : self._stop]
+        self._source[:size] = self._source[self._start : self._stop]
+        self._source[size : self._stop] = self._source_blank
+        self._start = 0
+        self._stop = size
+        return offset
+
+
+def _timestamp_to_ms(ts: pd.Timestamp) -> int:
+    """Переводит timestamp свечи в миллисекунды UTC."""
+
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(timezone.utc)
+    return int(ts.value // 1_000_000)
 
 
 class FeedHealthStatus(IntEnum):
@@ -146,6 +459,8 @@ class FeedHealthStatus(IntEnum):
 class MarketDataFeed:
     """Загружает исторические данные и поддерживает поток свечей через CCXT."""
 
+    _WS_TASK_KEY = ("*", "ws")
+
     def __init__(
         self,
         exchange_id: str,
@@ -157,6 +472,14 @@ class MarketDataFeed:
         health_drift_ms: int = 1500,
         allow_gap_fill: bool = True,
         on_health_change: Callable[[str, str, FeedHealthStatus], None] | None = None,
+        on_gap_repaired: Callable[[str, str, int, float], None] | None = None,
+        candle_cache: CandleCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        executor: ExchangeExecutor | None = None,
+        ws_client_factory: Callable[[], Any] | None = None,
+        ws_max_connections: int = 4,
+        ws_streams_per_connection: int = 100,
+        compact_buffers: bool = False,
     ) -> None:
         self.exchange_id = exchange_id
         self.symbols = tuple(symbols)
@@ -164,10 +487,21 @@ class MarketDataFeed:
         self.health_drift_ms = health_drift_ms
         self.allow_gap_fill = allow_gap_fill
         self.on_health_change = on_health_change
+        self.on_gap_repaired = on_gap_repaired
+        self.candle_cache = candle_cache
+        # float32-буферы для исследовательских прогонов (см. CandleBuffer)
+        self.compact_buffers = compact_buffers
 
         self._rest = rest_client or self._build_rest_client(exchange_id)
-        self._use_websocket = use_websocket and ccxtpro is not None
-        self._ws: Any | None = None
+        self._rate_limiter = rate_limiter or get_rate_limiter(exchange_id)
+        # блокирующие вызовы ccxt идут в пул биржи, а не в дефолтный executor
+        self._executor = executor or get_exchange_executor(exchange_id)
+        self._use_websocket = use_websocket and (ccxtpro is not None or ws_client_factory is not None)
+        self._ws_client_factory = ws_client_factory
+        self.ws_max_connections = ws_max_connections
+        self.ws_streams_per_connection = ws_streams_per_connection
+        self._ws_manager: WebSocketManager | None = None
+        self._specs: Dict[str, SymbolFeedSpec] = {spec.name: spec for spec in self.symbols}
 
         self._buffers: Dict[str, Dict[str, CandleBuffer]] = defaultdict(dict)
         self._locks: Dict[tuple[str, str], asyncio.Lock] = {}
@@ -175,14 +509,27 @@ class MarketDataFeed:
         self._ready: Dict[tuple[str, str], asyncio.Event] = {}
         self._tasks: Dict[tuple[str, str], asyncio.Task[None]] = {}
         self._stop_event = asyncio.Event()
+        self._bar_bus = BarCloseBus()
+        self._streaming: set[tuple[str, str]] = set()
+        # (symbol, базовый tf) -> таймфреймы, которые собираются из него локально
+        self._derived: Dict[tuple[str, str], tuple[str, ...]] = {}
+        # время от начала backfill до готовности ряда (restart-to-ready), секунды
+        self.backfill_seconds: Dict[tuple[str, str], float] = {}
 
         for spec in self.symbols:
             for timeframe in spec.timeframes:
                 key = (spec.name, timeframe)
-                self._buffers[spec.name][timeframe] = CandleBuffer(spec.name, timeframe, maxlen=buffer_size)
+                self._buffers[spec.name][timeframe] = CandleBuffer(
+                    spec.name, timeframe, maxlen=buffer_size, compact=compact_buffers
+                )
                 self._locks[key] = asyncio.Lock()
                 self._status[key] = FeedHealthStatus.PAUSED
                 self._ready[key] = asyncio.Event()
+            if spec.aggregate_timeframes:
+                base = min(spec.timeframes, key=timeframe_to_milliseconds)
+                derived = derivable_timeframes(base, spec.timeframes)
+                if derived:
+                    self._derived[(spec.name, base)] = derived
 
     def force_rest_mode(self) -> None:
         """Принудительно переключает фид на REST-поллинг."""
@@ -191,6 +538,14 @@ class MarketDataFeed:
             return
         logger.warning("Отключаем WebSocket для %s: переходим на REST-поллинг.", self.exchange_id)
         self._use_websocket = False
+        ws_task = self._tasks.pop(self._WS_TASK_KEY, None)
+        if ws_task is None:
+            return
+        ws_task.cancel()
+        if self._ws_manager is not None:
+            self._ws_manager.stop()
+            self._ws_manager = None
+        self._start_rest_polling()
 
     @staticmethod
     def _build_rest_client(exchange_id: str) -> ccxt.Exchange:
@@ -205,24 +560,52 @@ class MarketDataFeed:
 
         self._stop_event.clear()
         await self._backfill_initial()
-        if self._use_websocket and ccxtpro is not None:
-            ws_class = getattr(ccxtpro, self.exchange_id, None)
-            if ws_class is None:
+        factory = self._ws_client_factory
+        if self._use_websocket and factory is None:
+            factory = self._ccxtpro_factory()
+            if factory is None:
                 logger.warning("ccxt.pro не поддерживает %s — переходим на REST-поллинг.", self.exchange_id)
                 self._use_websocket = False
-            else:
-                self._ws = ws_class({"enableRateLimit": True})
 
+        if self._use_websocket and factory is not None:
+            keys = [(spec.name, tf) for spec in self.symbols for tf in self._subscribed_timeframes(spec)]
+            self._ws_manager = WebSocketManager(
+                factory,
+                keys,
+                self._on_ws_candles,
+                max_connections=self.ws_max_connections,
+                streams_per_connection=self.ws_streams_per_connection,
+                on_shard_down=self._on_ws_shard_down,
+                poll_keys=self._poll_keys,
+            )
+            self._tasks[self._WS_TASK_KEY] = asyncio.create_task(self._ws_manager.run(), name="feed-ws")
+        else:
+            self._start_rest_polling()
+
+    def _ccxtpro_factory(self) -> Callable[[], Any] | None:
+        ws_class = getattr(ccxtpro, self.exchange_id, None) if ccxtpro is not None else None
+        if ws_class is None:
+            return None
+
+        def factory() -> Any:
+            return ws_class({"enableRateLimit": True})
+
+        return factory
+
+    def _start_rest_polling(self) -> None:
         for spec in self.symbols:
-            for timeframe in spec.timeframes:
+            for timeframe in self._subscribed_timeframes(spec):
                 key = (spec.name, timeframe)
-                task = asyncio.create_task(self._subscription_loop(spec, timeframe), name=f"feed-{spec.name}-{timeframe}")
+                task = asyncio.create_task(
+                    self._subscription_loop(spec, timeframe), name=f"feed-{spec.name}-{timeframe}"
+                )
                 self._tasks[key] = task
 
     async def stop(self) -> None:
         """Останавливает подписки и закрывает клиенты."""
 
         self._stop_event.set()
+        self._bar_bus.close()
         for task in list(self._tasks.values()):
             task.cancel()
         for key, task in list(self._tasks.items()):
@@ -233,17 +616,14 @@ class MarketDataFeed:
             except Exception:  # pragma: no cover - логирование нарушения
                 logger.exception("Ошибка завершения задачи фида %s/%s", *key)
         self._tasks.clear()
-
-        if self._ws is not None:
-            try:
-                await self._ws.close()
-            except Exception:  # pragma: no cover - закрытие ws
-                logger.exception("Ошибка закрытия ccxt.pro соединения")
-            finally:
-                self._ws = None
+        self._ws_manager = None
+        await self._persist_cache()
 
         if hasattr(self._rest, "close"):
-            await asyncio.to_thread(self._rest.close)
+            try:
+                await self._executor.run(self._rest.close, timeout=5.0)
+            except ExchangeCallTimeout:
+                logger.warning("REST-клиент %s не закрылся за 5s.", self.exchange_id)
 
     async def __aenter__(self) -> MarketDataFeed:
         await self.start()
@@ -252,42 +632,208 @@ class MarketDataFeed:
     async def __aexit__(self, exc_type, exc, tb) -> None:
         await self.stop()
 
+    def _derived_timeframes(self, spec: SymbolFeedSpec) -> tuple[str, ...]:
+        derived: tuple[str, ...] = ()
+        for (symbol, _base), timeframes in self._derived.items():
+            if symbol == spec.name:
+                derived += timeframes
+        return derived
+
+    def _subscribed_timeframes(self, spec: SymbolFeedSpec) -> tuple[str, ...]:
+        """Таймфреймы, которые нужно получать с биржи (без локально агрегируемых)."""
+
+        derived = self._derived_timeframes(spec)
+        return tuple(tf for tf in spec.timeframes if tf not in derived)
+
+    def _backfill_limit(self, spec: SymbolFeedSpec, timeframe: str) -> int:
+        """Глубина backfill: базовый tf тянем с запасом на историю старших."""
+
+        limit = max(spec.backfill_bars, 2000)
+        derived = self._derived.get((spec.name, timeframe))
+        if derived:
+            base_ms = timeframe_to_milliseconds(timeframe)
+            ratio = max(timeframe_to_milliseconds(tf) // base_ms for tf in derived)
+            limit = max(limit, min(self.buffer_size, (spec.backfill_bars + 1) * ratio))
+        return limit
+
     async def _backfill_initial(self) -> None:
         """Загружает историю для каждого символа и таймфрейма."""
 
-        tasks = [self._backfill_symbol(spec, timeframe) for spec in self.symbols for timeframe in spec.timeframes]
+        tasks = [
+            self._backfill_symbol(spec, timeframe)
+            for spec in self.symbols
+            for timeframe in self._subscribed_timeframes(spec)
+        ]
         await asyncio.gather(*tasks)
+        derived = [
+            self._backfill_derived(spec, timeframe)
+            for spec in self.symbols
+            for timeframe in self._derived_timeframes(spec)
+        ]
+        await asyncio.gather(*derived)
+        await self._persist_cache()
+
+    async def _persist_cache(self) -> None:
+        """Сохраняет буферы подписанных рядов в дисковый кэш."""
+
+        if self.candle_cache is None:
+            return
+        for spec in self.symbols:
+            for timeframe in self._subscribed_timeframes(spec):
+                view = self._buffers[spec.name][timeframe].view()
+                if not len(view):
+                    continue
+                # копию снимаем в event loop, запись на диск — в потоке
+                data = self.candle_cache.pack(view)
+                try:
+                    await asyncio.to_thread(self.candle_cache.write, spec.name, timeframe, data)
+                except OSError:
+                    logger.exception("Не удалось сохранить кэш свечей %s/%s", spec.name, timeframe)
+
+    async def _load_cached(self, spec: SymbolFeedSpec, timeframe: str, since: int) -> int | None:
+        """Загружает кэш в буфер, если он покрывает окно backfill; возвращает последний ts.
+
+        Окно должно быть покрыто целиком: после разрыва ``CandleCache.load`` отдаёт только
+        хвост, и короткий хвост без начала окна оставил бы буфер мельче ``_backfill_limit``.
+        """
+
+        if self.candle_cache is None:
+            return None
+        cached = await asyncio.to_thread(self.candle_cache.load, spec.name, timeframe)
+        if cached is None or not len(cached):
+            return None
+        last_ms = cached.last_timestamp_ms()
+        if last_ms is None or last_ms < since:
+            logger.info("Кэш %s/%s устарел — полный backfill через REST.", spec.name, timeframe)
+            return None
+        if int(cached.ts[0]) > since:
+            logger.info(
+                "Кэш %s/%s не покрывает окно backfill (%s баров) — полный backfill через REST.",
+                spec.name,
+                timeframe,
+                len(cached),
+            )
+            return None
+        batch = CandleBatch.from_columns(cached, spec.name, timeframe, "cache")
+        tail = max(0, len(batch) - self.buffer_size)
+        batch.ts, batch.ohlcv = batch.ts[tail:], batch.ohlcv[:, tail:]
+        await self._ingest_batch(spec, timeframe, batch)
+        return last_ms
+
+    async def _backfill_derived(self, spec: SymbolFeedSpec, timeframe: str) -> None:
+        """Собирает историю старшего tf из базового буфера, при нехватке — REST."""
+
+        base = next(
+            base for (symbol, base), tfs in self._derived.items() if symbol == spec.name and timeframe in tfs
+        )
+        bars = self._aggregate_base(spec.name, base, timeframe)
+        if len(bars) < spec.backfill_bars:
+            logger.info(
+                "Истории %s %s недостаточно для %s (%s < %s баров) — backfill через REST.",
+                spec.name,
+                base,
+                timeframe,
+                len(bars),
+                spec.backfill_bars,
+            )
+            await self._backfill_symbol(spec, timeframe)
+            return
+        key = (spec.name, timeframe)
+        batch = CandleBatch.from_columns(bars, spec.name, timeframe, f"agg-{base}")
+        await self._ingest_batch(spec, timeframe, batch)
+        self._ready[key].set()
+        self._streaming.add(key)
+        self._set_status(spec.name, timeframe, FeedHealthStatus.OK)
+        logger.info("Агрегация завершена: %s %s из %s (%s баров)", spec.name, timeframe, base, len(bars))
+
+    def _aggregate_base(
+        self,
+        symbol: str,
+        base: str,
+        timeframe: str,
+        *,
+        since_ms: int | None = None,
+    ) -> AggregatedBars:
+        """Агрегирует базовый буфер (начиная с бакета ``since_ms``) в ``timeframe``."""
+
+        view = self._buffers[symbol][base].view()
+        bucket_ms = timeframe_to_milliseconds(timeframe)
+        lo = 0
+        if since_ms is not None:
+            lo = int(np.searchsorted(view.ts, since_ms - since_ms % bucket_ms, side="left"))
+        bars = aggregate_ohlcv(
+            view.ts[lo:],
+            view.open[lo:],
+            view.high[lo:],
+            view.low[lo:],
+            view.close[lo:],
+            view.volume[lo:],
+            bucket_ms,
+        )
+        # бакет, обрезанный началом буфера, дал бы неверные open/high/low
+        keep = bars.aligned_start()
+        return bars if keep.all() else bars.select(keep)
+
+    async def _refresh_derived(self, spec: SymbolFeedSpec, base: str, since_ms: int) -> None:
+        """Пересобирает бакеты старших tf, затронутые базовыми барами начиная с ``since_ms``."""
+
+        for timeframe in self._derived[(spec.name, base)]:
+            if not self._ready[(spec.name, timeframe)].is_set():
+                continue
+            bars = self._aggregate_base(spec.name, base, timeframe, since_ms=since_ms)
+            batch = CandleBatch.from_columns(bars, spec.name, timeframe, f"agg-{base}")
+            await self._ingest_batch(spec, timeframe, batch)
 
     async def _backfill_symbol(self, spec: SymbolFeedSpec, timeframe: str) -> None:
         key = (spec.name, timeframe)
-        limit = max(spec.backfill_bars, 2000)
+        started = time.perf_counter()
+        limit = self._backfill_limit(spec, timeframe)
         timeframe_ms = timeframe_to_milliseconds(timeframe)
         now_ms = self._rest.milliseconds()
         since = now_ms - timeframe_ms * (limit + 2)
         fetched = 0
 
+        cached_last = await self._load_cached(spec, timeframe, since)
+        if cached_last is not None:
+            # последний бар кэша мог быть незакрытым — перекачиваем его и всё, что после
+            since = cached_last
+            limit = (now_ms - cached_last) // timeframe_ms + 1
+
         while fetched < limit and not self._stop_event.is_set():
             batch_limit = min(1000, limit - fetched)
-            candles = await self._fetch_ohlcv(spec.name, timeframe, limit=batch_limit, since=since)
-            if not candles:
+            candles = await self._fetch_ohlcv(
+                spec.name,
+                timeframe,
+                limit=batch_limit,
+                since=since,
+                priority=RequestPriority.BACKFILL,
+            )
+            if not len(candles):
                 break
-            await self._ingest_records(spec, timeframe, candles, source="rest")
-            fetched = len(self._buffers[spec.name][timeframe])
-            since = int(candles[-1].ts.timestamp() * 1000) + timeframe_ms
+            await self._ingest_batch(spec, timeframe, candles)
+            if cached_last is None:
+                fetched = len(self._buffers[spec.name][timeframe])
+            else:
+                fetched += len(candles)
+            since = int(candles.ts[-1]) + timeframe_ms
             if len(candles) < batch_limit:
                 break
 
+        self.backfill_seconds[key] = time.perf_counter() - started
         self._ready[key].set()
+        self._streaming.add(key)
         self._set_status(spec.name, timeframe, FeedHealthStatus.OK)
         logger.info(
-            "Backfill завершён: %s %s (%s баров)",
+            "Backfill завершён: %s %s (%s баров, кэш=%s) за %.2fs",
             spec.name,
             timeframe,
             len(self._buffers[spec.name][timeframe]),
+            "да" if cached_last is not None else "нет",
+            self.backfill_seconds[key],
         )
 
     async def _subscription_loop(self, spec: SymbolFeedSpec, timeframe: str) -> None:
-        """Основной цикл получения новых свечей."""
+        """Цикл REST-поллинга новых свечей (режим без WebSocket)."""
 
         key = (spec.name, timeframe)
         poll_interval = max(1.0, spec.poll_interval_seconds)
@@ -295,47 +841,44 @@ class MarketDataFeed:
 
         while not self._stop_event.is_set():
             try:
-                if self._use_websocket and self._ws is not None:
-                    await self._consume_ws(spec, timeframe)
-                else:
-                    await self._poll_once(spec, timeframe)
-                    await asyncio.sleep(poll_interval)
+                await self._poll_once(spec, timeframe)
+                await asyncio.sleep(poll_interval)
                 retry_delay = 1.0
             except asyncio.CancelledError:
                 raise
             except Exception as exc:
-                logger.warning(
-                    "Ошибка подписки %s/%s: %s. Переход к REST-поллингу.",
-                    spec.name,
-                    timeframe,
-                    exc,
-                )
-                self._use_websocket = False
+                logger.warning("Ошибка REST-поллинга %s/%s: %s.", spec.name, timeframe, exc)
                 self._set_status(spec.name, timeframe, FeedHealthStatus.DEGRADED)
                 await asyncio.sleep(min(30.0, retry_delay))
                 retry_delay = min(30.0, retry_delay * 2)
 
         self._status[key] = FeedHealthStatus.PAUSED
 
-    async def _consume_ws(self, spec: SymbolFeedSpec, timeframe: str) -> None:
-        """Получение свечей через ccxt.pro."""
+    async def _on_ws_candles(self, symbol: str, timeframe: str, data: List[list[Any]]) -> None:
+        """Свечи из WebSocket-шарда."""
 
-        assert self._ws is not None
-        while not self._stop_event.is_set():
-            data = await self._ws.watch_ohlcv(spec.name, timeframe)
-            candles = self._normalize(data, spec.name, timeframe, source="ws")
-            await self._ingest_records(spec, timeframe, candles, source="ws")
+        spec = self._specs.get(symbol)
+        if spec is None or timeframe not in self._buffers[symbol]:
+            return
+        batch = CandleBatch.from_payload(data, symbol, timeframe, "ws")
+        await self._ingest_batch(spec, timeframe, batch)
+
+    def _on_ws_shard_down(self, shard: WsShard, exc: BaseException) -> None:
+        for symbol, timeframe in shard.keys:
+            self._set_status(symbol, timeframe, FeedHealthStatus.DEGRADED)
+
+    async def _poll_keys(self, keys: tuple[tuple[str, str], ...]) -> None:
+        """REST-мост для ключей упавшего WS-шарда."""
+
+        for symbol, timeframe in keys:
+            await self._poll_once(self._specs[symbol], timeframe)
 
     async def _poll_once(self, spec: SymbolFeedSpec, timeframe: str) -> None:
         """REST-поллинг последней свечи (fallback)."""
 
-        buffer = self._buffers[spec.name][timeframe]
-        last_ts = buffer.last_timestamp()
-        since = None if last_ts is None else int(last_ts.timestamp() * 1000)
+        since = self._buffers[spec.name][timeframe].last_timestamp_ms()
         candles = await self._fetch_ohlcv(spec.name, timeframe, limit=2, since=since)
-        if not candles:
-            return
-        await self._ingest_records(spec, timeframe, candles, source="rest")
+        await self._ingest_batch(spec, timeframe, candles)
 
     async def _fetch_ohlcv(
         self,
@@ -344,8 +887,9 @@ class MarketDataFeed:
         *,
         limit: int,
         since: int | None,
-    ) -> List[CandleRecord]:
-        """Обёртка над ccxt.fetch_ohlcv с back-off."""
+        priority: RequestPriority = RequestPriority.LIVE,
+    ) -> CandleBatch:
+        """Обёртка над ccxt.fetch_ohlcv с общим лимитером биржи и back-off."""
 
         def call() -> List[list[Any]]:
             params: Dict[str, Any] = {"limit": limit}
@@ -354,20 +898,39 @@ class MarketDataFeed:
         retries = 0
         delay = 1.0
         while True:
+            await self._rate_limiter.acquire(ohlcv_weight(limit), priority=priority)
             try:
-                raw = await asyncio.to_thread(call)
-                return self._normalize(raw, symbol, timeframe, source="rest")
+                raw = await self._executor.run(call)
+                return CandleBatch.from_payload(raw, symbol, timeframe, "rest")
             except ccxt.RateLimitExceeded as exc:  # pragma: no cover - зависит от биржи
                 wait_for = min(60.0, delay * (2**retries))
                 logger.warning("Rate limit для %s/%s. Повтор через %.2fs", symbol, timeframe, wait_for)
-                await asyncio.sleep(wait_for)
+                self._rate_limiter.penalize(wait_for)
                 retries += 1
-            except ccxt.NetworkError as exc:
+            except (ccxt.NetworkError, ExchangeCallTimeout) as exc:
                 wait_for = min(60.0, delay * (2**retries))
                 logger.warning("Сетевая ошибка %s/%s: %s. Retrying через %.2fs", symbol, timeframe, exc, wait_for)
                 await asyncio.sleep(wait_for + random.uniform(0, 1))
                 retries += 1
 
+    async def _ingest_batch(self, spec: SymbolFeedSpec, timeframe: str, batch: CandleBatch) -> None:
+        """Обновляет буфер пакетом свечей, контролируя дубликаты и разрывы."""
+
+        if not len(batch):
+            return
+        key = (spec.name, timeframe)
+        async with self._locks[key]:
+            buffer = self._buffers[spec.name][timeframe]
+            previous_last = buffer.last_timestamp_ms()
+            await self._append_batch(buffer, batch)
+            self._ready[key].set()
+        if key in self._derived:
+            # с previous_last, чтобы захватить бары, доскачанные при починке разрыва
+            since_ms = int(batch.ts.min())
+            if previous_last is not None:
+                since_ms = min(since_ms, previous_last)
+            await self._refresh_derived(spec, timeframe, since_ms)
+
     async def _ingest_records(
         self,
         spec: SymbolFeedSpec,
@@ -376,80 +939,174 @@ class MarketDataFeed:
         *,
         source: str,
     ) -> None:
-        """Обновляет буфер, контролируя дубликаты и разрывы."""
+        """Совместимость: поштучные записи переводятся в пакет и идут через ``_ingest_batch``."""
 
-        if not records:
-            return
-        key = (spec.name, timeframe)
-        async with self._locks[key]:
-            buffer = self._buffers[spec.name][timeframe]
-            expected_delta = timeframe_to_timedelta(timeframe)
-            for record in records:
-                await self._append_record(buffer, expected_delta, record)
-            self._ready[key].set()
+        batch = CandleBatch.from_records(records, spec.name, timeframe, source)
+        await self._ingest_batch(spec, timeframe, batch)
 
-    async def _append_record(
-        self,
-        buffer: CandleBuffer,
-        expected_delta: timedelta,
-        record: CandleRecord,
-    ) -> None:
-        last_ts = buffer.last_timestamp()
-
-        if last_ts is not None:
-            delta = record.ts - last_ts
-            if delta < expected_delta * 0.5:
-                # дубликат — просто перезапишем последнюю свечу
-                buffer.upsert(record)
-                self._update_health(record.symbol, record.tf, record.ts)
-                return
-            if delta > expected_delta * 1.5:
+    async def _append_batch(self, buffer: CandleBuffer, batch: CandleBatch) -> None:
+        """Вливает пакет в буфер (вызывается под блокировкой ключа).
+
+        Проверки идут по всему пакету массивами: бары не новее последнего (с допуском
+        в полбара) обновляются на месте, новые — дописываются блоками между разрывами
+        через ``CandleBuffer.extend``, разрывы чинит ``_fill_gap``.
+        """
+
+        symbol, timeframe = buffer.symbol, buffer.timeframe
+        timeframe_ms = timeframe_to_milliseconds(timeframe)
+        ts, ohlcv = batch.ts, batch.ohlcv
+        if len(ts) > 1 and (ts[1:] <= ts[:-1]).any():
+            # порядок и уникальность: для повторного ts побеждает последняя версия
+            order = np.argsort(ts, kind="stable")
+            ts, ohlcv = ts[order], ohlcv[:, order]
+            keep = np.append(ts[1:] != ts[:-1], True)
+            ts, ohlcv = ts[keep], ohlcv[:, keep]
+
+        last = buffer.last_timestamp_ms()
+        fresh = 0
+        if last is not None:
+            fresh = int(np.searchsorted(ts, last + timeframe_ms // 2, side="left"))
+            for idx in range(fresh):
+                buffer.upsert_bar(int(ts[idx]), ohlcv[:, idx], batch.source)
+
+        ts, ohlcv = ts[fresh:], ohlcv[:, fresh:]
+        if len(ts):
+            last = buffer.last_timestamp_ms()
+            previous = np.concatenate(([ts[0] if last is None else last], ts[:-1]))
+            cuts = np.flatnonzero(ts - previous > timeframe_ms * 3 // 2).tolist()
+            start = 0
+            for cut in [*cuts, len(ts)]:
+                if cut > start:
+                    self._extend_bars(buffer, ts[start:cut], ohlcv[:, start:cut], batch.source)
+                if cut == len(ts):
+                    break
+                # начало разрыва — предыдущий бар пачки или последний бар буфера
+                gap_start, gap_end = int(previous[cut]), int(ts[cut])
                 logger.warning(
                     "Обнаружен разрыв %s/%s: %s → %s (Δ=%.2f мин)",
-                    record.symbol,
-                    record.tf,
-                    last_ts,
-                    record.ts,
-                    delta.total_seconds() / 60,
+                    symbol,
+                    timeframe,
+                    pd.Timestamp(gap_start, unit="ms", tz=timezone.utc),
+                    pd.Timestamp(gap_end, unit="ms", tz=timezone.utc),
+                    (gap_end - gap_start) / 60_000,
                 )
                 if not self.allow_gap_fill:
-                    raise FeedIntegrityError(f"Gap в свечах {record.symbol}/{record.tf} длиной {delta}.")
-                await self._fill_gap(record.symbol, record.tf, last_ts, record.ts, expected_delta)
+                    delta = pd.Timedelta(gap_end - gap_start, unit="ms")
+                    raise FeedIntegrityError(f"Gap в свечах {symbol}/{timeframe} длиной {delta}.")
+                await self._fill_gap(buffer, gap_start, gap_end)
+                start = cut
 
-        buffer.upsert(record)
-        self._update_health(record.symbol, record.tf, record.ts)
+        self._update_health(symbol, timeframe, int(batch.ts.max()))
 
-    async def _fill_gap(
+    def _extend_bars(
         self,
-        symbol: str,
-        timeframe: str,
-        start: pd.Timestamp,
-        end: pd.Timestamp,
+        buffer: CandleBuffer,
+        ts: np.ndarray,
+        ohlcv: np.ndarray,
+        source: str,
+    ) -> None:
+        """Дописывает непрерывный блок и публикует закрытие предыдущих баров."""
+
+        closed = buffer.last_timestamp_ms()
+        buffer.extend(ts, ohlcv, source)
+        if (buffer.symbol, buffer.timeframe) not in self._streaming:
+            return
+        if closed is not None:
+            self._publish_bar_close(buffer.symbol, buffer.timeframe, closed)
+        for open_ts in ts[:-1].tolist():
+            self._publish_bar_close(buffer.symbol, buffer.timeframe, open_ts)
+
+    async def _append_record(
+        self,
+        buffer: CandleBuffer,
         expected_delta: timedelta,
+        record: CandleRecord,
     ) -> None:
-        """Доскачивает пропущенные бары (gap-policy)."""
+        """Совместимость: одна запись как пакет из одного бара."""
 
+        batch = CandleBatch.from_records([record], record.symbol, record.tf, record.source)
+        await self._append_batch(buffer, batch)
+
+    def _publish_bar_close(self, symbol: str, timeframe: str, open_ts_ms: int) -> None:
+        """Сообщает подписчикам о закрытии бара (только после backfill)."""
+
+        if (symbol, timeframe) not in self._streaming:
+            return
+        self._bar_bus.publish(
+            BarClosedEvent(
+                symbol=symbol,
+                timeframe=timeframe,
+                open_ts_ms=open_ts_ms,
+                close_ts_ms=open_ts_ms + timeframe_to_milliseconds(timeframe),
+                detected_at=time.time(),
+            )
+        )
+
+    async def _fill_gap(self, buffer: CandleBuffer, start_ms: int, end_ms: int) -> None:
+        """Доскачивает бары строго между ``start_ms`` и ``end_ms`` (gap-policy).
+
+        Вызывается из ``_append_batch`` под блокировкой ключа, поэтому не идёт через
+        ``_ingest_batch``: диапазон качается страницами максимального размера и
+        вливается в буфер одной пакетной вставкой.
+        """
+
+        symbol, timeframe = buffer.symbol, buffer.timeframe
         timeframe_ms = timeframe_to_milliseconds(timeframe)
-        since = int(start.timestamp() * 1000 + timeframe_ms)
-        while since < int(end.timestamp() * 1000):
-            missing = await self._fetch_ohlcv(symbol, timeframe, limit=5, since=since)
-            if not missing:
+        missing_bars = (end_ms - start_ms) // timeframe_ms - 1
+        if missing_bars <= 0:
+            return
+
+        started = time.perf_counter()
+        pages: List[CandleBatch] = []
+        since = start_ms + timeframe_ms
+        while since < end_ms and not self._stop_event.is_set():
+            limit = int(min(1000, max(1, (end_ms - since) // timeframe_ms)))
+            page = await self._fetch_ohlcv(
+                symbol,
+                timeframe,
+                limit=limit,
+                since=since,
+                priority=RequestPriority.GAP_FILL,
+            )
+            if not len(page):
                 break
-            spec = SymbolFeedSpec(
-                name=symbol,
-                type="spot",
-                timeframes=(timeframe,),
-                primary_timeframe=timeframe,
-                backfill_bars=len(missing),
-                min_notional=1.0,
-                max_leverage=1.0,
-                quote_precision=0,
-                base_precision=0,
-                min_liquidity_usd=1.0,
-                max_spread_pct=1.0,
+            pages.append(page)
+            since = int(page.ts[-1]) + timeframe_ms
+            if len(page) < limit:
+                break
+
+        ts_ms = np.empty(0, dtype=np.int64)
+        ohlcv = np.empty((5, 0))
+        if pages:
+            ts_ms = np.concatenate([page.ts for page in pages])
+            ohlcv = np.concatenate([page.ohlcv for page in pages], axis=1)
+        inside = (ts_ms > start_ms) & (ts_ms < end_ms)
+        unique_ts, first = np.unique(ts_ms[inside], return_index=True)
+        buffer.extend(unique_ts, ohlcv[:, inside][:, first], source="rest-gap")
+
+        elapsed = time.perf_counter() - started
+        if len(unique_ts) < missing_bars:
+            logger.warning(
+                "Разрыв %s/%s восстановлен частично: %s из %s баров",
+                symbol,
+                timeframe,
+                len(unique_ts),
+                missing_bars,
             )
-            await self._ingest_records(spec, timeframe, missing, source="rest-gap")
-            since = int(missing[-1].ts.timestamp() * 1000 + timeframe_ms)
+        else:
+            logger.info(
+                "Разрыв %s/%s (%s баров) восстановлен за %.2fs, %s запрос(ов)",
+                symbol,
+                timeframe,
+                missing_bars,
+                elapsed,
+                len(pages),
+            )
+        if self.on_gap_repaired:
+            try:
+                self.on_gap_repaired(symbol, timeframe, int(missing_bars), elapsed)
+            except Exception:  # pragma: no cover - обработка пользовательского хука
+                logger.exception("on_gap_repaired вызвал исключение для %s/%s", symbol, timeframe)
 
     def _normalize(
         self,
@@ -459,30 +1116,12 @@ class MarketDataFeed:
         *,
         source: str,
     ) -> List[CandleRecord]:
-        """Преобразует данные ccxt к CandleRecord."""
-
-        records: List[CandleRecord] = []
-        for item in payload:
-            timestamp_ms, open_, high, low, close, volume = item[:6]
-            ts = pd.Timestamp(timestamp_ms, unit="ms", tz=timezone.utc)
-            records.append(
-                CandleRecord(
-                    ts=ts,
-                    open=float(open_),
-                    high=float(high),
-                    low=float(low),
-                    close=float(close),
-                    volume=float(volume),
-                    tf=timeframe,
-                    symbol=symbol,
-                    source=source,
-                )
-            )
-        return records
+        """Преобразует данные ccxt к CandleRecord (совместимость, ingest идёт через ``CandleBatch``)."""
+
+        return CandleBatch.from_payload(payload, symbol, timeframe, source).to_records()
 
-    def _update_health(self, symbol: str, timeframe: str, ts: pd.Timestamp) -> None:
-        drift = datetime.now(timezone.utc) - ts
-        drift_ms = abs(drift.total_seconds() * 1000)
+    def _update_health(self, symbol: str, timeframe: str, ts_ms: int) -> None:
+        drift_ms = abs(time.time() * 1000 - ts_ms)
         status = FeedHealthStatus.OK if drift_ms <= self.health_drift_ms else FeedHealthStatus.DEGRADED
         self._set_status(symbol, timeframe, status)
 
@@ -509,6 +1148,59 @@ class MarketDataFeed:
                 result.setdefault(symbol, {})[timeframe] = buffer.to_frame()
         return result
 
+    def memory_report(self) -> pd.DataFrame:
+        """Память буферов по (symbol, timeframe): бары, ёмкость и байты массивов."""
+
+        rows = [
+            {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "rows": len(buffer),
+                "capacity": 2 * buffer.maxlen,
+                "bytes": buffer.nbytes,
+                "bytes_per_row": buffer.nbytes / (2 * buffer.maxlen),
+                "compact": buffer.compact,
+            }
+            for symbol, timeframes in self._buffers.items()
+            for timeframe, buffer in timeframes.items()
+        ]
+        columns = ["symbol", "timeframe", "rows", "capacity", "bytes", "bytes_per_row", "compact"]
+        return pd.DataFrame(rows, columns=columns)
+
+    def snapshot_views(
+        self,
+        keys: Iterable[tuple[str, str]] | None = None,
+        *,
+        min_bars: int | None = None,
+    ) -> Dict[tuple[str, str], CandleView]:
+        """Возвращает read-only срезы выбранных буферов без копирования.
+
+        ``keys`` — пары ``(symbol, timeframe)``; ``None`` означает все буферы. Каждый срез
+        несёт ``version`` буфера, поэтому потребитель может пропустить неизменившиеся
+        ключи, не материализуя DataFrame.
+        """
+
+        selected = keys if keys is not None else self._locks.keys()
+        result: Dict[tuple[str, str], CandleView] = {}
+        for symbol, timeframe in selected:
+            buffer = self._buffers.get(symbol, {}).get(timeframe)
+            if buffer is None:
+                continue
+            if min_bars is not None and len(buffer) < min_bars:
+                continue
+            result[(symbol, timeframe)] = buffer.view()
+        return result
+
+    def subscribe_bar_closes(
+        self,
+        keys: Iterable[tuple[str, str]] | None = None,
+        *,
+        maxsize: int = 1024,
+    ) -> BarCloseSubscription:
+        """Подписка на события закрытия баров для выбранных ``(symbol, timeframe)``."""
+
+        return self._bar_bus.subscribe(keys, maxsize=maxsize)
+
     def status(self) -> Dict[str, Dict[str, FeedHealthStatus]]:
         """Возвращает словарь статусов по символам и таймфреймам."""
 
@@ -527,3 +1219,17 @@ class MarketDataFeed:
             return True
         except asyncio.TimeoutError:
             return False
+
+
+__all__ = [
+    "CandleBatch",
+    "CandleBuffer",
+    "CandleRecord",
+    "CandleView",
+    "FeedHealthStatus",
+    "FeedIntegrityError",
+    "MarketDataFeed",
+    "SymbolFeedSpec",
+    # переехал в timeframes; реэкспорт для старых импортов из feed
+    "timeframe_to_timedelta",
+]
@@ -0,0 +1,168 @@
+"""Выборочная проверка признаков на look-ahead с ограниченной стоимостью.
+
+``FeatureEngineer.ensure_no_lookahead`` пересобирает все признаки на ``iloc[:-1]`` и
+удваивает стоимость расчёта, поэтому в бою не используется. ``LookaheadVerifier``
+проверяет одну случайную точку усечения: признаки строки ``t`` сравниваются с
+пересборкой на окне свечей, которое кончается в ``t`` и не содержит более поздних
+баров. Длина окна — прогрев, после которого EMA забывает точку старта с
+относительной погрешностью ниже ``rtol``, поэтому стоимость проверки не зависит
+от длины буфера и совпадает для ``build()`` и потокового режима.
+
+Бюджет задаётся долей времени расчёта признаков: каждый расчёт начисляет
+``budget × elapsed`` секунд, проверка выполняется при неотрицательном балансе и
+списывает своё фактическое время. В среднем проверки занимают не больше ``budget``
+от времени признаков (плюс одна проверка).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from .features import FeatureConfig, FeatureEngineer
+
+logger = logging.getLogger(__name__)
+
+# EMA со span n забывает стартовое значение как exp(-2k / (n + 1)); 16 (n + 1)
+# баров дают погрешность ~1e-14 относительно цены
+_EMA_WARMUP_FACTOR = 16
+
+
+def warmup_bars(config: FeatureConfig | None = None) -> int:
+    """Длина окна пересборки, после которой признаки не зависят от точки старта."""
+
+    cfg = config or FeatureConfig()
+    windows = (cfg.atr_period, cfg.returns_lag, cfg.volatility_window)
+    return _EMA_WARMUP_FACTOR * (max(cfg.ema_fast, cfg.ema_slow) + 1) + max(windows) + 1
+
+
+def check_truncation_point(
+    candles: pd.DataFrame,
+    features: pd.DataFrame,
+    position: int,
+    config: FeatureConfig | None = None,
+    engineer: FeatureEngineer | None = None,
+    *,
+    rtol: float = 1e-9,
+    atol: float = 1e-12,
+) -> bool:
+    """
+    Проверяет, что строка признаков на баре ``candles.index[position]`` не зависит
+    от более поздних баров.
+
+    Признаки пересчитываются на окне ``warmup_bars`` свечей, кончающемся баром
+    ``position``; строки, которой нет в ``features``, считаются пройденными.
+    """
+
+    timestamp = candles.index[position]
+    if timestamp not in features.index:
+        return True
+    start = max(0, position + 1 - warmup_bars(config))
+    rebuilt = (engineer or FeatureEngineer()).build(
+        candles.iloc[start : position + 1],
+        config=config,
+    )
+    if rebuilt.empty or rebuilt.index[-1] != timestamp:
+        return False
+    if list(rebuilt.columns) != list(features.columns):
+        return False
+    expected = rebuilt.iloc[-1].to_numpy(dtype=np.float64)
+    actual = features.loc[timestamp].to_numpy(dtype=np.float64)
+    return bool(np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True))
+
+
+class LookaheadVerifier:
+    """Проверяет случайные точки усечения в пределах доли времени расчёта признаков."""
+
+    def __init__(
+        self,
+        budget: float = 0.01,
+        *,
+        seed: int | None = None,
+        engineer: FeatureEngineer | None = None,
+        on_metrics: Callable[[str, bool, float], None] | None = None,
+    ) -> None:
+        self.budget = budget
+        self._engineer = engineer or FeatureEngineer()
+        # (таймфрейм, нарушение, длительность проверки в секундах)
+        self.on_metrics = on_metrics
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._credit = 0.0
+        self.checks = 0
+        self.violations = 0
+        self.spent_seconds = 0.0
+
+    def observe(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+        elapsed: float,
+        config: FeatureConfig | None = None,
+    ) -> bool | None:
+        """
+        Учитывает расчёт признаков длительностью ``elapsed`` и, если бюджет позволяет,
+        проверяет одну случайную точку усечения.
+
+        Возвращает результат проверки или ``None``, если проверка не выполнялась.
+        """
+
+        if self.budget <= 0 or features.empty:
+            return None
+        with self._lock:
+            self._credit += self.budget * max(elapsed, 0.0)
+            if self._credit < 0:
+                return None
+            # до конца прогрева окно упирается в начало кадра, а потоковые признаки
+            # после усечения буфера помнят более раннюю историю
+            warmup = warmup_bars(config)
+            low = max(0, len(candles) - len(features))
+            if len(candles) > warmup:
+                low = max(low, warmup - 1)
+            position = int(self._rng.integers(low, len(candles)))
+        started = time.perf_counter()
+        passed = check_truncation_point(
+            candles,
+            features,
+            position,
+            config=config,
+            engineer=self._engineer,
+        )
+        spent = time.perf_counter() - started
+        with self._lock:
+            self._credit -= spent
+            self.spent_seconds += spent
+            self.checks += 1
+            if not passed:
+                self.violations += 1
+        if not passed:
+            logger.warning(
+                "Look-ahead в признаках %s %s на баре %s",
+                symbol,
+                timeframe,
+                candles.index[position],
+            )
+        self._report(timeframe, not passed, spent)
+        return passed
+
+    def _report(self, timeframe: str, violated: bool, seconds: float) -> None:
+        if self.on_metrics is None:
+            return
+        try:
+            self.on_metrics(timeframe, violated, seconds)
+        except Exception:  # pragma: no cover - обработка пользовательского хука
+            logger.exception("on_metrics проверки look-ahead вызвал исключение")
+
+
+__all__ = [
+    "LookaheadVerifier",
+    "check_truncation_point",
+    "warmup_bars",
+]
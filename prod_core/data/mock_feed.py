@@ -4,13 +4,23 @@ from __future__ import annotations
 
 import asyncio
 import random
+import time
 from collections import defaultdict
 from datetime import datetime, timezone
 from typing import Dict, Iterable, Tuple
 
 import pandas as pd
 
-from .feed import FeedHealthStatus, SymbolFeedSpec, timeframe_to_timedelta
+from .events import BarCloseBus, BarClosedEvent, BarCloseSubscription
+from .feed import (
+    CandleBuffer,
+    CandleRecord,
+    CandleView,
+    FeedHealthStatus,
+    SymbolFeedSpec,
+    timeframe_to_milliseconds,
+    timeframe_to_timedelta,
+)
 
 
 class MockMarketDataFeed:
@@ -25,17 +35,17 @@ class MockMarketDataFeed:
         self.symbols = tuple(symbols)
         self._rng = random.Random(seed)
 
-        self._buffers: Dict[str, Dict[str, pd.DataFrame]] = defaultdict(dict)
+        self._buffers: Dict[str, Dict[str, CandleBuffer]] = defaultdict(dict)
         self._ready: Dict[Tuple[str, str], asyncio.Event] = {}
         self._status: Dict[Tuple[str, str], FeedHealthStatus] = {}
         self._last_price: Dict[Tuple[str, str], float] = {}
         self._last_ts: Dict[Tuple[str, str], pd.Timestamp] = {}
-        self._max_bars: Dict[Tuple[str, str], int] = {}
         self._poll_interval: Dict[Tuple[str, str], float] = {}
         self._phase: Dict[Tuple[str, str], int] = {}
 
         self._running = False
         self._producer_task: asyncio.Task[None] | None = None
+        self._bar_bus = BarCloseBus()
 
         self._initialize_buffers()
 
@@ -85,24 +95,25 @@ class MockMarketDataFeed:
                         volumes.append(self._rng.uniform(18_000, 35_000) * (1 + 0.05 * phase))
                 volumes = pd.Series(volumes, index=index)
 
-                frame = pd.DataFrame(
-                    {
-                        "open": opens,
-                        "high": highs,
-                        "low": lows,
-                        "close": closes,
-                        "volume": volumes,
-                        "tf": timeframe,
-                        "symbol": spec.name,
-                        "source": "mock",
-                    }
-                )
-                frame.index.name = "ts"
-
-                self._buffers[spec.name][timeframe] = frame
+                buffer = CandleBuffer(spec.name, timeframe, maxlen=max(20, spec.backfill_bars))
+                for ts, open_, high, low, close, volume in zip(index, opens, highs, lows, closes, volumes):
+                    buffer.upsert(
+                        CandleRecord(
+                            ts=ts,
+                            open=float(open_),
+                            high=float(high),
+                            low=float(low),
+                            close=float(close),
+                            volume=float(volume),
+                            tf=timeframe,
+                            symbol=spec.name,
+                            source="mock",
+                        )
+                    )
+
+                self._buffers[spec.name][timeframe] = buffer
                 self._last_price[key] = float(closes.iloc[-1])
                 self._last_ts[key] = index[-1]
-                self._max_bars[key] = max(20, spec.backfill_bars)
                 poll = max(0.1, min(1.0, spec.poll_interval_seconds))
                 self._poll_interval[key] = poll
                 self._phase[key] = 0
@@ -127,6 +138,7 @@ class MockMarketDataFeed:
 
     async def stop(self) -> None:
         self._running = False
+        self._bar_bus.close()
         if self._producer_task is not None:
             self._producer_task.cancel()
             try:
@@ -172,26 +184,32 @@ class MockMarketDataFeed:
         low = min(open_, close) * (1 - abs(spike) * 0.4)
         volume = self._rng.uniform(15_000, 32_000) * (1 + abs(spike) * 5)
 
-        frame = self._buffers[symbol][timeframe]
-        new_row = pd.DataFrame(
-            {
-                "open": [open_],
-                "high": [high],
-                "low": [low],
-                "close": [close],
-                "volume": [volume],
-                "tf": [timeframe],
-                "symbol": [symbol],
-                "source": ["mock"],
-            },
-            index=pd.Index([next_ts], name="ts"),
+        self._buffers[symbol][timeframe].upsert(
+            CandleRecord(
+                ts=next_ts,
+                open=open_,
+                high=high,
+                low=low,
+                close=close,
+                volume=volume,
+                tf=timeframe,
+                symbol=symbol,
+                source="mock",
+            )
         )
-        self._buffers[symbol][timeframe] = pd.concat([frame, new_row])
-        if len(self._buffers[symbol][timeframe]) > self._max_bars[key]:
-            self._buffers[symbol][timeframe] = self._buffers[symbol][timeframe].iloc[-self._max_bars[key] :]
 
         self._last_price[key] = close
         self._last_ts[key] = next_ts
+        closed_ms = int(last_ts.timestamp() * 1000)
+        self._bar_bus.publish(
+            BarClosedEvent(
+                symbol=symbol,
+                timeframe=timeframe,
+                open_ts_ms=closed_ms,
+                close_ts_ms=closed_ms + timeframe_to_milliseconds(timeframe),
+                detected_at=time.time(),
+            )
+        )
         self._status[key] = FeedHealthStatus.OK
         self._phase[key] = phase + 1
 
@@ -200,12 +218,41 @@ class MockMarketDataFeed:
 
         result: Dict[str, Dict[str, pd.DataFrame]] = {}
         for symbol, timeframes in self._buffers.items():
-            for timeframe, frame in timeframes.items():
-                if min_bars is not None and len(frame) < min_bars:
+            for timeframe, buffer in timeframes.items():
+                if min_bars is not None and len(buffer) < min_bars:
                     continue
-                result.setdefault(symbol, {})[timeframe] = frame.copy()
+                result.setdefault(symbol, {})[timeframe] = buffer.to_frame()
         return result
 
+    def snapshot_views(
+        self,
+        keys: Iterable[Tuple[str, str]] | None = None,
+        *,
+        min_bars: int | None = None,
+    ) -> Dict[Tuple[str, str], CandleView]:
+        """Возвращает read-only срезы буферов, аналогично реальному фиду."""
+
+        selected = keys if keys is not None else self._status.keys()
+        result: Dict[Tuple[str, str], CandleView] = {}
+        for symbol, timeframe in selected:
+            buffer = self._buffers.get(symbol, {}).get(timeframe)
+            if buffer is None:
+                continue
+            if min_bars is not None and len(buffer) < min_bars:
+                continue
+            result[(symbol, timeframe)] = buffer.view()
+        return result
+
+    def subscribe_bar_closes(
+        self,
+        keys: Iterable[Tuple[str, str]] | None = None,
+        *,
+        maxsize: int = 1024,
+    ) -> BarCloseSubscription:
+        """Подписка на события закрытия синтетических баров."""
+
+        return self._bar_bus.subscribe(keys, maxsize=maxsize)
+
     def status(self) -> Dict[str, Dict[str, FeedHealthStatus]]:
         stats: Dict[str, Dict[str, FeedHealthStatus]] = {}
         for (symbol, timeframe), status in self._status.items():
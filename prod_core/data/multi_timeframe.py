@@ -0,0 +1,333 @@
+"""Признаки старших таймфреймов на индексе младшего (as-of join без look-ahead).
+
+Строка признаков ``FeatureEngineer`` с меткой ``L`` использует только бары, закрытые
+к моменту ``L`` (сдвиг на один бар). Поэтому строке младшего таймфрейма с меткой
+``t`` можно отдать строку старшего с наибольшей меткой ``L ≤ t``: это признаки на
+последний закрытый старший бар, известные уже в момент ``t``. Колонки старшего
+таймфрейма получают суффикс ``_<timeframe>`` (``ema_fast_15m``); строки младшего без
+старшего контекста отбрасываются, как ``dropna`` в ``build()``.
+
+В живом цикле объединённый кадр включается ``FEATURES_JOIN_HIGHER_TF=1``:
+``FeatureLoaderTool`` кладёт его в словарь признаков под ключом ``joined_key(tf)``,
+и стратегии получают его вместо признаков одного таймфрейма.
+
+``MultiTimeframeJoiner`` держит результат по символу в растущем буфере и на новом
+баре ищет as-of позиции только для добавленных строк (``searchsorted``), а кадр
+возвращает срезом буфера без копии — стоимость на бар не зависит от длины истории.
+Правка уже учтённых строк или запоздавший старший бар, который перекрыл бы
+объединённые строки, приводят к полной пересборке.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .features import FeatureConfig, FeatureEngineer
+from .timeframes import timeframe_to_milliseconds
+
+
+def joined_key(timeframe: str) -> str:
+    """Ключ объединённого кадра базового ``timeframe`` в словаре признаков символа."""
+
+    return f"{timeframe}+htf"
+
+
+def asof_positions(index: pd.DatetimeIndex, higher_index: pd.DatetimeIndex) -> np.ndarray:
+    """Позиция строки ``higher_index`` с наибольшей меткой ``≤`` каждой метки ``index``.
+
+    ``-1`` — у строки нет старшего контекста.
+    """
+
+    return np.searchsorted(higher_index.asi8, index.asi8, side="right") - 1
+
+
+def _higher_timeframes(
+    base_timeframe: str,
+    features: Dict[str, pd.DataFrame],
+    timeframes: Sequence[str] | None,
+) -> List[str]:
+    base_ms = timeframe_to_milliseconds(base_timeframe)
+    candidates = timeframes if timeframes is not None else list(features)
+    selected = [
+        timeframe
+        for timeframe in candidates
+        if timeframe in features and timeframe_to_milliseconds(timeframe) > base_ms
+    ]
+    return sorted(selected, key=timeframe_to_milliseconds)
+
+
+def _joined_columns(base: pd.DataFrame, higher: Dict[str, pd.DataFrame]) -> List[str]:
+    columns = [str(column) for column in base.columns]
+    for timeframe, frame in higher.items():
+        columns.extend(f"{column}_{timeframe}" for column in frame.columns)
+    return columns
+
+
+def join_asof(base: pd.DataFrame, higher: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Пакетное as-of объединение признаков ``base`` со старшими таймфреймами ``higher``."""
+
+    columns = _joined_columns(base, higher)
+    positions = [asof_positions(base.index, frame.index) for frame in higher.values()]
+    keep = np.ones(len(base), dtype=bool)
+    for rows in positions:
+        keep &= rows >= 0
+    blocks = [base.to_numpy(dtype=np.float64)[keep]]
+    for frame, rows in zip(higher.values(), positions):
+        blocks.append(frame.to_numpy(dtype=np.float64)[rows[keep]])
+    values = np.hstack(blocks)
+    return pd.DataFrame(values, index=base.index[keep], columns=columns)
+
+
+@dataclass(slots=True)
+class _HigherSnapshot:
+    """Старший кадр, с которым объединялись строки, и копия его меток и значений."""
+
+    frame: pd.DataFrame
+    ts: np.ndarray
+    values: np.ndarray
+
+
+@dataclass(slots=True)
+class _JoinState:
+    """Буфер объединённых строк символа и входы, с которыми он сверяется."""
+
+    timeframes: Tuple[str, ...]
+    base_columns: pd.Index
+    columns: List[str]
+    values: np.ndarray
+    ts: np.ndarray
+    start: int
+    end: int
+    # первая строка младшего таймфрейма со старшим контекстом
+    context_ts: int
+    base_last: np.ndarray
+    higher: Dict[str, _HigherSnapshot] = field(default_factory=dict)
+    result: pd.DataFrame | None = None
+
+
+class MultiTimeframeJoiner:
+    """Инкрементальный as-of join признаков старших таймфреймов по символам."""
+
+    def __init__(self, timeframes: Sequence[str] | None = None) -> None:
+        # None — все таймфреймы из словаря признаков старше базового
+        self.timeframes = tuple(timeframes) if timeframes is not None else None
+        self._states: Dict[Tuple[str, str], _JoinState] = {}
+        self.rebuilds = 0
+        self.rows_appended = 0
+
+    def update(
+        self,
+        symbol: str,
+        base_timeframe: str,
+        features: Dict[str, pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Признаки ``base_timeframe`` с колонками старших таймфреймов из ``features``
+        (``{timeframe: DataFrame}``, как в ``FeatureEngineer.build_map``).
+
+        Как и у потоковых признаков, история младшего таймфрейма считается
+        неизменной, пока совпадают метки и последняя объединённая строка; старший
+        кадр, отличный от прошлого объекта, сверяется целиком (он короче в разы).
+        На такой истории результат совпадает с ``join_asof``. Кадр разделяет память
+        с внутренним буфером: изменять его на месте нельзя.
+        """
+
+        base = features[base_timeframe]
+        names = _higher_timeframes(base_timeframe, features, self.timeframes)
+        higher = {timeframe: features[timeframe] for timeframe in names}
+        key = (symbol, base_timeframe)
+        if base.empty or any(frame.empty for frame in higher.values()):
+            self._states.pop(key, None)
+            return join_asof(base, higher)
+        state = self._states.get(key)
+        if state is None or not self._extend(state, base, higher):
+            state = self._rebuild(base, higher)
+            self._states[key] = state
+        assert state.result is not None
+        return state.result
+
+    def reset(self) -> None:
+        """Сбрасывает состояние всех символов."""
+
+        self._states.clear()
+
+    def _rebuild(self, base: pd.DataFrame, higher: Dict[str, pd.DataFrame]) -> _JoinState:
+        self.rebuilds += 1
+        joined = join_asof(base, higher)
+        size = len(joined)
+        values = np.empty((max(2 * size, 64), len(joined.columns)))
+        values[:size] = joined.to_numpy()
+        ts = np.empty(len(values), dtype=np.int64)
+        ts[:size] = joined.index.asi8
+        state = _JoinState(
+            timeframes=tuple(higher),
+            base_columns=base.columns,
+            columns=list(joined.columns),
+            values=values,
+            ts=ts,
+            start=0,
+            end=size,
+            context_ts=int(ts[0]) if size else np.iinfo(np.int64).max,
+            base_last=values[size - 1, : base.shape[1]].copy() if size else np.empty(0),
+        )
+        for timeframe, frame in higher.items():
+            state.higher[timeframe] = self._snapshot(frame)
+        self._publish(state, joined.index)
+        return state
+
+    def _extend(
+        self,
+        state: _JoinState,
+        base: pd.DataFrame,
+        higher: Dict[str, pd.DataFrame],
+    ) -> bool:
+        """Дописывает новые строки младшего таймфрейма; ``False`` — нужна пересборка."""
+
+        if state.timeframes != tuple(higher) or state.end == state.start:
+            return False
+        if not base.columns.equals(state.base_columns):
+            return False
+        base_ts = base.index.asi8
+        last = state.ts[state.end - 1]
+        position = int(np.searchsorted(base_ts, last))
+        if position >= len(base_ts) or base_ts[position] != last:
+            return False
+        # строки буфера — ровно строки base от первой со старшим контекстом до last
+        first = int(np.searchsorted(base_ts, state.context_ts))
+        if first > position:
+            return False
+        kept = state.ts[state.start : state.end]
+        offset = int(np.searchsorted(kept, base_ts[first]))
+        if offset >= len(kept) or kept[offset] != base_ts[first]:
+            return False
+        if len(kept) - offset != position - first + 1:
+            return False
+        tail = base.iloc[position:].to_numpy(dtype=np.float64)
+        if not np.array_equal(tail[0], state.base_last, equal_nan=True):
+            return False
+
+        snapshots: List[_HigherSnapshot] = []
+        context = np.iinfo(np.int64).min
+        for timeframe, frame in higher.items():
+            snapshot = state.higher[timeframe]
+            if frame is not snapshot.frame:
+                if not frame.columns.equals(snapshot.frame.columns):
+                    return False
+                current = self._snapshot(frame)
+                if not self._same_history(snapshot, current, int(last)):
+                    return False
+                snapshot = current
+            # контекст должен покрывать первую строку буфера...
+            if snapshot.ts[0] > base_ts[first]:
+                return False
+            context = max(context, int(snapshot.ts[0]))
+            snapshots.append(snapshot)
+        # ...и не появляться раньше неё, иначе пакетный join оставил бы больше строк
+        if first > 0 and context <= base_ts[first - 1]:
+            return False
+
+        new_ts = base_ts[position + 1 :]
+        state.start += offset
+        for timeframe, snapshot in zip(higher, snapshots):
+            state.higher[timeframe] = snapshot
+        if len(new_ts):
+            blocks = [tail[1:]]
+            for snapshot in snapshots:
+                rows = np.searchsorted(snapshot.ts, new_ts, side="right") - 1
+                blocks.append(snapshot.values[rows])
+            self._append(state, np.hstack(blocks), new_ts)
+            state.base_last = tail[-1].copy()
+        elif offset == 0 and state.result is not None:
+            return True
+        self._publish(state, base.index[first:])
+        return True
+
+    @staticmethod
+    def _same_history(previous: _HigherSnapshot, current: _HigherSnapshot, last: int) -> bool:
+        """Старшие строки с метками ``≤ last`` (включая запоздавшие) не изменились."""
+
+        cut = int(np.searchsorted(current.ts, last, side="right"))
+        origin = int(np.searchsorted(previous.ts, current.ts[0]))
+        if origin + cut != int(np.searchsorted(previous.ts, last, side="right")):
+            return False
+        if not np.array_equal(previous.ts[origin : origin + cut], current.ts[:cut]):
+            return False
+        stored = previous.values[origin : origin + cut]
+        return np.array_equal(stored, current.values[:cut], equal_nan=True)
+
+    def _append(self, state: _JoinState, rows: np.ndarray, ts: np.ndarray) -> None:
+        count = len(rows)
+        if state.end + count > len(state.values):
+            # уплотнение: живые строки в начало нового буфера с запасом вдвое
+            live = state.end - state.start
+            capacity = max(2 * (live + count), 64)
+            values = np.empty((capacity, state.values.shape[1]))
+            values[:live] = state.values[state.start : state.end]
+            stamps = np.empty(capacity, dtype=np.int64)
+            stamps[:live] = state.ts[state.start : state.end]
+            state.values, state.ts = values, stamps
+            state.start, state.end = 0, live
+        state.values[state.end : state.end + count] = rows
+        state.ts[state.end : state.end + count] = ts
+        state.end += count
+        self.rows_appended += count
+
+    @staticmethod
+    def _snapshot(frame: pd.DataFrame) -> _HigherSnapshot:
+        values = frame.to_numpy(dtype=np.float64, copy=True)
+        return _HigherSnapshot(frame=frame, ts=frame.index.asi8.copy(), values=values)
+
+    @staticmethod
+    def _publish(state: _JoinState, index: pd.Index) -> None:
+        # строки буфера уже не переписываются: срез безопасно отдавать без копии
+        state.result = pd.DataFrame(
+            state.values[state.start : state.end],
+            index=index,
+            columns=state.columns,
+            copy=False,
+        )
+
+    @staticmethod
+    def ensure_no_lookahead(
+        candles: Dict[str, pd.DataFrame],
+        joined: pd.DataFrame,
+        base_timeframe: str,
+        config: FeatureConfig | None = None,
+    ) -> bool:
+        """Проверяет, что пересборка на свечах до последнего бара даёт те же строки.
+
+        Свечи всех таймфреймов (те же, из которых строился ``joined``) усекаются до
+        меток строго раньше последней строки; признаки пересчитываются ``build()`` и
+        объединяются заново.
+        """
+
+        if len(joined) < 2:
+            return True
+        cutoff = joined.index[-1]
+        engineer = FeatureEngineer()
+        rebuilt_features = {
+            timeframe: engineer.build(frame.loc[frame.index < cutoff], config=config)
+            for timeframe, frame in candles.items()
+        }
+        names = _higher_timeframes(base_timeframe, rebuilt_features, None)
+        rebuilt = join_asof(
+            rebuilt_features[base_timeframe],
+            {timeframe: rebuilt_features[timeframe] for timeframe in names},
+        )
+        expected = joined.iloc[:-1]
+        common = expected.index.intersection(rebuilt.index)
+        if len(common) == 0:
+            return False
+        return expected.loc[common].equals(rebuilt.loc[common])
+
+
+__all__ = [
+    "MultiTimeframeJoiner",
+    "asof_positions",
+    "join_asof",
+    "joined_key",
+]
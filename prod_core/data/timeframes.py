@@ -0,0 +1,26 @@
+"""Преобразования строковых таймфреймов CCXT."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+
+def timeframe_to_timedelta(timeframe: str) -> timedelta:
+    """Преобразует строковый таймфрейм CCXT к timedelta."""
+
+    unit = timeframe[-1]
+    value = int(timeframe[:-1])
+    mapping = {
+        "m": timedelta(minutes=value),
+        "h": timedelta(hours=value),
+        "d": timedelta(days=value),
+    }
+    if unit not in mapping:
+        raise ValueError(f"Неподдерживаемый таймфрейм: {timeframe}")
+    return mapping[unit]
+
+
+def timeframe_to_milliseconds(timeframe: str) -> int:
+    """Возвращает длительность таймфрейма в миллисекундах."""
+
+    return int(timeframe_to_timedelta(timeframe).total_seconds() * 1000)
@@ -0,0 +1,219 @@
+"""Мультиплексированные WebSocket-подписки на OHLCV для всей вселенной символов.
+
+Подписки ``(symbol, timeframe)`` раскладываются по ограниченному числу соединений
+(шардов). Если биржа умеет ``watchOHLCVForSymbols``, шард держит одну мульти-подписку,
+иначе — пачку ``watch_ohlcv`` на одном клиенте. Ошибка шарда переподключает только
+его: остальные соединения продолжают работать, а ключи упавшего шарда на время
+back-off добираются REST-поллингом.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import ccxt  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+# сбои соединения и биржи: шард переподключается, ошибки кода в обработчиках — всплывают
+_CONNECTION_ERRORS = (ccxt.NetworkError, ccxt.ExchangeError, OSError)
+
+
+@dataclass(slots=True)
+class WsShard:
+    """Группа подписок, обслуживаемая одним соединением."""
+
+    index: int
+    keys: Tuple[Key, ...]
+    connects: int = 0
+    failures: int = 0
+    connected: bool = False
+    backoff: float = 1.0
+    last_error: str | None = field(default=None)
+
+
+def plan_shards(
+    keys: Sequence[Key], max_connections: int, streams_per_connection: int
+) -> List[WsShard]:
+    """Делит ключи на непрерывные группы; границы шардов — только между символами.
+
+    Все таймфреймы символа попадают в один шард: обрыв соединения не оставляет символ
+    наполовину на WebSocket, наполовину на REST.
+    """
+
+    ordered = sorted(set(keys))
+    if not ordered:
+        return []
+    count = max(1, min(max_connections, math.ceil(len(ordered) / max(1, streams_per_connection))))
+    if len(ordered) > count * streams_per_connection:
+        logger.warning(
+            "Подписок %s больше лимита %s×%s — шарды будут переполнены.",
+            len(ordered),
+            count,
+            streams_per_connection,
+        )
+    groups: Dict[str, List[Key]] = {}
+    for key in ordered:
+        groups.setdefault(key[0], []).append(key)
+    # символ целиком уходит в шард, на долю которого приходится его первый ключ
+    buckets: List[List[Key]] = [[] for _ in range(count)]
+    offset = 0
+    for group in groups.values():
+        buckets[offset * count // len(ordered)].extend(group)
+        offset += len(group)
+    return [
+        WsShard(index=index, keys=tuple(bucket))
+        for index, bucket in enumerate(bucket for bucket in buckets if bucket)
+    ]
+
+
+def supports_multi_watch(client: Any) -> bool:
+    has = getattr(client, "has", None) or {}
+    return bool(has.get("watchOHLCVForSymbols")) and hasattr(client, "watch_ohlcv_for_symbols")
+
+
+class WebSocketManager:
+    """Держит шарды WebSocket-подписок и переподключает их независимо."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        keys: Sequence[Key],
+        on_candles: Callable[[str, str, List[list[Any]]], Awaitable[None]],
+        *,
+        max_connections: int = 4,
+        streams_per_connection: int = 100,
+        on_shard_down: Callable[[WsShard, BaseException], None] | None = None,
+        poll_keys: Callable[[Tuple[Key, ...]], Awaitable[None]] | None = None,
+        max_backoff: float = 30.0,
+        close_timeout: float = 5.0,
+    ) -> None:
+        self.client_factory = client_factory
+        self.on_candles = on_candles
+        self.on_shard_down = on_shard_down
+        self.poll_keys = poll_keys
+        self.max_backoff = max_backoff
+        self.close_timeout = close_timeout
+        self.shards = plan_shards(keys, max_connections, streams_per_connection)
+        self._stop_event = asyncio.Event()
+
+    async def run(self) -> None:
+        """Запускает все шарды и ждёт их завершения (``stop`` или отмена)."""
+
+        self._stop_event.clear()
+        tasks = [
+            asyncio.create_task(self._run_shard(shard), name=f"feed-ws-shard-{shard.index}")
+            for shard in self.shards
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    async def _run_shard(self, shard: WsShard) -> None:
+        shard.backoff = 1.0
+        while not self._stop_event.is_set():
+            client = self.client_factory()
+            shard.connects += 1
+            try:
+                await self._consume(shard, client)
+            except _CONNECTION_ERRORS as exc:
+                shard.connected = False
+                shard.failures += 1
+                shard.last_error = str(exc)
+                logger.warning(
+                    "WS-шард %s (%s подписок) упал: %s. Переподключение через %.1fs.",
+                    shard.index,
+                    len(shard.keys),
+                    exc,
+                    shard.backoff,
+                )
+                if self.on_shard_down:
+                    self.on_shard_down(shard, exc)
+                await self._bridge_with_rest(shard, shard.backoff)
+                shard.backoff = min(self.max_backoff, shard.backoff * 2)
+            finally:
+                shard.connected = False
+                await self._close(client)
+
+    async def _bridge_with_rest(self, shard: WsShard, delay: float) -> None:
+        """Пока шард в back-off, его ключи обновляются через REST."""
+
+        if self.poll_keys is not None:
+            try:
+                await self.poll_keys(shard.keys)
+            except _CONNECTION_ERRORS as exc:  # pragma: no cover - REST тоже может отказать
+                logger.warning("REST-поллинг шарда %s не удался: %s", shard.index, exc)
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _consume(self, shard: WsShard, client: Any) -> None:
+        multi = supports_multi_watch(client)
+        pairs = [[symbol, timeframe] for symbol, timeframe in shard.keys]
+        pending: Dict[asyncio.Task[Any], Key | None] = {}
+
+        def arm(key: Key | None) -> None:
+            if key is None:
+                task = asyncio.create_task(client.watch_ohlcv_for_symbols(pairs))
+            else:
+                task = asyncio.create_task(client.watch_ohlcv(*key))
+            pending[task] = key
+
+        if multi:
+            arm(None)
+        else:
+            for key in shard.keys:
+                arm(key)
+
+        try:
+            while not self._stop_event.is_set():
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    watched = pending.pop(task)
+                    result = task.result()
+                    if not shard.connected:
+                        # первые данные после переподключения: шард здоров, back-off с начала
+                        shard.connected = True
+                        shard.backoff = 1.0
+                    if watched is None:
+                        for symbol, by_timeframe in (result or {}).items():
+                            for timeframe, candles in by_timeframe.items():
+                                await self.on_candles(symbol, timeframe, candles)
+                    else:
+                        await self.on_candles(watched[0], watched[1], result)
+                    arm(watched)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _close(self, client: Any) -> None:
+        """Закрывает клиента, не дожидаясь рукопожатия дольше ``close_timeout``."""
+
+        close = getattr(client, "close", None)
+        if close is None:
+            return
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await asyncio.wait_for(result, timeout=self.close_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("WS-клиент не закрылся за %.1fs", self.close_timeout)
+        except Exception:  # pragma: no cover - закрытие соединения
+            logger.exception("Ошибка закрытия WS-клиента")
+
+
+__all__ = ["WebSocketManager", "WsShard", "plan_shards", "supports_multi_watch"]
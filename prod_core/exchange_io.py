@@ -0,0 +1,244 @@
+"""Выделенный пул потоков для блокирующих вызовов ccxt.
+
+``asyncio.to_thread`` делит дефолтный executor со всем процессом: медленная биржа
+занимает его потоки, и ждать начинают посторонние задачи (выгрузка DAO, запись кэша).
+``ExchangeExecutor`` — отдельный ограниченный пул на биржу: размер выводится из
+rate-limit бюджета, глубина очереди и ожидание в ней отдаются в телеметрию, а
+зависшие вызовы снимаются по таймауту. Поток Python прервать нельзя, поэтому
+вызывающий код освобождается сразу, а поток досчитывается в фоне; если зависли все
+потоки пула, пул заменяется новым, и очередь переезжает в него.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from prod_core.rate_limit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Типичная задержка REST-ответа биржи: по закону Литтла пул ≈ rate × latency.
+DEFAULT_CALL_LATENCY = 0.3
+MIN_WORKERS = 2
+MAX_WORKERS = 16
+
+
+class ExchangeCallTimeout(TimeoutError):
+    """Вызов биржи не уложился в таймаут (в очереди или в работе)."""
+
+
+def workers_for_budget(rate: float, latency: float = DEFAULT_CALL_LATENCY) -> int:
+    """Размер пула, достаточный, чтобы выбрать бюджет ``rate`` запросов/с."""
+
+    return max(MIN_WORKERS, min(MAX_WORKERS, math.ceil(rate * latency)))
+
+
+class _Call:
+    __slots__ = ("generation", "started", "finished", "abandoned")
+
+    def __init__(self, generation: int) -> None:
+        self.generation = generation
+        self.started: float | None = None
+        self.finished = False
+        self.abandoned = False
+
+
+class ExchangeExecutor:
+    """Ограниченный пул потоков для синхронного клиента одной биржи."""
+
+    def __init__(
+        self,
+        exchange_id: str,
+        max_workers: int | None = None,
+        *,
+        call_timeout: float = 30.0,
+        on_metrics: Callable[[str, int, float, int], None] | None = None,
+    ) -> None:
+        self.exchange_id = exchange_id
+        self.max_workers = max_workers or workers_for_budget(get_rate_limiter(exchange_id).rate)
+        self.call_timeout = call_timeout
+        # (exchange_id, глубина очереди, ожидание в очереди, зависшие вызовы)
+        self.on_metrics = on_metrics
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pool = self._new_pool()
+        self._queued = 0
+        self._pool_stuck = 0
+        self.stuck_calls = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.rotations = 0
+        self.wait_seconds = 0.0
+        self.closed = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Вызовы, отправленные в пул и ещё не начатые."""
+
+        with self._lock:
+            return self._queued
+
+    def _new_pool(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"ccxt-{self.exchange_id}-{self._generation}",
+        )
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        /,
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """Выполняет ``fn(*args, **kwargs)`` в пуле биржи с таймаутом ``timeout``."""
+
+        loop = asyncio.get_running_loop()
+        limit = self.call_timeout if timeout is None else timeout
+        submitted = time.perf_counter()
+        deadline = loop.time() + limit
+        while True:
+            call, future = self._submit(fn, args, kwargs)
+            waiter = asyncio.wrap_future(future)
+            try:
+                done, _ = await asyncio.wait({waiter}, timeout=max(0.0, deadline - loop.time()))
+            except asyncio.CancelledError:
+                self._abandon(call, future)
+                raise
+            if not done:
+                self._abandon(call, future)
+                started = time.perf_counter() if call.started is None else call.started
+                self._report(started - submitted)
+                raise ExchangeCallTimeout(
+                    f"{self.exchange_id}: {getattr(fn, '__name__', fn)} не завершился за {limit:.1f}s"
+                )
+            if waiter.cancelled():
+                # пул заменён, пока вызов стоял в очереди, — отправляем в новый
+                with self._lock:
+                    self._queued -= 1
+                continue
+            self._report((call.started or submitted) - submitted)
+            return waiter.result()
+
+    def _submit(self, fn: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> tuple[_Call, Future]:
+        with self._lock:
+            call = _Call(self._generation)
+            pool = self._pool
+            self._queued += 1
+            self.calls += 1
+
+        def work() -> T:
+            with self._lock:
+                self._queued -= 1
+                call.started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    call.finished = True
+                    if call.abandoned:
+                        self.stuck_calls -= 1
+                        if call.generation == self._generation:
+                            self._pool_stuck -= 1
+
+        try:
+            return call, pool.submit(work)
+        except RuntimeError:
+            # пул остановлен через shutdown()
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def _abandon(self, call: _Call, future: Future) -> None:
+        """Снимает вызов: из очереди — отменой, из работы — пометкой зависшего."""
+
+        self.timeouts += 1
+        if future.cancel():
+            with self._lock:
+                self._queued -= 1
+            return
+        rotate = False
+        with self._lock:
+            if call.finished:
+                return
+            call.abandoned = True
+            self.stuck_calls += 1
+            if call.generation == self._generation:
+                self._pool_stuck += 1
+                rotate = self._pool_stuck >= self.max_workers
+        if rotate:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """Все потоки пула заняты зависшими вызовами — поднимаем новый пул."""
+
+        with self._lock:
+            old = self._pool
+            self._generation += 1
+            self._pool = self._new_pool()
+            self._pool_stuck = 0
+            self.rotations += 1
+        logger.warning(
+            "Пул вызовов %s: все %s потоков зависли — пул заменён, очередь перенесена.",
+            self.exchange_id,
+            self.max_workers,
+        )
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def _report(self, wait_seconds: float) -> None:
+        self.wait_seconds += wait_seconds
+        if self.on_metrics is None:
+            return
+        try:
+            self.on_metrics(self.exchange_id, self.queue_depth, wait_seconds, self.stuck_calls)
+        except Exception:  # pragma: no cover - обработка пользовательского хука
+            logger.exception("on_metrics пула %s вызвал исключение", self.exchange_id)
+
+    def shutdown(self) -> None:
+        """Останавливает пул, не дожидаясь зависших потоков."""
+
+        with self._lock:
+            pool = self._pool
+            self.closed = True
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTORS: Dict[str, ExchangeExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_exchange_executor(exchange_id: str) -> ExchangeExecutor:
+    """Возвращает общий пул биржи (создаётся при первом обращении или после ``shutdown``)."""
+
+    key = exchange_id.lower()
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(key)
+        if executor is None or executor.closed:
+            executor = ExchangeExecutor(key)
+            _EXECUTORS[key] = executor
+        return executor
+
+
+def register_exchange_executor(exchange_id: str, executor: ExchangeExecutor) -> None:
+    """Подменяет пул биржи (конфигурация раннера или тесты)."""
+
+    with _EXECUTORS_LOCK:
+        _EXECUTORS[exchange_id.lower()] = executor
+
+
+__all__ = [
+    "ExchangeCallTimeout",
+    "ExchangeExecutor",
+    "get_exchange_executor",
+    "register_exchange_executor",
+    "workers_for_budget",
+]
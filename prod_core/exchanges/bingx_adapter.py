@@ -1,4 +1,3 @@
-import asyncio
 import hmac
 import hashlib
 import inspect
@@ -11,6 +10,9 @@ from typing import Any, Dict, List, Optional, Tuple
 import aiohttp
 import ccxt
 
+from prod_core.exchange_io import ExchangeExecutor, get_exchange_executor
+from prod_core.rate_limit import RateLimiter, get_rate_limiter
+
 try:  # pragma: no cover - optional dependency
     import ccxt.async_support as ccxt_async  # type: ignore
 except ImportError:  # pragma: no cover - fallback when async support is unavailable
@@ -27,26 +29,27 @@ def _env_flag(name: str) -> bool:
 class _SyncExchangeWrapper:
     """Expose synchronous ccxt client via async-friendly interface."""
 
-    def __init__(self, client: Any) -> None:
+    def __init__(self, client: Any, executor: ExchangeExecutor) -> None:
         self._client = client
+        self._executor = executor
 
     def set_sandbox_mode(self, enabled: bool) -> None:
         if hasattr(self._client, "set_sandbox_mode"):
             self._client.set_sandbox_mode(enabled)
 
     async def fetch_positions(self, symbols: Optional[List[str]] = None) -> List[Dict]:
-        return await asyncio.to_thread(self._client.fetch_positions, symbols)
+        return await self._executor.run(self._client.fetch_positions, symbols)
 
     async def fetch_balance(self, params: Optional[Dict] = None) -> Dict:
-        return await asyncio.to_thread(self._client.fetch_balance, params or {})
+        return await self._executor.run(self._client.fetch_balance, params or {})
 
     async def fetch_ticker(self, symbol: str) -> Dict:
-        return await asyncio.to_thread(self._client.fetch_ticker, symbol)
+        return await self._executor.run(self._client.fetch_ticker, symbol)
 
     async def close(self) -> None:
         close_attr = getattr(self._client, "close", None)
         if callable(close_attr):
-            await asyncio.to_thread(close_attr)
+            await self._executor.run(close_attr)
 
 
 class BingXAdapter:
@@ -54,13 +57,25 @@ class BingXAdapter:
     Адаптер для работы с BingX, поддерживающий стандартные и бессрочные фьючерсы.
     """
 
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = False) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        testnet: bool = False,
+        *,
+        rate_limiter: RateLimiter | None = None,
+        executor: ExchangeExecutor | None = None,
+    ) -> None:
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = "https://open-api.bingx.com"
         self._session: aiohttp.ClientSession | None = None
         self._use_virtual = _env_flag("USE_VIRTUAL_TRADING")
         self._virtual_asset = os.getenv("VIRTUAL_ASSET", "VST")
+        # Общий с фидом и брокером лимит REST-запросов BingX
+        self._rate_limiter = rate_limiter or get_rate_limiter("bingx")
+        # Блокирующие вызовы синхронного ccxt — в отдельный пул BingX
+        self._executor = executor or get_exchange_executor("bingx")
 
         # Базовый CCXT клиент
         self.exchange = self._build_exchange(api_key, api_secret, testnet)
@@ -86,7 +101,7 @@ class BingXAdapter:
             return client
 
         client = ccxt.bingx(params)
-        wrapper = _SyncExchangeWrapper(client)
+        wrapper = _SyncExchangeWrapper(client, self._executor)
         wrapper.set_sandbox_mode(use_sandbox)
         return wrapper
 
@@ -163,6 +178,7 @@ class BingXAdapter:
                 params["virtualAccountType"] = self._virtual_asset
                 params["forceVirtual"] = "true"
 
+            await self._rate_limiter.acquire("create_order")
             url, headers = self._sign_request("POST", endpoint, params)
             response = await self._async_request("POST", url, headers)
 
@@ -183,6 +199,7 @@ class BingXAdapter:
     async def get_positions(self, symbol: Optional[str] = None) -> List[Dict]:
         """Получить открытые позиции."""
         try:
+            await self._rate_limiter.acquire("fetch_positions")
             if symbol:
                 positions = await self.exchange.fetch_positions([symbol])
             else:
@@ -198,6 +215,7 @@ class BingXAdapter:
     async def get_balance(self) -> Dict:
         """Получить баланс аккаунта."""
         try:
+            await self._rate_limiter.acquire("fetch_balance")
             balance = await self.exchange.fetch_balance({"type": "swap"})
             if self._use_virtual:
                 balance.setdefault("info", {})["virtual_asset"] = self._virtual_asset
@@ -220,6 +238,7 @@ class BingXAdapter:
                 params["virtualAccountType"] = self._virtual_asset
                 params["forceVirtual"] = "true"
 
+            await self._rate_limiter.acquire("set_leverage")
             url, headers = self._sign_request("POST", endpoint, params)
             response = await self._async_request("POST", url, headers)
 
@@ -258,6 +277,7 @@ class BingXAdapter:
     async def get_market_price(self, symbol: str) -> float:
         """Получить текущую рыночную цену."""
         try:
+            await self._rate_limiter.acquire("fetch_ticker")
             ticker = await self.exchange.fetch_ticker(symbol)
             return float(ticker["last"])
         except Exception as exc:
@@ -282,6 +302,6 @@ class BingXAdapter:
             if inspect.iscoroutinefunction(close_attr):
                 await close_attr()
             else:
-                await asyncio.to_thread(close_attr)
+                await self._executor.run(close_attr)
         if self._session and not self._session.closed:
             await self._session.close()
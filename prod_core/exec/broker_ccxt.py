@@ -10,6 +10,7 @@ from typing import Any, Iterable
 
 from prod_core.exec.portfolio import PortfolioController
 from prod_core.persist import OrderPayload, PersistDAO
+from prod_core.rate_limit import RateLimiter, RequestPriority, get_rate_limiter
 
 try:
     import ccxt  # type: ignore
@@ -55,6 +56,7 @@ class CCXTBroker:
         *,
         dao: PersistDAO | None = None,
         portfolio: PortfolioController | None = None,
+        rate_limiter: RateLimiter | None = None,
         **kwargs: Any,
     ) -> None:
         if mode.lower() != "paper":
@@ -64,6 +66,7 @@ class CCXTBroker:
         self._client = self._build_client(exchange, kwargs)
         self.dao = dao
         self.portfolio = portfolio
+        self._rate_limiter = rate_limiter or get_rate_limiter(exchange)
 
     def _build_client(self, exchange: str, params: dict[str, Any]) -> Any:
         """Создаёт объект ccxt или mock."""
@@ -178,6 +181,7 @@ class CCXTBroker:
                     }
                 )
             try:
+                self._rate_limiter.acquire_blocking("create_order", priority=RequestPriority.LIVE)
                 response = self._client.create_order(
                     symbol=request.symbol,
                     type=request.order_type,
@@ -1,7 +1,10 @@
 """Технические индикаторы, используемые фидом."""
 
+from .rolling import DonchianState, RollingExtremum
 from .tech import TechnicalIndicators
 
 __all__ = [
+    "DonchianState",
+    "RollingExtremum",
     "TechnicalIndicators",
 ]
@@ -0,0 +1,212 @@
+"""Ядра индикаторов на уровне массивов: ``float64`` ndarray на входе и выходе.
+
+Массивы одномерные (один ряд) или двумерные «бары × символы»: двумерные считаются
+по столбцам за один вызов, что использует панельный режим ``FeatureEngineer``.
+
+Методы ``TechnicalIndicators`` — тонкие обёртки над этими функциями: они только
+достают массивы из Series и возвращают результат с исходным индексом. Поэлементная
+арифметика (true range, доходности, RSI, середина канала) считается слитно через
+``out=`` без промежуточных DataFrame, скользящие max/min — алгоритмом ван Херка —
+Гиля — Вермана за O(n) независимо от окна.
+
+Рекурсивные фильтры (EWM) и скользящие mean/std в NumPy не векторизуются без смены
+порядка операций с плавающей точкой, а ``FeatureStream`` опирается на побитовое
+совпадение с pandas. Поэтому они идут в скомпилированные ядра pandas через голую
+Series без выравнивания индексов — результат совпадает с прежним до бита.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def as_array(values: object) -> np.ndarray:
+    """Непрерывный ``float64`` массив без копии, если вход уже подходит."""
+
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def _pandas(values: np.ndarray) -> pd.Series | pd.DataFrame:
+    # 2D-массив (бары × ряды) считается по столбцам тем же ядром, что и Series
+    if values.ndim == 2:
+        return pd.DataFrame(values, copy=False)
+    return pd.Series(values, copy=False)
+
+
+def ewm_mean(
+    values: np.ndarray,
+    *,
+    span: float | None = None,
+    alpha: float | None = None,
+    adjust: bool = False,
+    min_periods: int = 0,
+) -> np.ndarray:
+    """``ewm(span | alpha, adjust).mean()`` на скомпилированном ядре pandas.
+
+    ``span`` и ``alpha`` передаются как есть: pandas переводит их в ``com`` по-разному,
+    и пересчёт одного в другое менял бы последние биты.
+    """
+
+    window = _pandas(values).ewm(span=span, alpha=alpha, adjust=adjust, min_periods=min_periods)
+    return window.mean().to_numpy()
+
+
+def rolling_mean(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """``rolling(window, min_periods).mean()`` (суммирование Кахана, как в pandas)."""
+
+    return _pandas(values).rolling(window=window, min_periods=min_periods).mean().to_numpy()
+
+
+def rolling_std(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """``rolling(window, min_periods).std()`` (онлайн-Уэлфорд, как в pandas)."""
+
+    return _pandas(values).rolling(window=window, min_periods=min_periods).std().to_numpy()
+
+
+def _rolling_extreme(values: np.ndarray, window: int, op: np.ufunc) -> np.ndarray:
+    """Скользящий экстремум с ``min_periods=1`` за O(n) (ван Херк — Гиль — Верман).
+
+    Ряд делится на блоки длины ``window``; окно, кончающееся в позиции ``i``, —
+    это суффикс своего блока плюс префикс следующего. ``op`` (``np.fmax``/``np.fmin``)
+    пропускает NaN так же, как rolling pandas.
+    """
+
+    size = len(values)
+    if window <= 1 or size == 0:
+        return values.copy()
+    pad = window - 1
+    blocks = -(-(pad + size) // window)
+    padded = np.full(blocks * window, np.nan)
+    padded[pad : pad + size] = values
+    grid = padded.reshape(blocks, window)
+    prefix = op.accumulate(grid, axis=1).ravel()
+    suffix = op.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    return op(suffix[:size], prefix[pad : pad + size])
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """``rolling(window, min_periods=1).max()``."""
+
+    return _rolling_extreme(values, window, np.fmax)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """``rolling(window, min_periods=1).min()``."""
+
+    return _rolling_extreme(values, window, np.fmin)
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Сдвиг вперёд по оси баров на ``periods`` с NaN в начале (как ``Series.shift``)."""
+
+    result = np.empty_like(values)
+    if periods <= 0:
+        result[...] = values
+        return result
+    result[:periods] = np.nan
+    result[periods:] = values[:-periods]
+    return result
+
+
+def pct_change(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Доходность ``x[t] / x[t - periods] - 1`` без заполнения пропусков."""
+
+    result = np.full_like(values, np.nan)
+    if 0 < periods < len(values):
+        tail = result[periods:]
+        np.divide(values[periods:], values[:-periods], out=tail)
+        np.subtract(tail, 1.0, out=tail)
+    elif periods == 0:
+        np.divide(values, values, out=result)
+        np.subtract(result, 1.0, out=result)
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """max(high − low, |high − close₋₁|, |low − close₋₁|) с пропуском NaN."""
+
+    result = np.subtract(high, low)
+    if len(result) < 2:
+        return result
+    prev_close = close[:-1]
+    scratch = np.subtract(high[1:], prev_close)
+    np.abs(scratch, out=scratch)
+    body = result[1:]
+    np.fmax(body, scratch, out=body)
+    np.subtract(low[1:], prev_close, out=scratch)
+    np.abs(scratch, out=scratch)
+    np.fmax(body, scratch, out=body)
+    return result
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Экспоненциальное среднее ``span=period``, ``adjust=False``."""
+
+    return ewm_mean(values, span=period)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Скользящее среднее true range с ``min_periods=1``."""
+
+    return rolling_mean(true_range(high, low, close), period, min_periods=1)
+
+
+def donchian(
+    high: np.ndarray,
+    low: np.ndarray,
+    period: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Верхняя, нижняя границы и середина канала Дончиана."""
+
+    upper = rolling_max(high, period)
+    lower = rolling_min(low, period)
+    middle = np.add(upper, lower)
+    np.divide(middle, 2, out=middle)
+    return upper, lower, middle
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI по Уайлдеру; NaN прогрева и нулевые потери дают 50."""
+
+    delta = np.full(close.shape, np.nan)
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = np.clip(delta, 0.0, None)
+    loss = np.minimum(delta, 0.0)
+    np.negative(loss, out=loss)
+    alpha = 1 / period
+    avg_gain = ewm_mean(gain, alpha=alpha, adjust=True, min_periods=period)
+    avg_loss = ewm_mean(loss, alpha=alpha, adjust=True, min_periods=period)
+    avg_loss[avg_loss == 0] = np.nan
+    result = np.divide(avg_gain, avg_loss)
+    np.add(result, 1, out=result)
+    np.divide(100, result, out=result)
+    np.subtract(100, result, out=result)
+    result[np.isnan(result)] = 50.0
+    return result
+
+
+def volatility(values: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее std доходностей с ``min_periods=1``."""
+
+    return rolling_std(pct_change(values), window, min_periods=1)
+
+
+__all__ = [
+    "as_array",
+    "atr",
+    "donchian",
+    "ema",
+    "ewm_mean",
+    "pct_change",
+    "rolling_max",
+    "rolling_mean",
+    "rolling_min",
+    "rolling_std",
+    "rsi",
+    "shift",
+    "true_range",
+    "volatility",
+]
@@ -0,0 +1,151 @@
+"""Инкрементальные скользящие экстремумы и канал Дончиана для живого цикла.
+
+``RollingExtremum`` держит монотонную деку (позиция, метка, значение): новое значение
+вытесняет с хвоста все, что не лучше него, а голова уходит, когда выпадает из окна.
+Каждое значение входит и выходит из деки один раз — O(1) амортизированно на бар.
+Сравнения без арифметики, поэтому результат совпадает с ``rolling(window,
+min_periods=1).max()/min()`` pandas точно; NaN в деку не попадают и пропускаются,
+как в pandas.
+
+``DonchianState`` — состояние канала для стратегии: продвигается по кадру свечей
+только на новые закрытые бары и отдаёт канал на последнем закрытом баре (то, что
+``donchian_channels(...).iloc[-2]`` считает по всей истории).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class RollingExtremum:
+    """Скользящий максимум (или минимум) с ``min_periods=1`` на монотонной деке."""
+
+    __slots__ = ("window", "maximum", "_deque", "_position")
+
+    def __init__(self, window: int, *, maximum: bool = True) -> None:
+        if window <= 0:
+            raise ValueError("window должен быть положительным.")
+        self.window = window
+        self.maximum = maximum
+        # (позиция бара, метка бара, значение)
+        self._deque: Deque[Tuple[int, int, float]] = deque()
+        self._position = 0
+
+    def push(self, ts: int, value: float) -> float:
+        """Учитывает бар и возвращает экстремум окна, которое им кончается."""
+
+        entries = self._deque
+        if not math.isnan(value):
+            if self.maximum:
+                while entries and entries[-1][2] <= value:
+                    entries.pop()
+            else:
+                while entries and entries[-1][2] >= value:
+                    entries.pop()
+            entries.append((self._position, ts, value))
+        oldest = self._position - self.window + 1
+        while entries and entries[0][0] < oldest:
+            entries.popleft()
+        self._position += 1
+        return self.value
+
+    def expire_before(self, ts: int) -> None:
+        """Убирает бары с меткой раньше ``ts`` (начало кадра после усечения буфера)."""
+
+        entries = self._deque
+        while entries and entries[0][1] < ts:
+            entries.popleft()
+
+    @property
+    def value(self) -> float:
+        return self._deque[0][2] if self._deque else math.nan
+
+    def reset(self) -> None:
+        self._deque.clear()
+        self._position = 0
+
+
+class DonchianState:
+    """Потоковый канал Дончиана ``period`` по закрытым барам кадра свечей."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._upper = RollingExtremum(period, maximum=True)
+        self._lower = RollingExtremum(period, maximum=False)
+        # последние ``period`` учтённых баров: по ним проверяется продолжение кадра
+        self._ts: np.ndarray = np.empty(0, dtype=np.int64)
+        self._raw: np.ndarray = np.empty((2, 0), dtype=np.float64)
+        self.bars_consumed = 0
+        self.rebuilds = 0
+
+    def update(self, candles: pd.DataFrame) -> Tuple[float, float, float] | None:
+        """
+        Продвигает состояние и возвращает (upper, lower, middle) на предпоследнем баре.
+
+        Последний бар кадра может формироваться и в состояние не попадает. ``None`` —
+        кадр не подходит (меньше двух баров, не ``DatetimeIndex``, неупорядоченные
+        метки); тогда канал считается по всей истории.
+        """
+
+        index = candles.index
+        if len(candles) < 2 or not isinstance(index, pd.DatetimeIndex):
+            return None
+        if not index.is_monotonic_increasing:
+            return None
+        ts = index.asi8
+        # закрытые бары: всё, кроме последнего; в окно попадают только последние period
+        closed = len(ts) - 1
+        tail = max(0, closed - self.period)
+        raw = np.vstack(
+            [
+                candles["high"].to_numpy(dtype=np.float64)[tail:closed],
+                candles["low"].to_numpy(dtype=np.float64)[tail:closed],
+            ]
+        )
+        fresh = self._align(ts[tail:closed], raw)
+        if fresh is None:
+            self.rebuilds += 1
+            self._upper.reset()
+            self._lower.reset()
+            fresh = 0
+        window_ts = ts[tail:closed]
+        for offset in range(fresh, len(window_ts)):
+            stamp = int(window_ts[offset])
+            self._upper.push(stamp, raw[0, offset])
+            self._lower.push(stamp, raw[1, offset])
+        self.bars_consumed += len(window_ts) - fresh
+        self._ts = window_ts.copy()
+        self._raw = raw
+        # кадр короче окна: pandas видит только бары кадра
+        self._upper.expire_before(int(ts[0]))
+        self._lower.expire_before(int(ts[0]))
+        upper, lower = self._upper.value, self._lower.value
+        return upper, lower, (upper + lower) / 2
+
+    def _align(self, ts: np.ndarray, raw: np.ndarray) -> int | None:
+        """Сколько баров окна уже учтено или ``None``, если состояние нужно пересобрать."""
+
+        consumed = len(self._ts)
+        if consumed == 0 or len(ts) == 0:
+            return None
+        start = int(np.searchsorted(ts, self._ts[-1]))
+        if start >= len(ts) or ts[start] != self._ts[-1]:
+            return None
+        overlap = min(consumed, start + 1)
+        if not np.array_equal(self._ts[-overlap:], ts[start + 1 - overlap : start + 1]):
+            return None
+        stored = self._raw[:, -overlap:]
+        if not np.array_equal(stored, raw[:, start + 1 - overlap : start + 1], equal_nan=True):
+            return None
+        return start + 1
+
+
+__all__ = [
+    "DonchianState",
+    "RollingExtremum",
+]
@@ -8,6 +8,8 @@ from typing import Iterable
 import numpy as np
 import pandas as pd
 
+from . import kernels
+
 
 @dataclass(slots=True)
 class RollingConfig:
@@ -18,59 +20,57 @@ class RollingConfig:
 
 
 class TechnicalIndicators:
-    """Детерминированные реализации популярных индикаторов."""
+    """Детерминированные реализации популярных индикаторов.
+
+    Расчёт выполняют ядра ``prod_core.indicators.kernels`` над ``float64`` массивами;
+    методы лишь возвращают результат с индексом (и именем) входной Series.
+    """
 
     def ema(self, series: pd.Series, period: int) -> pd.Series:
         """Экспоненциальное скользящее среднее."""
 
-        return series.ewm(span=period, adjust=False).mean()
+        values = kernels.ema(kernels.as_array(series), period)
+        return pd.Series(values, index=series.index, name=series.name)
 
     def atr(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> pd.Series:
         """Average True Range по Уайлдеру."""
 
-        tr = self.true_range(high=high, low=low, close=close)
-        return tr.rolling(window=period, min_periods=1).mean()
+        values = kernels.atr(
+            kernels.as_array(high),
+            kernels.as_array(low),
+            kernels.as_array(close),
+            period,
+        )
+        return pd.Series(values, index=high.index)
 
     @staticmethod
     def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
         """Истинный диапазон для ATR."""
 
-        prev_close = close.shift(1)
-        components = pd.concat(
-            [
-                high - low,
-                (high - prev_close).abs(),
-                (low - prev_close).abs(),
-            ],
-            axis=1,
+        values = kernels.true_range(
+            kernels.as_array(high),
+            kernels.as_array(low),
+            kernels.as_array(close),
         )
-        return components.max(axis=1)
+        return pd.Series(values, index=high.index)
 
     def donchian_channels(self, high: pd.Series, low: pd.Series, period: int) -> pd.DataFrame:
         """Верхняя и нижняя границы канала Дончиана."""
 
-        upper = high.rolling(window=period, min_periods=1).max()
-        lower = low.rolling(window=period, min_periods=1).min()
-        middle = (upper + lower) / 2
+        upper, lower, middle = kernels.donchian(kernels.as_array(high), kernels.as_array(low), period)
         return pd.DataFrame({"upper": upper, "lower": lower, "middle": middle}, index=high.index)
 
     def rsi(self, close: pd.Series, period: int = 14) -> pd.Series:
         """Relative Strength Index по Уайлдеру."""
 
-        delta = close.diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.ewm(alpha=1 / period, min_periods=period).mean()
-        avg_loss = loss.ewm(alpha=1 / period, min_periods=period).mean()
-        rs = avg_gain / avg_loss.replace(0, np.nan)
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.fillna(50.0)
+        values = kernels.rsi(kernels.as_array(close), period)
+        return pd.Series(values, index=close.index, name=close.name)
 
     def volatility(self, series: pd.Series, window: int) -> pd.Series:
         """Стандартное отклонение доходностей."""
 
-        returns = series.pct_change()
-        return returns.rolling(window=window, min_periods=1).std()
+        values = kernels.volatility(kernels.as_array(series), window)
+        return pd.Series(values, index=series.index, name=series.name)
 
     def normalize(self, series: pd.Series) -> pd.Series:
         """Min-Max нормировка для облегчения работы стратегий."""
@@ -11,7 +11,7 @@ from typing import Any
 
 from prod_core.persist import PersistDAO
 
-from prometheus_client import CollectorRegistry, Gauge, Histogram
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
 
 
 @dataclass(slots=True)
@@ -132,6 +132,82 @@ class TelemetryExporter:
             "Unix timestamp of last orchestrator cycle.",
             registry=self.registry,
         )
+        self.bar_close_latency = Histogram(
+            "bar_close_latency_seconds",
+            "Задержка от закрытия бара до старта цикла оркестратора, секунды.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+        )
+        self.feed_gap_bars = Histogram(
+            "feed_gap_bars",
+            "Размер восстановленного разрыва фида, баров.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+            buckets=(1, 2, 5, 10, 30, 60, 120, 240, 1000),
+        )
+        self.feed_gap_repair_seconds = Histogram(
+            "feed_gap_repair_seconds",
+            "Длительность доскачки разрыва фида через REST, секунды.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+        )
+        self.exchange_io_queue_depth = Gauge(
+            "exchange_io_queue_depth",
+            "Вызовы ccxt, ожидающие свободного потока в пуле биржи.",
+            labelnames=("exchange",),
+            registry=self.registry,
+        )
+        self.exchange_io_wait_seconds = Histogram(
+            "exchange_io_wait_seconds",
+            "Ожидание вызова ccxt в очереди пула биржи, секунды.",
+            labelnames=("exchange",),
+            registry=self.registry,
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+        )
+        self.exchange_io_stuck_calls = Gauge(
+            "exchange_io_stuck_calls",
+            "Вызовы ccxt, снятые по таймауту и ещё занимающие поток.",
+            labelnames=("exchange",),
+            registry=self.registry,
+        )
+        self.feature_cache_hits = Counter(
+            "feature_cache_hits",
+            "Попадания в общий кэш признаков.",
+            labelnames=("consumer",),
+            registry=self.registry,
+        )
+        self.feature_cache_misses = Counter(
+            "feature_cache_misses",
+            "Промахи общего кэша признаков (признаки пересчитаны).",
+            labelnames=("consumer",),
+            registry=self.registry,
+        )
+        self.feature_cache_bytes = Gauge(
+            "feature_cache_bytes",
+            "Объём DataFrame признаков в общем кэше, байты.",
+            registry=self.registry,
+        )
+        self.lookahead_checks = Counter(
+            "lookahead_checks",
+            "Выборочные проверки признаков на look-ahead.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+        )
+        self.lookahead_violations = Counter(
+            "lookahead_violations",
+            "Проверки look-ahead, обнаружившие зависимость от будущих баров.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+        )
+        self.lookahead_check_seconds = Histogram(
+            "lookahead_check_seconds",
+            "Длительность выборочной проверки look-ahead, секунды.",
+            labelnames=("timeframe",),
+            registry=self.registry,
+            buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+        )
         self._daily_lock_label: str | None = None
         self.stage_latency_ms = Histogram(
             "stage_latency_ms",
@@ -214,6 +290,39 @@ class TelemetryExporter:
         self.stage_latency.labels(stage=stage).observe(max(seconds, 0.0))
         self.stage_latency_ms.labels(stage=stage).observe(max(seconds * 1000, 0.0))
 
+    def observe_bar_close_latency(self, timeframe: str, seconds: float) -> None:
+        """Фиксирует задержку между закрытием бара и запуском цикла."""
+
+        self.bar_close_latency.labels(timeframe=timeframe).observe(max(seconds, 0.0))
+
+    def record_gap_repair(self, timeframe: str, bars: int, seconds: float) -> None:
+        """Фиксирует размер восстановленного разрыва и время его починки."""
+
+        self.feed_gap_bars.labels(timeframe=timeframe).observe(bars)
+        self.feed_gap_repair_seconds.labels(timeframe=timeframe).observe(max(seconds, 0.0))
+
+    def record_exchange_io(self, exchange: str, queue_depth: int, wait_seconds: float, stuck_calls: int) -> None:
+        """Фиксирует загрузку пула блокирующих вызовов биржи."""
+
+        self.exchange_io_queue_depth.labels(exchange=exchange).set(queue_depth)
+        self.exchange_io_wait_seconds.labels(exchange=exchange).observe(max(wait_seconds, 0.0))
+        self.exchange_io_stuck_calls.labels(exchange=exchange).set(stuck_calls)
+
+    def record_feature_cache(self, consumer: str, hit: bool, cache_bytes: int) -> None:
+        """Фиксирует обращение к кэшу признаков и его текущий объём."""
+
+        counter = self.feature_cache_hits if hit else self.feature_cache_misses
+        counter.labels(consumer=consumer).inc()
+        self.feature_cache_bytes.set(cache_bytes)
+
+    def record_lookahead_check(self, timeframe: str, violated: bool, seconds: float) -> None:
+        """Фиксирует выборочную проверку look-ahead и её результат."""
+
+        self.lookahead_checks.labels(timeframe=timeframe).inc()
+        if violated:
+            self.lookahead_violations.labels(timeframe=timeframe).inc()
+        self.lookahead_check_seconds.labels(timeframe=timeframe).observe(max(seconds, 0.0))
+
     def record_portfolio_safe_mode(self, enabled: bool) -> None:
         """Записывает состояние safe-mode портфеля."""
 
@@ -0,0 +1,231 @@
+"""Общий token-bucket лимитер REST-запросов на биржу.
+
+Один экземпляр на ``exchange_id`` делят фид, брокер и адаптеры, поэтому суммарный
+поток запросов укладывается в лимит биржи заранее, а не после ``429``. Каждый
+endpoint имеет вес (как weight у Binance). Приоритеты реализованы через резерв:
+запросы низкого приоритета не опускают ведро ниже своей доли ёмкости, и живой
+поллинг/ордера всегда находят токены, даже если backfill выбирает лимит целиком.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Приоритет запроса: меньше — важнее."""
+
+    LIVE = 0
+    GAP_FILL = 1
+    BACKFILL = 2
+
+
+@dataclass(slots=True, frozen=True)
+class RateBudget:
+    """Лимит биржи: скорость пополнения (вес/с) и ёмкость ведра (вес)."""
+
+    rate: float
+    burst: float
+
+
+# Лимиты с ~5% запасом от опубликованных: Binance USDⓈ-M — 2400 weight/мин на IP.
+DEFAULT_BUDGETS: Dict[str, RateBudget] = {
+    "binanceusdm": RateBudget(rate=38.0, burst=120.0),
+    "binance": RateBudget(rate=95.0, burst=300.0),
+    "bingx": RateBudget(rate=9.5, burst=20.0),
+}
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "fetch_ohlcv": 1.0,
+    "fetch_ticker": 1.0,
+    "fetch_order_book": 2.0,
+    "fetch_balance": 5.0,
+    "fetch_positions": 5.0,
+    "create_order": 1.0,
+    "cancel_order": 1.0,
+    "set_leverage": 1.0,
+}
+
+# Доля ёмкости, которую запросы данного приоритета оставляют более важным.
+DEFAULT_RESERVE: Dict[RequestPriority, float] = {
+    RequestPriority.LIVE: 0.0,
+    RequestPriority.GAP_FILL: 0.1,
+    RequestPriority.BACKFILL: 0.25,
+}
+
+
+def ohlcv_weight(limit: int) -> float:
+    """Вес ``fetch_ohlcv`` в зависимости от глубины (ступени Binance klines)."""
+
+    if limit < 100:
+        return 1.0
+    if limit < 500:
+        return 2.0
+    if limit <= 1000:
+        return 5.0
+    return 10.0
+
+
+class RateLimiter:
+    """Потокобезопасное ведро токенов с весами endpoint'ов и приоритетами.
+
+    ``acquire`` — для asyncio-кода, ``acquire_blocking`` — для синхронных клиентов
+    (ccxt в потоке, ``CCXTBroker``); оба расходуют одно и то же ведро.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        *,
+        weights: Mapping[str, float] | None = None,
+        reserve: Mapping[RequestPriority, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate должен быть положительным.")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.reserve = dict(DEFAULT_RESERVE if reserve is None else reserve)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self.waited_seconds: Dict[RequestPriority, float] = {priority: 0.0 for priority in RequestPriority}
+        self.requests: Dict[RequestPriority, int] = {priority: 0 for priority in RequestPriority}
+
+    def cost(self, endpoint: str | float) -> float:
+        if isinstance(endpoint, (int, float)):
+            return float(endpoint)
+        return self.weights.get(endpoint, 1.0)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, cost: float, priority: RequestPriority = RequestPriority.LIVE) -> float:
+        """Списывает ``cost`` токенов, если можно; иначе возвращает время ожидания, с."""
+
+        with self._lock:
+            self._refill()
+            headroom = self.capacity * self.reserve.get(priority, 0.0)
+            threshold = min(self.capacity, cost + headroom)
+            if self._tokens >= threshold:
+                self._tokens -= cost
+                self.requests[priority] += 1
+                return 0.0
+            return (threshold - self._tokens) / self.rate
+
+    async def acquire(
+        self,
+        endpoint: str | float = 1.0,
+        *,
+        priority: RequestPriority = RequestPriority.LIVE,
+    ) -> float:
+        """Ждёт токены для запроса; возвращает фактическое ожидание в секундах."""
+
+        cost = self.cost(endpoint)
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(cost, priority)
+            if delay <= 0:
+                self.waited_seconds[priority] += waited
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def acquire_blocking(
+        self,
+        endpoint: str | float = 1.0,
+        *,
+        priority: RequestPriority = RequestPriority.LIVE,
+    ) -> float:
+        """Синхронный вариант ``acquire`` для клиентов без event loop."""
+
+        cost = self.cost(endpoint)
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(cost, priority)
+            if delay <= 0:
+                self.waited_seconds[priority] += waited
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float) -> None:
+        """Биржа всё же ответила 429: замораживаем ведро на ``seconds``."""
+
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+        logger.warning("Rate limit биржи превышен — пауза REST-запросов на %.2fs", seconds)
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _default_budget(exchange_id: str) -> RateBudget:
+    budget = DEFAULT_BUDGETS.get(exchange_id)
+    if budget is not None:
+        return budget
+    try:
+        import ccxt  # type: ignore[import-untyped]
+
+        rate_limit_ms = float(getattr(getattr(ccxt, exchange_id), "rateLimit", 0) or 0)
+    except (ImportError, AttributeError):
+        rate_limit_ms = 0.0
+    if rate_limit_ms <= 0:
+        rate_limit_ms = 100.0
+    rate = 1000.0 / rate_limit_ms
+    return RateBudget(rate=rate, burst=rate * 2)
+
+
+def get_rate_limiter(exchange_id: str) -> RateLimiter:
+    """Возвращает общий лимитер биржи (создаётся при первом обращении)."""
+
+    key = exchange_id.lower()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            budget = _default_budget(key)
+            limiter = RateLimiter(budget.rate, budget.burst)
+            _LIMITERS[key] = limiter
+        return limiter
+
+
+def register_rate_limiter(exchange_id: str, limiter: RateLimiter) -> None:
+    """Подменяет лимитер биржи (конфигурация или тесты)."""
+
+    with _LIMITERS_LOCK:
+        _LIMITERS[exchange_id.lower()] = limiter
+
+
+__all__ = [
+    "DEFAULT_BUDGETS",
+    "DEFAULT_WEIGHTS",
+    "RateBudget",
+    "RateLimiter",
+    "RequestPriority",
+    "get_rate_limiter",
+    "ohlcv_weight",
+    "register_rate_limiter",
+]
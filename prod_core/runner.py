@@ -4,22 +4,29 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
 import logging
 import os
 import signal
 from pathlib import Path
 import time
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
-import pandas as pd
 import logging
 
+import pandas as pd
+
 from brain_orchestrator.brain import BrainOrchestrator
 from brain_orchestrator.tools import ToolRegistry
 from dashboards.exporter import serve_prometheus
 from prod_core.configs.loader import ConfigLoader
 from research_lab.backtests.vectorbt_runner import load_shadow_strategies
-from prod_core.data import FeedHealthStatus, MarketDataFeed, MockMarketDataFeed
+from prod_core.data import BarClosedEvent, FeedHealthStatus, MarketDataFeed, MockMarketDataFeed
+from prod_core.data.candle_cache import CandleCache
+from prod_core.data.feature_cache import FeatureCache, register_feature_cache
+from prod_core.data.lookahead import LookaheadVerifier
+from prod_core.data.timeframes import timeframe_to_milliseconds
+from prod_core.exchange_io import ExchangeExecutor, register_exchange_executor
 from prod_core.exec.portfolio import PortfolioController
 from prod_core.monitor import TelemetryExporter, configure_logging
 from prod_core.persist import EquitySnapshotPayload, PersistDAO
@@ -174,6 +181,19 @@ def _build_state(dao: PersistDAO) -> Dict[str, float]:
     }
 
 
+def _higher_candles(
+    feed: MarketDataFeed | MockMarketDataFeed,
+    keys: List[Tuple[str, str]] | None,
+) -> Dict[str, pd.DataFrame] | None:
+    """Свечи старших таймфреймов символа для as-of join признаков (None — join выключен)."""
+
+    if not keys:
+        return None
+    views = feed.snapshot_views(keys)
+    frames = {timeframe: view.to_frame() for (_, timeframe), view in views.items() if len(view)}
+    return frames or None
+
+
 def _env_flag(name: str) -> bool:
     """Возвращает True, если переменная окружения содержит правду."""
 
@@ -252,6 +272,29 @@ async def _run_paper_loop(
     serve_prometheus(telemetry, prometheus_port)
     logger.info("Prometheus exporter слушает порт %s", prometheus_port)
     exchange_id = os.getenv("EXCHANGE", "binanceusdm")
+    # пул блокирующих вызовов ccxt; 0 — размер по rate-limit бюджету биржи
+    exchange_executor = ExchangeExecutor(
+        exchange_id,
+        int(os.getenv("EXCHANGE_IO_WORKERS", "0")) or None,
+        call_timeout=float(os.getenv("EXCHANGE_IO_TIMEOUT", "30")),
+        on_metrics=lambda exchange, depth, wait, stuck: telemetry.record_exchange_io(
+            exchange, depth, wait, stuck
+        ),
+    )
+    register_exchange_executor(exchange_id, exchange_executor)
+    feature_cache = FeatureCache(
+        max_entries=int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "256")),
+        max_bytes=int(float(os.getenv("FEATURE_CACHE_MAX_MB", "256")) * 1024 * 1024),
+        on_metrics=lambda consumer, hit, size: telemetry.record_feature_cache(consumer, hit, size),
+        # выборочная проверка look-ahead: доля времени расчёта признаков, 0 — выключена
+        verifier=LookaheadVerifier(
+            float(os.getenv("LOOKAHEAD_CHECK_BUDGET", "0.01")),
+            on_metrics=lambda timeframe, violated, seconds: telemetry.record_lookahead_check(
+                timeframe, violated, seconds
+            ),
+        ),
+    )
+    register_feature_cache(feature_cache)
     portfolio_controller = PortfolioController(dao=dao)
     registry = connect_registry(
         telemetry,
@@ -277,10 +320,15 @@ async def _run_paper_loop(
         logger.warning("Активирован mock-фид: цикл работает на синтетических данных.")
         feed = MockMarketDataFeed(symbols=specs)
     else:
+        cache_dir = os.getenv("CANDLE_CACHE_DIR", "storage/candles")
         feed = MarketDataFeed(
             exchange_id=exchange_id,
             symbols=specs,
             use_websocket=os.getenv("ENABLE_WS", "1").lower() == "1",
+            candle_cache=CandleCache(cache_dir, exchange_id) if cache_dir else None,
+            on_gap_repaired=lambda _symbol, timeframe, bars, seconds: telemetry.record_gap_repair(
+                timeframe, bars, seconds
+            ),
         )
 
     stop_event = asyncio.Event()
@@ -297,14 +345,29 @@ async def _run_paper_loop(
             except NotImplementedError:
                 logger.debug("Signal handlers are not supported on this platform for %s.", sig_name)
 
-    last_processed: Dict[Tuple[str, str], pd.Timestamp] = {}
+    last_processed: Dict[Tuple[str, str], int] = {}
+    seen_versions: Dict[Tuple[str, str], int] = {}
+    primary_keys = [(spec.name, spec.primary_timeframe) for spec in specs]
+    # признаки старших таймфреймов символа as-of на индексе основного (opt-in)
+    higher_keys: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    if _env_flag("FEATURES_JOIN_HIGHER_TF"):
+        for spec in specs:
+            primary_ms = timeframe_to_milliseconds(spec.primary_timeframe)
+            higher_keys[(spec.name, spec.primary_timeframe)] = [
+                (spec.name, tf)
+                for tf in spec.timeframes
+                if timeframe_to_milliseconds(tf) > primary_ms
+            ]
     min_required_bars = min(spec.backfill_bars for spec in specs)
     base_sleep = min(spec.poll_interval_seconds for spec in specs)
-    sleep_interval = max(1.0, base_sleep)
+    heartbeat_interval = max(1.0, base_sleep)
     if use_mock_feed:
-        sleep_interval = min(sleep_interval, 0.5)
+        heartbeat_interval = min(heartbeat_interval, 0.5)
 
-    async with feed:
+    async with contextlib.AsyncExitStack() as stack:
+        # пул закрывается и при исключении, но после фида: stop() закрывает REST через него
+        stack.callback(exchange_executor.shutdown)
+        await stack.enter_async_context(feed)
         effective_skip_check = skip_feed_check
         symbol_timeframes = [(spec.name, tf) for spec in specs for tf in spec.timeframes]
         if not effective_skip_check:
@@ -340,38 +403,69 @@ async def _run_paper_loop(
                     )
         if effective_skip_check:
             logger.warning("Пропускаем feed.wait_ready(): используем REST-backfill/мок-данные.")
+        # Цикл просыпается по событиям закрытия баров; таймаут heartbeat_interval нужен только
+        # для проверки лимитов, stop_event и публикации feed_health при тишине в фиде.
+        subscription = feed.subscribe_bar_closes(primary_keys)
+        pending: Dict[Tuple[str, str], BarClosedEvent | None] = {key: None for key in primary_keys}
         start_ts = time.time()
         cycles = 0
-        while not stop_event.is_set():
-            if max_seconds and max_seconds > 0 and (time.time() - start_ts) >= max_seconds:
-                logger.info("Достигнут лимит времени %.1f с, завершаемся.", max_seconds)
-                break
-            if max_cycles and max_cycles > 0 and cycles >= max_cycles:
-                logger.info("Достигнут лимит по числу циклов %d, завершаемся.", max_cycles)
-                break
-            snapshot = feed.snapshot(min_bars=min_required_bars)
-            telemetry.record_feed_health(_aggregate_health(feed.status()))
-
-            for spec in specs:
-                timeframe = spec.primary_timeframe
-                candles = snapshot.get(spec.name, {}).get(timeframe)
-                if candles is None or candles.empty:
-                    continue
-                latest_ts = candles.index[-1]
-                key = (spec.name, timeframe)
-                if key in last_processed and last_processed[key] >= latest_ts:
-                    continue
-                orchestrator.run_cycle(
-                    candles=candles,
-                    state=_build_state(dao),
-                    mode=mode,
-                    symbol=spec.name,
-                    timeframe=timeframe,
-                )
-                last_processed[key] = latest_ts
+        try:
+            while not stop_event.is_set():
+                if max_seconds and max_seconds > 0 and (time.time() - start_ts) >= max_seconds:
+                    logger.info("Достигнут лимит времени %.1f с, завершаемся.", max_seconds)
+                    break
+                if max_cycles and max_cycles > 0 and cycles >= max_cycles:
+                    logger.info("Достигнут лимит по числу циклов %d, завершаемся.", max_cycles)
+                    break
+                if cycles > 0:
+                    wait_for = heartbeat_interval
+                    if max_seconds and max_seconds > 0:
+                        wait_for = min(wait_for, max(0.0, max_seconds - (time.time() - start_ts)))
+                    event = await subscription.get(timeout=wait_for)
+                    events = [event] if event is not None else []
+                    events.extend(subscription.drain())
+                    for event in events:
+                        pending[event.key] = event
+                    if subscription.closed and not pending:
+                        logger.warning("Поток событий фида закрыт, завершаем paper-loop.")
+                        break
+
+                views = feed.snapshot_views(list(pending), min_bars=min_required_bars)
+                telemetry.record_feed_health(_aggregate_health(feed.status()))
+
+                for key, bar_event in pending.items():
+                    view = views.get(key)
+                    if view is None or len(view) == 0:
+                        continue
+                    # версия буфера не менялась — данных для нового цикла нет
+                    if seen_versions.get(key) == view.version:
+                        continue
+                    seen_versions[key] = view.version
+                    latest_ts = view.last_timestamp_ms()
+                    if latest_ts is None:
+                        continue
+                    if key in last_processed and last_processed[key] >= latest_ts:
+                        continue
+                    symbol, timeframe = key
+                    if bar_event is not None:
+                        telemetry.observe_bar_close_latency(
+                            timeframe,
+                            time.time() - bar_event.close_ts_ms / 1000,
+                        )
+                    orchestrator.run_cycle(
+                        candles=view.to_frame(),
+                        state=_build_state(dao),
+                        mode=mode,
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        higher_candles=_higher_candles(feed, higher_keys.get(key)),
+                    )
+                    last_processed[key] = latest_ts
 
-            cycles += 1
-            await asyncio.sleep(sleep_interval)
+                pending = {}
+                cycles += 1
+        finally:
+            subscription.close()
 
     logger.info("Paper-loop остановлен.")
 
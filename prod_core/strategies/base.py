@@ -49,6 +49,8 @@ class TradingStrategy:
     timeframe: Final[str]
     min_hold_bars: Final[int]
     supported_regimes: tuple[MarketRegime, ...]
+    # хвост истории (в барах), от которого зависит ``_generate``; None — вся история
+    lookback_bars: int | None
 
     def __init__(
         self,
@@ -56,11 +58,13 @@ class TradingStrategy:
         timeframe: str,
         min_hold_bars: int,
         supported_regimes: tuple[MarketRegime, ...],
+        lookback_bars: int | None = None,
     ) -> None:
         self.name = name
         self.timeframe = timeframe
         self.min_hold_bars = min_hold_bars
         self.supported_regimes = supported_regimes
+        self.lookback_bars = lookback_bars
 
     def generate_signals(
         self,
@@ -79,6 +83,22 @@ class TradingStrategy:
 
         raise NotImplementedError
 
+    def generate_signal_series(
+        self,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+    ) -> tuple[pd.Series, pd.Series] | None:
+        """
+        Входы на всей истории за один проход: (long, short) булевы ряды по ``features.index``.
+
+        Значение на баре ``i`` — сторона первого сигнала long/short, который вернул бы
+        ``_generate`` на истории до бара ``i`` включительно; long и short не
+        совпадают. ``candles`` и ``features`` разделяют индекс, как в бэктесте.
+        ``None`` — векторной реализации нет, сигналы считаются побарно.
+        """
+
+        return None
+
     def build_plan(
         self,
         signal: StrategySignal,
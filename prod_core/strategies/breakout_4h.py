@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 
 from brain_orchestrator.regimes import MarketRegime
-from prod_core.indicators import TechnicalIndicators
+from prod_core.indicators import DonchianState, TechnicalIndicators
 from prod_core.strategies.base import StrategySignal, TradingStrategy
 
 
@@ -24,25 +25,28 @@ class Breakout4HStrategy(TradingStrategy):
     """Детерминированная пробойная стратегия на 4H."""
 
     def __init__(self, indicators: Optional[TechnicalIndicators] = None, config: BreakoutConfig | None = None) -> None:
+        config = config or BreakoutConfig()
         super().__init__(
             name="breakout_4h",
             timeframe="4h",
             min_hold_bars=3,
             supported_regimes=(MarketRegime.TREND_UP, MarketRegime.TREND_DOWN),
+            # канал на закрытом баре: period закрытых баров и формирующийся
+            lookback_bars=config.channel_period + 1,
         )
         self._indicators = indicators or TechnicalIndicators()
-        self._config = config or BreakoutConfig()
+        self._config = config
+        # потоковые каналы по символам; только для штатных индикаторов
+        self._channels: Dict[str | None, DonchianState] = {}
 
     def _generate(self, candles: pd.DataFrame, features: pd.DataFrame) -> list[StrategySignal]:
         """Строит сигналы на основе пробоя каналов Дончиана."""
 
         signals: list[StrategySignal] = []
-        donchian = self._indicators.donchian_channels(candles["high"], candles["low"], self._config.channel_period)
         close = candles["close"]
         last_idx = close.index[-1]
         last_price = float(close.iloc[-1])
-        upper = float(donchian["upper"].iloc[-2])
-        lower = float(donchian["lower"].iloc[-2])
+        upper, lower = self._channel(candles)
         atr = float(features["atr"].iloc[-1]) if "atr" in features.columns else None
 
         breakout_up = last_price - upper > self._config.min_breakout_factor * last_price
@@ -72,3 +76,40 @@ class Breakout4HStrategy(TradingStrategy):
                 )
             )
         return signals
+
+    def generate_signal_series(
+        self,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+    ) -> tuple[pd.Series, pd.Series]:
+        """Пробои канала на каждом баре: канал по всей истории, сдвинутый на бар."""
+
+        period = self._config.channel_period
+        donchian = self._indicators.donchian_channels(candles["high"], candles["low"], period)
+        # граница на закрытом баре i-1; у первого бара закрытого бара нет
+        upper = np.full(len(donchian), np.nan)
+        lower = np.full(len(donchian), np.nan)
+        upper[1:] = donchian["upper"].to_numpy(dtype=np.float64)[:-1]
+        lower[1:] = donchian["lower"].to_numpy(dtype=np.float64)[:-1]
+        price = candles["close"].to_numpy(dtype=np.float64)
+        threshold = self._config.min_breakout_factor * price
+        long = price - upper > threshold
+        # оба пробоя сразу — первым идёт long, как в _generate
+        short = (lower - price > threshold) & ~long
+        index = features.index
+        return pd.Series(long, index=index), pd.Series(short, index=index)
+
+    def _channel(self, candles: pd.DataFrame) -> tuple[float, float]:
+        """Границы канала на последнем закрытом баре (``iloc[-2]`` полного расчёта)."""
+
+        period = self._config.channel_period
+        if type(self._indicators) is TechnicalIndicators:
+            key = str(candles["symbol"].iat[-1]) if "symbol" in candles.columns else None
+            state = self._channels.get(key)
+            if state is None or state.period != period:
+                state = self._channels[key] = DonchianState(period)
+            channel = state.update(candles)
+            if channel is not None:
+                return float(channel[0]), float(channel[1])
+        donchian = self._indicators.donchian_channels(candles["high"], candles["low"], period)
+        return float(donchian["upper"].iloc[-2]), float(donchian["lower"].iloc[-2])
@@ -5,6 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from brain_orchestrator.regimes import MarketRegime
@@ -32,6 +33,7 @@ class FundingReversionStrategy(TradingStrategy):
                 MarketRegime.RANGE_HIGHVOL,
                 MarketRegime.PANIC,
             ),
+            lookback_bars=1,
         )
         self._config = config or FundingReversionConfig()
 
@@ -62,3 +64,19 @@ class FundingReversionStrategy(TradingStrategy):
                 metadata={"funding_rate": funding_value},
             )
         ]
+
+    def generate_signal_series(
+        self,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+    ) -> tuple[pd.Series, pd.Series]:
+        """Перекос фондинга на каждом баре; без колонки ``funding_rate`` входов нет."""
+
+        index = features.index
+        if "funding_rate" not in features.columns:
+            empty = np.zeros(len(index), dtype=bool)
+            return pd.Series(empty, index=index), pd.Series(empty.copy(), index=index)
+        funding = features["funding_rate"].to_numpy(dtype=np.float64)
+        active = ~(np.abs(funding) < self._config.funding_threshold)
+        long = active & (funding > 0)
+        return pd.Series(long, index=index), pd.Series(active & ~long, index=index)
@@ -5,6 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from brain_orchestrator.regimes import MarketRegime
@@ -31,6 +32,7 @@ class RangeReversion5MStrategy(TradingStrategy):
                 MarketRegime.RANGE_LOWVOL,
                 MarketRegime.RANGE_HIGHVOL,
             ),
+            lookback_bars=1,
         )
         self._config = config or RangeReversionConfig()
 
@@ -68,3 +70,23 @@ class RangeReversion5MStrategy(TradingStrategy):
             )
         )
         return signals
+
+    def generate_signal_series(
+        self,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+    ) -> tuple[pd.Series, pd.Series]:
+        """Отклонение от EMA на каждом баре с теми же порогами, что у ``_generate``."""
+
+        close = candles["close"].to_numpy(dtype=np.float64)
+        ema_fast = features["ema_fast"].to_numpy(dtype=np.float64)
+        anchor = features["ema_slow"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deviation = (close - anchor) / anchor
+            ema_gap = (ema_fast - anchor) / anchor
+        # сравнения с NaN ложны, как и в построчной версии
+        active = ~(np.abs(deviation) < self._config.deviation_threshold)
+        active &= ~(np.abs(ema_gap) > self._config.ema_gap_threshold)
+        short = active & (deviation > 0)
+        index = features.index
+        return pd.Series(active & ~short, index=index), pd.Series(short, index=index)
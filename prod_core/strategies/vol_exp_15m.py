@@ -5,6 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from brain_orchestrator.regimes import MarketRegime
@@ -32,6 +33,8 @@ class VolatilityExpansion15MStrategy(TradingStrategy):
                 MarketRegime.TREND_DOWN,
                 MarketRegime.RANGE_HIGHVOL,
             ),
+            # прошлое значение волатильности для сравнения
+            lookback_bars=2,
         )
         self._config = config or VolatilityExpansionConfig()
 
@@ -69,3 +72,18 @@ class VolatilityExpansion15MStrategy(TradingStrategy):
             )
         )
         return signals
+
+    def generate_signal_series(
+        self,
+        candles: pd.DataFrame,
+        features: pd.DataFrame,
+    ) -> tuple[pd.Series, pd.Series]:
+        """Всплески волатильности на каждом баре; первому бару не с чем сравнить."""
+
+        vol = features["volatility"].to_numpy(dtype=np.float64)
+        returns = features["return_lag"].to_numpy(dtype=np.float64)
+        spike = np.zeros(len(vol), dtype=bool)
+        spike[1:] = (vol[1:] > self._config.vol_threshold) & (vol[1:] > vol[:-1])
+        long = spike & (returns > 0)
+        index = features.index
+        return pd.Series(long, index=index), pd.Series(spike & ~long, index=index)
@@ -0,0 +1,486 @@
+"""Поиск параметров стратегий: сетка, латинский гиперкуб и случайная выборка.
+
+Пространство поиска задаётся диапазонами полей ``*Config`` стратегии из
+``STRATEGY_REGISTRY``. Точки превращаются в ``CandidateConfig`` и считаются
+партиями через ``evaluate_candidates`` (общие свечи, один ``from_signals`` на
+партию, при необходимости — пул процессов). Кандидаты без входов до in-sample
+границы отсекаются до симуляции.
+
+Результаты пишутся в JSONL по мере готовности партий, в памяти держится только
+текущая партия и лучшие ``top`` кандидатов, поэтому сетка на 10k точек не
+упирается в память. Идентификатор кандидата — дайджест стратегии, рынка и
+параметров: повторный запуск с тем же файлом пропускает уже посчитанные точки.
+Первая строка файла — настройки прогона (``{"run": {...}}``: период, биржа,
+``split_ratio``, гейтинг, порог отсечения); дозапуск с другими настройками
+отклоняется, чтобы в одном файле не смешивались несравнимые метрики.
+
+Файл поиска (JSON)::
+
+    {"spaces": [{"strategy": "range_reversion_5m", "symbol": "BTC/USDT:USDT",
+                 "timeframe": "5m",
+                 "params": {"deviation_threshold": {"low": 0.001, "high": 0.01, "steps": 10},
+                            "ema_gap_threshold": {"values": [0.005, 0.01, 0.02]}}}]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterator, List, Literal, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from research_lab.backtests.vectorbt_runner import (
+    STRATEGY_REGISTRY,
+    BacktestResult,
+    CandidateConfig,
+    CandidatePool,
+    _resolve_type,
+    evaluate_candidates,
+    load_price_frames,
+)
+
+SearchMethod = Literal["grid", "lhs", "random"]
+
+
+@dataclass(frozen=True, slots=True)
+class ParamRange:
+    """Диапазон параметра: ``[low, high]`` с ``steps`` узлами сетки или явные ``values``."""
+
+    low: float = 0.0
+    high: float = 0.0
+    steps: int = 5
+    values: Tuple[float, ...] | None = None
+    integer: bool = False
+
+    def grid(self) -> List[float]:
+        """Узлы сетки (для целых — без повторов после округления)."""
+
+        if self.values is not None:
+            return list(self.values)
+        points = np.linspace(self.low, self.high, max(1, self.steps)).tolist()
+        if self.integer:
+            points = sorted({round(point) for point in points})
+        return [float(point) for point in points]
+
+    def scale(self, unit: np.ndarray) -> np.ndarray:
+        """Отображает точки ``[0, 1)`` в значения диапазона."""
+
+        if self.values is not None:
+            positions = np.minimum((unit * len(self.values)).astype(int), len(self.values) - 1)
+            return np.asarray(self.values, dtype=np.float64)[positions]
+        scaled = self.low + unit * (self.high - self.low)
+        return np.round(scaled) if self.integer else scaled
+
+
+@dataclass(frozen=True, slots=True)
+class SearchSpace:
+    """Диапазоны параметров одной стратегии на одном рынке."""
+
+    strategy: str
+    symbol: str
+    timeframe: str
+    params: Dict[str, ParamRange]
+    csv_path: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.strategy not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy type '{self.strategy}'")
+        _, config_cls = STRATEGY_REGISTRY[self.strategy]
+        known = {field.name for field in fields(config_cls)}
+        unknown = sorted(set(self.params) - known)
+        if unknown:
+            raise ValueError(
+                f"{config_cls.__name__} has no parameters: {', '.join(unknown)}"
+            )
+
+    def candidate(self, params: Dict[str, float]) -> CandidateConfig:
+        """Кандидат с детерминированным идентификатором по стратегии, рынку и параметрам."""
+
+        params = {
+            name: int(value) if name in self.params and self.params[name].integer else value
+            for name, value in params.items()
+        }
+        payload = json.dumps(
+            [self.strategy, self.symbol, self.timeframe, sorted(params.items())]
+        )
+        digest = hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+        return CandidateConfig(
+            strategy=self.strategy,
+            candidate_id=f"{self.strategy}-{digest}",
+            params=dict(params),
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            csv_path=self.csv_path,
+        )
+
+
+def _integer_fields(strategy: str) -> Set[str]:
+    _, config_cls = STRATEGY_REGISTRY[strategy]
+    return {field.name for field in fields(config_cls) if _resolve_type(field.type) in (int, "int")}
+
+
+def _parse_range(spec: object, integer: bool) -> ParamRange:
+    if isinstance(spec, list):
+        return ParamRange(values=tuple(float(value) for value in spec), integer=integer)
+    if not isinstance(spec, dict):
+        raise TypeError(f"Invalid parameter range: {spec!r}")
+    if "values" in spec:
+        values = tuple(float(value) for value in spec["values"])
+        return ParamRange(values=values, integer=integer)
+    return ParamRange(
+        low=float(spec["low"]),
+        high=float(spec["high"]),
+        steps=int(spec.get("steps", 5)),
+        integer=integer,
+    )
+
+
+def load_search_spaces(path: Path) -> List[SearchSpace]:
+    """Читает пространства поиска из JSON (``{"spaces": [...]}`` или списка)."""
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("spaces") or []
+    spaces: List[SearchSpace] = []
+    for entry in data:
+        strategy = str(entry["strategy"])
+        if strategy not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unsupported strategy '{strategy}' in search file")
+        integers = _integer_fields(strategy)
+        spaces.append(
+            SearchSpace(
+                strategy=strategy,
+                symbol=str(entry["symbol"]),
+                timeframe=str(entry["timeframe"]),
+                params={
+                    name: _parse_range(spec, name in integers)
+                    for name, spec in entry.get("params", {}).items()
+                },
+                csv_path=entry.get("csv_path"),
+            )
+        )
+    return spaces
+
+
+def grid_points(space: SearchSpace) -> Iterator[Dict[str, float]]:
+    """Все узлы декартовой сетки; генератор, сетка не материализуется."""
+
+    names = list(space.params)
+    for values in itertools.product(*(space.params[name].grid() for name in names)):
+        yield dict(zip(names, values))
+
+
+def latin_hypercube_points(
+    space: SearchSpace, samples: int, seed: int = 0
+) -> Iterator[Dict[str, float]]:
+    """Латинский гиперкуб: по каждому параметру ровно одна точка на каждый из ``samples`` слоёв."""
+
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, param in space.params.items():
+        strata = rng.permutation(samples)
+        columns[name] = param.scale((strata + rng.random(samples)) / samples)
+    for row in range(samples):
+        yield {name: float(values[row]) for name, values in columns.items()}
+
+
+def random_points(space: SearchSpace, samples: int, seed: int = 0) -> Iterator[Dict[str, float]]:
+    """Независимая равномерная выборка ``samples`` точек."""
+
+    rng = np.random.default_rng(seed)
+    columns = {name: param.scale(rng.random(samples)) for name, param in space.params.items()}
+    for row in range(samples):
+        yield {name: float(values[row]) for name, values in columns.items()}
+
+
+def sample_candidates(
+    space: SearchSpace,
+    method: SearchMethod = "grid",
+    samples: int = 100,
+    seed: int = 0,
+) -> Iterator[CandidateConfig]:
+    """Кандидаты пространства выбранным методом; повторы точек отбрасываются."""
+
+    if method == "grid":
+        points = grid_points(space)
+    elif method == "lhs":
+        points = latin_hypercube_points(space, samples, seed)
+    elif method == "random":
+        points = random_points(space, samples, seed)
+    else:
+        raise ValueError(f"Unknown search method '{method}'")
+    seen: Set[str] = set()
+    for params in points:
+        candidate = space.candidate(params)
+        if candidate.candidate_id not in seen:
+            seen.add(candidate.candidate_id)
+            yield candidate
+
+
+def score(result: BacktestResult) -> Tuple[float, float, float]:
+    """Ключ ранжирования: PF out-of-sample, затем in-sample, затем меньшая просадка."""
+
+    return (result.pf_oos, result.pf_is, -result.max_dd)
+
+
+def _record(candidate: CandidateConfig, result: BacktestResult) -> Dict[str, object]:
+    return {
+        "candidate_id": candidate.candidate_id,
+        "strategy": candidate.strategy,
+        "symbol": candidate.symbol,
+        "timeframe": candidate.timeframe,
+        "params": candidate.params,
+        "pf_is": result.pf_is,
+        "pf_oos": result.pf_oos,
+        "max_dd": result.max_dd,
+        "corr": result.corr,
+        "trades": result.trades,
+        # нулевые сделки: отсечён до симуляции или не торговал
+        "status": "ok" if result.trades > 0 else "pruned",
+    }
+
+
+def read_run_settings(path: Path) -> Dict[str, object] | None:
+    """Настройки прогона из заголовка файла результатов (``None`` — заголовка нет)."""
+
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(row, dict) and isinstance(row.get("run"), dict):
+                return row["run"]
+            return None
+    return None
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """Идентификаторы кандидатов, уже записанных в файл результатов."""
+
+    if not path.exists():
+        return set()
+    done: Set[str] = set()
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                done.add(json.loads(line)["candidate_id"])
+            except (ValueError, KeyError):
+                # недописанная строка прерванного запуска: кандидат посчитается заново
+                continue
+    return done
+
+
+def load_results(path: Path) -> pd.DataFrame:
+    """Результаты поиска из JSONL, отсортированные по ``score``."""
+
+    rows = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            # заголовок с настройками прогона — не результат
+            if "candidate_id" in row:
+                rows.append(row)
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return frame
+    frame["neg_max_dd"] = -frame["max_dd"]
+    frame = frame.sort_values(
+        ["pf_oos", "pf_is", "neg_max_dd", "candidate_id"],
+        ascending=[False, False, False, True],
+        kind="mergesort",
+    )
+    return frame.drop(columns="neg_max_dd").reset_index(drop=True)
+
+
+def _batches(candidates: Iterator[CandidateConfig], size: int) -> Iterator[List[CandidateConfig]]:
+    while True:
+        batch = list(itertools.islice(candidates, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_search(
+    spaces: Sequence[SearchSpace],
+    results_path: Path,
+    *,
+    method: SearchMethod = "grid",
+    samples: int = 100,
+    seed: int = 0,
+    start: str | None = None,
+    end: str | None = None,
+    exchange: str = "binanceusdm",
+    csv_root: Path | None = None,
+    split_ratio: float = 0.7,
+    regime_gating: bool = False,
+    workers: int = 1,
+    batch_size: int = 256,
+    min_in_sample_entries: int = 1,
+    top: int = 20,
+) -> List[Tuple[CandidateConfig, BacktestResult]]:
+    """
+    Прогоняет поиск и возвращает ``top`` лучших кандидатов этого запуска по ``score``.
+
+    Каждая партия из ``batch_size`` кандидатов дописывается в ``results_path``
+    (JSONL) сразу после расчёта; кандидаты, уже присутствующие в файле, пропускаются.
+    Файл, записанный с другими настройками прогона, не дописывается: ``ValueError``.
+    Полный рейтинг с учётом прошлых запусков даёт ``load_results``.
+    """
+
+    settings = json.loads(
+        json.dumps(
+            {
+                "start": start,
+                "end": end,
+                "exchange": exchange,
+                "split_ratio": split_ratio,
+                "regime_gating": regime_gating,
+                "min_in_sample_entries": min_in_sample_entries,
+            }
+        )
+    )
+    recorded = read_run_settings(results_path)
+    done = completed_ids(results_path)
+    if recorded is None and done:
+        raise ValueError(f"{results_path} has no run settings header, refusing to resume")
+    if recorded is not None and recorded != settings:
+        raise ValueError(
+            f"{results_path} was written with different run settings: {recorded} != {settings}"
+        )
+    start_ts = pd.Timestamp(start, tz="UTC") if start else None
+    end_ts = pd.Timestamp(end, tz="UTC") if end else None
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    best: List[Tuple[Tuple[float, float, float], str, CandidateConfig, BacktestResult]] = []
+
+    with results_path.open("a", encoding="utf-8") as handle:
+        if recorded is None:
+            handle.write(json.dumps({"run": settings}) + "\n")
+        for space in spaces:
+            # одна точка рынка: свечи загружаются один раз на пространство
+            price_cache = load_price_frames(
+                [space.candidate({})],
+                start_ts=start_ts,
+                end_ts=end_ts,
+                exchange=exchange,
+                csv_root=csv_root,
+            )
+            pending = (
+                candidate
+                for candidate in sample_candidates(space, method, samples, seed)
+                if candidate.candidate_id not in done
+            )
+            # воркеры и свечи в общей памяти живут всё пространство, а не одну партию
+            with CandidatePool(price_cache, workers) as pool:
+                for batch in _batches(pending, batch_size):
+                    results = evaluate_candidates(
+                        batch,
+                        price_cache,
+                        start_ts=start_ts,
+                        end_ts=end_ts,
+                        split_ratio=split_ratio,
+                        regime_gating=regime_gating,
+                        workers=workers,
+                        min_in_sample_entries=min_in_sample_entries,
+                        pool=pool if workers > 1 else None,
+                    )
+                    for candidate, result in zip(batch, results):
+                        handle.write(json.dumps(_record(candidate, result)) + "\n")
+                        done.add(candidate.candidate_id)
+                        if result.trades == 0:
+                            continue
+                        # min-heap по score: вытесняется худший из лучших
+                        entry = (score(result), candidate.candidate_id, candidate, result)
+                        if len(best) < top:
+                            heapq.heappush(best, entry)
+                        elif entry[:2] > best[0][:2]:
+                            heapq.heapreplace(best, entry)
+                    handle.flush()
+    ranked = sorted(best, key=lambda entry: entry[:2], reverse=True)
+    return [(candidate, result) for _, _, candidate, result in ranked]
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Parameter search over STRATEGY_REGISTRY configs.")
+    parser.add_argument("--spaces", required=True, help="JSON с пространствами поиска")
+    parser.add_argument("--results", required=True, help="JSONL с результатами (дописывается)")
+    parser.add_argument("--method", choices=("grid", "lhs", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=100, help="точек для lhs/random")
+    parser.add_argument("--seed", type=int, default=0, help="зерно lhs/random")
+    parser.add_argument("--start", help="начало периода (например, 2024-01-01)")
+    parser.add_argument("--end", help="окончание периода (например, 2024-04-01)")
+    parser.add_argument("--exchange", default="binanceusdm", help="биржа ccxt для загрузки данных")
+    parser.add_argument("--csv-root", help="каталог с CSV-файлами вида SYMBOL_TIMEFRAME.csv")
+    parser.add_argument("--split-ratio", type=float, default=0.7, help="доля данных для in-sample")
+    parser.add_argument("--regime-gating", action="store_true", help="гейтинг входов по режиму")
+    parser.add_argument("--workers", type=int, default=1, help="число процессов")
+    parser.add_argument("--batch-size", type=int, default=256, help="кандидатов в партии")
+    parser.add_argument(
+        "--min-is-entries",
+        type=int,
+        default=1,
+        help="минимум входов in-sample, иначе кандидат отсекается без симуляции",
+    )
+    parser.add_argument("--top", type=int, default=20, help="сколько лучших вывести")
+    return parser
+
+
+def main() -> None:
+    args = _build_arg_parser().parse_args()
+    ranked = run_search(
+        load_search_spaces(Path(args.spaces)),
+        Path(args.results),
+        method=args.method,
+        samples=args.samples,
+        seed=args.seed,
+        start=args.start,
+        end=args.end,
+        exchange=args.exchange,
+        csv_root=Path(args.csv_root) if args.csv_root else None,
+        split_ratio=args.split_ratio,
+        regime_gating=args.regime_gating,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        min_in_sample_entries=args.min_is_entries,
+        top=args.top,
+    )
+    for candidate, result in ranked:
+        print(
+            f"{candidate.candidate_id:<36} pf_oos={result.pf_oos:8.3f} pf_is={result.pf_is:8.3f} "
+            f"max_dd={result.max_dd:6.3f} trades={result.trades:5d} {candidate.params}"
+        )
+
+
+__all__ = [
+    "ParamRange",
+    "SearchSpace",
+    "completed_ids",
+    "grid_points",
+    "latin_hypercube_points",
+    "load_results",
+    "load_search_spaces",
+    "random_points",
+    "read_run_settings",
+    "run_search",
+    "sample_candidates",
+    "score",
+]
+
+
+if __name__ == "__main__":
+    main()
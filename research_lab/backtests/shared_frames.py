@@ -0,0 +1,114 @@
+"""Кадры свечей в общей памяти для параллельных бэктестов.
+
+Родительский процесс кладёт каждый набор свечей (symbol, timeframe) в один блок
+``multiprocessing.shared_memory`` один раз: метки индекса (``int64``) и значения
+колонок по столбцам. Задачам уходит только ``SharedFrameSpec`` — имя блока и
+раскладка, — а воркер собирает DataFrame поверх буфера блока без копии значений и
+держит его до конца процесса. Поддерживаются кадры с ``DatetimeIndex`` и числовыми
+колонками одного типа (свечи бэктеста, в том числе компактные ``float32``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Self, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class SharedFrameSpec:
+    """Описание кадра в блоке общей памяти; дёшево передаётся воркерам."""
+
+    name: str
+    rows: int
+    columns: Tuple[str, ...]
+    dtype: str
+    index_dtype: str
+    index_name: str | None
+
+
+class SharedFrameStore:
+    """Владелец блоков общей памяти: создаёт их и освобождает в ``close``."""
+
+    def __init__(self) -> None:
+        self._blocks: List[SharedMemory] = []
+
+    def share(self, frame: pd.DataFrame) -> SharedFrameSpec:
+        """Копирует кадр в новый блок общей памяти и возвращает его описание."""
+
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            raise TypeError("В общую память кладутся только кадры с DatetimeIndex.")
+        dtypes = set(frame.dtypes)
+        if len(dtypes) > 1 or any(dtype.kind not in "fiu" for dtype in dtypes):
+            raise ValueError("Колонки кадра должны быть числовыми и одного типа.")
+        dtype = dtypes.pop() if dtypes else np.dtype(np.float64)
+        rows, width = frame.shape
+        index_bytes = rows * 8
+        size = index_bytes + rows * width * dtype.itemsize
+        block = SharedMemory(create=True, size=max(1, size))
+        self._blocks.append(block)
+        np.ndarray(rows, dtype=np.int64, buffer=block.buf)[:] = frame.index.asi8
+        # по столбцам: каждая колонка — непрерывный участок, как блок pandas
+        values: np.ndarray = np.ndarray(
+            (width, rows), dtype=dtype, buffer=block.buf, offset=index_bytes
+        )
+        values[:] = frame.to_numpy(dtype=dtype).T
+        return SharedFrameSpec(
+            name=block.name,
+            rows=rows,
+            columns=tuple(str(column) for column in frame.columns),
+            dtype=dtype.str,
+            index_dtype=str(frame.index.dtype),
+            index_name=frame.index.name,
+        )
+
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# блоки, подключённые в этом процессе: имя -> (блок, кадр поверх него)
+_ATTACHED: Dict[str, Tuple[SharedMemory, pd.DataFrame]] = {}
+
+
+def attach_frame(spec: SharedFrameSpec) -> pd.DataFrame:
+    """
+    Кадр поверх блока общей памяти (подключается один раз на процесс).
+
+    Значения не копируются и разделяются всеми воркерами: кадр только для чтения.
+    """
+
+    attached = _ATTACHED.get(spec.name)
+    if attached is not None:
+        return attached[1]
+    # воркеры пула делят трекер ресурсов с родителем: блок освобождает только он
+    block = SharedMemory(name=spec.name)
+    dtype = np.dtype(spec.dtype)
+    index_bytes = spec.rows * 8
+    stamps: np.ndarray = np.ndarray(spec.rows, dtype=np.int64, buffer=block.buf)
+    values: np.ndarray = np.ndarray(
+        (len(spec.columns), spec.rows), dtype=dtype, buffer=block.buf, offset=index_bytes
+    )
+    values.flags.writeable = False
+    index = pd.DatetimeIndex(stamps, dtype=spec.index_dtype, name=spec.index_name)
+    frame = pd.DataFrame(values.T, index=index, columns=list(spec.columns), copy=False)
+    _ATTACHED[spec.name] = (block, frame)
+    return frame
+
+
+__all__ = [
+    "SharedFrameSpec",
+    "SharedFrameStore",
+    "attach_frame",
+]
@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import argparse
 import json
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Tuple, Type, Union, get_args, get_origin
+from typing import Dict, Iterable, List, Self, Sequence, Tuple, Type, Union, get_args, get_origin
 
 import numpy as np
 import pandas as pd
 import vectorbt as vbt
 
+from brain_orchestrator.regimes import RegimeDetector
+from prod_core.data.aggregation import aggregate_frame, can_aggregate
+from prod_core.data.compact import compact_frame
+from prod_core.data.feature_cache import FeatureCache, get_feature_cache
 from prod_core.data.features import FeatureEngineer
 from prod_core.strategies import (
     Breakout4HStrategy,
@@ -23,6 +28,7 @@ from prod_core.strategies.breakout_4h import BreakoutConfig
 from prod_core.strategies.funding_rev import FundingReversionConfig
 from prod_core.strategies.range_rev_5m import RangeReversionConfig
 from prod_core.strategies.vol_exp_15m import VolatilityExpansionConfig
+from research_lab.backtests.shared_frames import SharedFrameSpec, SharedFrameStore, attach_frame
 
 try:
     import ccxt  # type: ignore[import-untyped]
@@ -192,7 +198,7 @@ def _fetch_ccxt(
     return _normalize_dataframe(frame.astype(float))
 
 
-def _resolve_type(annotation: Type) -> Type:
+def _resolve_type(annotation: Type | str) -> Type | str:
     origin = get_origin(annotation)
     if origin is None:
         return annotation
@@ -257,6 +263,10 @@ def _compute_max_drawdown(value: pd.Series) -> float:
     return float(abs(drawdown.min()))
 
 
+# столбцов в одном вызове from_signals: ограничивает память 2D-массивов портфеля
+_BATCH_COLUMNS = 32
+
+
 def _sanitize_symbol(symbol: str) -> str:
     return symbol.replace("/", "_").replace(":", "_").replace("-", "_")
 
@@ -265,26 +275,98 @@ def _generate_signals(
     strategy: TradingStrategy,
     candles: pd.DataFrame,
     features: pd.DataFrame,
+    regimes: pd.Series | None = None,
 ) -> Tuple[pd.Series, pd.Series, pd.Series, pd.Series]:
+    """Сигналы входа/выхода по барам; ``regimes`` (``detect_series``) включает гейтинг.
+
+    Если стратегия умеет ``generate_signal_series``, входы берутся из её рядов и
+    прогон переходит от входа к входу без побарного цикла. Иначе прогон повторяет
+    живой цикл бар за баром, но стратегия видит только хвост из
+    ``strategy.lookback_bars`` баров (``None`` — весь префикс истории), а в позиции
+    не вызывается вовсе: выход определяется только ``min_hold_bars``. Срезы — это
+    представления без копии, поэтому стоимость бара не зависит от длины истории.
+
+    С ``regimes`` вход на баре возможен, только если режим бара входит в
+    ``strategy.supported_regimes`` — как в ``TradingStrategy.generate_signals``.
+    """
+
     index = features.index
     candles = candles.loc[index]
-    long_entries = pd.Series(False, index=index)
-    long_exits = pd.Series(False, index=index)
-    short_entries = pd.Series(False, index=index)
-    short_exits = pd.Series(False, index=index)
+    min_hold = max(1, strategy.min_hold_bars)
+    allowed: np.ndarray | None = None
+    if regimes is not None:
+        supported = [int(regime) for regime in strategy.supported_regimes]
+        allowed = regimes.reindex(index).isin(supported).to_numpy()
+
+    series = strategy.generate_signal_series(candles, features)
+    if series is not None:
+        long_signal, short_signal = (signal.to_numpy(dtype=bool) for signal in series)
+        flags = _replay_signal_series(long_signal, short_signal, min_hold, allowed)
+    else:
+        flags = _replay_bars(strategy, candles, features, min_hold, allowed)
+    long_entries, long_exits, short_entries, short_exits = (
+        pd.Series(flag, index=index) for flag in flags
+    )
+    return long_entries, long_exits, short_entries, short_exits
+
+
+def _replay_signal_series(
+    long_signal: np.ndarray,
+    short_signal: np.ndarray,
+    min_hold: int,
+    allowed: np.ndarray | None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    size = len(long_signal)
+    long_entries = np.zeros(size, dtype=bool)
+    long_exits = np.zeros(size, dtype=bool)
+    short_entries = np.zeros(size, dtype=bool)
+    short_exits = np.zeros(size, dtype=bool)
+    candidates = long_signal | short_signal
+    if allowed is not None:
+        candidates &= allowed
+    # первому бару не хватает предыдущего для сигналов
+    starts = np.flatnonzero(candidates[1:]) + 1
+    idx = 1
+    while True:
+        position = int(np.searchsorted(starts, idx))
+        if position == len(starts):
+            break
+        entry_idx = int(starts[position])
+        is_long = bool(long_signal[entry_idx])
+        (long_entries if is_long else short_entries)[entry_idx] = True
+        # выход ровно через min_hold баров или на последнем баре истории
+        exit_idx = min(entry_idx + min_hold, size - 1)
+        (long_exits if is_long else short_exits)[exit_idx] = True
+        idx = exit_idx + 1
+    return long_entries, long_exits, short_entries, short_exits
+
+
+def _replay_bars(
+    strategy: TradingStrategy,
+    candles: pd.DataFrame,
+    features: pd.DataFrame,
+    min_hold: int,
+    allowed: np.ndarray | None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    size = len(features)
+    long_entries = np.zeros(size, dtype=bool)
+    long_exits = np.zeros(size, dtype=bool)
+    short_entries = np.zeros(size, dtype=bool)
+    short_exits = np.zeros(size, dtype=bool)
+    lookback = strategy.lookback_bars
 
     position: str | None = None
     entry_idx = -1
-    min_hold = max(1, strategy.min_hold_bars)
-
-    for idx, ts in enumerate(index):
-        slice_candles = candles.iloc[: idx + 1]
-        slice_features = features.iloc[: idx + 1]
-        if len(slice_candles) < 2 or slice_features.empty:
-            continue
-        signals = strategy._generate(slice_candles, slice_features)
 
+    # первому бару не хватает предыдущего для сигналов
+    for idx in range(1, size):
         if position is None:
+            if allowed is not None and not allowed[idx]:
+                continue
+            start = 0 if lookback is None else max(0, idx + 1 - lookback)
+            signals = strategy._generate(
+                candles.iloc[start : idx + 1], features.iloc[start : idx + 1]
+            )
             chosen = None
             for signal in signals:
                 if signal.side == "long":
@@ -294,11 +376,11 @@ def _generate_signals(
                     chosen = "short"
                     break
             if chosen == "long":
-                long_entries.iloc[idx] = True
+                long_entries[idx] = True
                 position = "long"
                 entry_idx = idx
             elif chosen == "short":
-                short_entries.iloc[idx] = True
+                short_entries[idx] = True
                 position = "short"
                 entry_idx = idx
             continue
@@ -308,88 +390,363 @@ def _generate_signals(
             continue
 
         if position == "long":
-            long_exits.iloc[idx] = True
+            long_exits[idx] = True
         else:
-            short_exits.iloc[idx] = True
+            short_exits[idx] = True
         position = None
         entry_idx = -1
 
     if position == "long":
-        long_exits.iloc[-1] = True
+        long_exits[-1] = True
     elif position == "short":
-        short_exits.iloc[-1] = True
+        short_exits[-1] = True
 
     return long_entries, long_exits, short_entries, short_exits
 
 
+def _zero_result(candidate: CandidateConfig) -> BacktestResult:
+    return BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0)
+
+
 def _run_candidate_backtest(
     candidate: CandidateConfig,
     candles: pd.DataFrame,
     split_ratio: float,
+    feature_cache: FeatureCache | None = None,
+    regime_gating: bool = False,
 ) -> BacktestResult:
-    strategy = build_strategy(candidate)
-    engineer = FeatureEngineer()
-    features = engineer.build(candles)
+    return _run_candidate_batch([candidate], candles, split_ratio, feature_cache, regime_gating)[0]
+
+
+def _run_candidate_batch(
+    candidates: Sequence[CandidateConfig],
+    candles: pd.DataFrame,
+    split_ratio: float,
+    feature_cache: FeatureCache | None = None,
+    regime_gating: bool = False,
+    min_in_sample_entries: int = 0,
+) -> List[BacktestResult]:
+    """Бэктест кандидатов на общих свечах (один symbol/timeframe и окно).
+
+    Признаки и режимы считаются один раз, маски входов/выходов кандидатов
+    складываются в столбцы 2D-массивов и симулируются одним вызовом
+    ``from_signals`` (по ``_BATCH_COLUMNS`` столбцов). Столбцы независимы, поэтому
+    метрики каждого кандидата те же, что при отдельном прогоне. Кандидаты, у
+    которых до in-sample границы меньше ``min_in_sample_entries`` входов, в
+    симуляцию не попадают и получают нулевой результат.
+    """
+
+    results = [_zero_result(candidate) for candidate in candidates]
+    if not candidates:
+        return results
+    cache = feature_cache if feature_cache is not None else get_feature_cache()
+    # кандидаты с общим symbol/timeframe и окном делят один расчёт признаков
+    features = cache.get_or_build(
+        candidates[0].symbol or "",
+        candidates[0].timeframe or "",
+        candles,
+        lambda: FeatureEngineer().build(candles),
+        consumer="backtest",
+    )
     if features.empty:
-        return BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0)
+        return results
 
     candles = candles.loc[features.index]
-    long_entries, long_exits, short_entries, short_exits = _generate_signals(strategy, candles, features)
-
-    if long_entries.sum() == 0 and short_entries.sum() == 0:
-        return BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0)
+    regimes = RegimeDetector().detect_series(features) if regime_gating else None
+    # частота портфеля — таймфрейм стратегии, поэтому партии собираются по нему
+    pending: Dict[str, List[Tuple[int, Tuple[pd.Series, ...]]]] = {}
+    for position, candidate in enumerate(candidates):
+        strategy = build_strategy(candidate)
+        signals = _generate_signals(strategy, candles, features, regimes)
+        if signals[0].sum() == 0 and signals[2].sum() == 0:
+            continue
+        pending.setdefault(strategy.timeframe, []).append((position, signals))
 
     close = candles["close"]
+    split_idx = _split_index(len(close), split_ratio)
+    for freq, items in pending.items():
+        if min_in_sample_entries > 0:
+            items = [
+                (position, signals)
+                for position, signals in items
+                if signals[0].iloc[:split_idx].sum() + signals[2].iloc[:split_idx].sum()
+                >= min_in_sample_entries
+            ]
+        for offset in range(0, len(items), _BATCH_COLUMNS):
+            batch = items[offset : offset + _BATCH_COLUMNS]
+            metrics = _simulate_batch(close, [signals for _, signals in batch], freq, split_ratio)
+            for (position, _), values in zip(batch, metrics):
+                if values is not None:
+                    candidate = candidates[position]
+                    results[position] = BacktestResult(
+                        candidate.candidate_id, candidate.strategy, *values
+                    )
+    return results
+
+
+def _simulate_batch(
+    close: pd.Series,
+    signals: Sequence[Tuple[pd.Series, ...]],
+    freq: str,
+    split_ratio: float,
+) -> List[Tuple[float, float, float, float, int] | None]:
+    """Метрики (pf_is, pf_oos, max_dd, corr, trades) по столбцам; ``None`` — нет сделок."""
+
+    columns = pd.RangeIndex(len(signals))
+    long_entries, long_exits, short_entries, short_exits = (
+        pd.DataFrame(
+            np.column_stack([flags[kind].to_numpy() for flags in signals]),
+            index=close.index,
+            columns=columns,
+        )
+        for kind in range(4)
+    )
     portfolio = vbt.Portfolio.from_signals(
         close,
         entries=long_entries,
         exits=long_exits,
         short_entries=short_entries,
         short_exits=short_exits,
-        freq=strategy.timeframe,
+        freq=freq,
     )
     trades_records = portfolio.trades.records
-    trades = int(portfolio.trades.count())
+    counts = portfolio.trades.count()
+    equity = portfolio.value()
+    returns = portfolio.returns()
+    base_returns = close.pct_change()
+    split_idx = _split_index(len(close), split_ratio)
+
+    metrics: List[Tuple[float, float, float, float, int] | None] = []
+    for column in range(len(columns)):
+        trades = int(counts.iloc[column])
+        if trades == 0:
+            metrics.append(None)
+            continue
+        records = trades_records[trades_records["col"] == column]
+        pnl = records["pnl"]
+        pf_is = _profit_factor(pnl[records["exit_idx"] < split_idx])
+        pf_oos = _profit_factor(pnl[records["exit_idx"] >= split_idx])
 
-    if trades == 0:
-        return BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0)
+        max_dd = _compute_max_drawdown(equity.iloc[:, column])
 
-    pnl = trades_records["pnl"]
-    split_idx = max(1, min(len(close) - 1, int(len(close) * split_ratio)))
-    pf_is = _profit_factor(pnl[trades_records["exit_idx"] < split_idx])
-    pf_oos = _profit_factor(pnl[trades_records["exit_idx"] >= split_idx])
+        column_returns = returns.iloc[:, column].dropna()
+        aligned = base_returns.reindex(column_returns.index).fillna(0.0)
+        corr = float(column_returns.corr(aligned)) if len(column_returns) > 1 else 0.0
+        if np.isnan(corr):
+            corr = 0.0
+        metrics.append((pf_is, pf_oos, max_dd, corr, trades))
+    return metrics
 
-    equity = portfolio.value()
-    max_dd = _compute_max_drawdown(equity)
 
-    returns = portfolio.returns().dropna()
-    base_returns = close.pct_change().reindex(returns.index).fillna(0.0)
-    corr = float(returns.corr(base_returns)) if len(returns) > 1 else 0.0
-    if np.isnan(corr):
-        corr = 0.0
+def _split_index(size: int, split_ratio: float) -> int:
+    """Первый бар out-of-sample части."""
 
-    return BacktestResult(candidate.candidate_id, candidate.strategy, pf_is, pf_oos, max_dd, corr, trades)
+    return max(1, min(size - 1, int(size * split_ratio)))
 
 
-def run_backtests(
-    config_path: Path | str,
+def _slice_window(
+    candles: pd.DataFrame,
+    start_ts: pd.Timestamp | None,
+    end_ts: pd.Timestamp | None,
+) -> pd.DataFrame:
+    window = candles
+    if start_ts:
+        window = window.loc[start_ts:]
+    if end_ts:
+        window = window.loc[:end_ts]
+    return window
+
+
+def _backtest_group(
+    candidates: Sequence[CandidateConfig],
+    candles: pd.DataFrame,
+    start_ts: pd.Timestamp | None,
+    end_ts: pd.Timestamp | None,
+    split_ratio: float,
+    regime_gating: bool,
+    min_in_sample_entries: int = 0,
+) -> List[BacktestResult]:
+    window = _slice_window(candles, start_ts, end_ts)
+    if window.empty:
+        return [_zero_result(candidate) for candidate in candidates]
+    return _run_candidate_batch(
+        candidates,
+        window,
+        split_ratio,
+        regime_gating=regime_gating,
+        min_in_sample_entries=min_in_sample_entries,
+    )
+
+
+# (кандидаты, свечи в общей памяти, начало, конец, split_ratio, regime_gating,
+#  min_in_sample_entries)
+_SharedTask = Tuple[
+    List[CandidateConfig],
+    SharedFrameSpec,
+    pd.Timestamp | None,
+    pd.Timestamp | None,
+    float,
+    bool,
+    int,
+]
+
+
+def _backtest_shared(task: _SharedTask) -> List[BacktestResult]:
+    """Задача воркера: свечи берутся из общей памяти, а не из аргументов задачи."""
+
+    candidates, spec, start_ts, end_ts, split_ratio, regime_gating, min_entries = task
+    candles = attach_frame(spec)
+    return _backtest_group(
+        candidates, candles, start_ts, end_ts, split_ratio, regime_gating, min_entries
+    )
+
+
+def _group_candidates(candidates: Sequence[CandidateConfig]) -> Dict[Tuple[str, str], List[int]]:
+    """Позиции кандидатов по (symbol, timeframe) в порядке первого появления."""
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for position, candidate in enumerate(candidates):
+        key = (candidate.symbol or "", candidate.timeframe or "")
+        groups.setdefault(key, []).append(position)
+    return groups
+
+
+def _run_serial(
+    candidates: Sequence[CandidateConfig],
+    price_cache: Dict[Tuple[str, str], pd.DataFrame],
+    start_ts: pd.Timestamp | None,
+    end_ts: pd.Timestamp | None,
+    split_ratio: float,
+    regime_gating: bool,
+    min_in_sample_entries: int,
+) -> List[BacktestResult]:
+    results: List[BacktestResult | None] = [None] * len(candidates)
+    for key, positions in _group_candidates(candidates).items():
+        group = [candidates[position] for position in positions]
+        batch = _backtest_group(
+            group,
+            price_cache[key],
+            start_ts,
+            end_ts,
+            split_ratio,
+            regime_gating,
+            min_in_sample_entries,
+        )
+        for position, result in zip(positions, batch):
+            results[position] = result
+    return [result for result in results if result is not None]
+
+
+class CandidatePool:
+    """
+    Пул процессов и свечи в общей памяти для серии вызовов ``evaluate_candidates``.
+
+    Процессы и блоки общей памяти создаются при первой партии и живут до ``close``:
+    поиск по партиям не платит за запуск воркеров и копирование свечей на каждую
+    партию, а воркеры подключают блоки один раз (``attach_frame``).
+    """
+
+    def __init__(self, price_cache: Dict[Tuple[str, str], pd.DataFrame], workers: int) -> None:
+        self.workers = max(1, workers)
+        self._price_cache = price_cache
+        self._store: SharedFrameStore | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._specs: Dict[Tuple[str, str], SharedFrameSpec] = {}
+
+    def spec(self, key: Tuple[str, str]) -> SharedFrameSpec:
+        """Описание свечей ``key`` в общей памяти; кадр копируется туда один раз."""
+
+        spec = self._specs.get(key)
+        if spec is None:
+            if self._store is None:
+                self._store = SharedFrameStore()
+            spec = self._specs[key] = self._store.share(self._price_cache[key])
+        return spec
+
+    def map(self, tasks: Sequence[_SharedTask]) -> Iterable[List[BacktestResult]]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.map(_backtest_shared, tasks)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        self._specs.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _run_parallel(
+    candidates: Sequence[CandidateConfig],
+    price_cache: Dict[Tuple[str, str], pd.DataFrame],
+    start_ts: pd.Timestamp | None,
+    end_ts: pd.Timestamp | None,
+    split_ratio: float,
+    regime_gating: bool,
+    min_in_sample_entries: int,
+    workers: int,
+    pool: CandidatePool | None = None,
+) -> List[BacktestResult]:
+    if pool is None:
+        with CandidatePool(price_cache, workers) as owned:
+            return _run_parallel(
+                candidates,
+                price_cache,
+                start_ts,
+                end_ts,
+                split_ratio,
+                regime_gating,
+                min_in_sample_entries,
+                workers,
+                owned,
+            )
+    # задача — партия кандидатов одной группы: примерно поровну на воркер
+    chunk = max(1, min(_BATCH_COLUMNS, -(-len(candidates) // pool.workers)))
+    results: List[BacktestResult | None] = [None] * len(candidates)
+    slots: List[List[int]] = []
+    tasks: List[_SharedTask] = []
+    for key, positions in _group_candidates(candidates).items():
+        for offset in range(0, len(positions), chunk):
+            part = positions[offset : offset + chunk]
+            slots.append(part)
+            tasks.append(
+                (
+                    [candidates[position] for position in part],
+                    pool.spec(key),
+                    start_ts,
+                    end_ts,
+                    split_ratio,
+                    regime_gating,
+                    min_in_sample_entries,
+                )
+            )
+    for part, batch in zip(slots, pool.map(tasks)):
+        for position, result in zip(part, batch):
+            results[position] = result
+    # результаты в порядке кандидатов, как у последовательного прогона
+    return [result for result in results if result is not None]
+
+
+def load_price_frames(
+    candidates: Sequence[CandidateConfig],
     *,
-    start: str | None = None,
-    end: str | None = None,
-    save_csv: Path | None = None,
-    save_json: Path | None = None,
+    start_ts: pd.Timestamp | None = None,
+    end_ts: pd.Timestamp | None = None,
     exchange: str = "binanceusdm",
     csv_root: Path | None = None,
-    split_ratio: float = 0.7,
-) -> List[BacktestResult]:
-    """Запускает backtests для списка кандидатов с использованием vectorbt."""
+    compact: bool = False,
+) -> Dict[Tuple[str, str], pd.DataFrame]:
+    """Свечи каждого (symbol, timeframe) кандидатов: CSV, агрегация минуток или ccxt."""
 
-    candidates = load_candidates(Path(config_path))
-    start_ts = pd.Timestamp(start, tz="UTC") if start else None
-    end_ts = pd.Timestamp(end, tz="UTC") if end else None
     price_cache: Dict[Tuple[str, str], pd.DataFrame] = {}
-    results: List[BacktestResult] = []
-
     for candidate in candidates:
         if not candidate.symbol or not candidate.timeframe:
             raise ValueError(f"Candidate {candidate.candidate_id} must define 'symbol' and 'timeframe' for backtests.")
@@ -400,24 +757,113 @@ def run_backtests(
                 data_frame = _load_from_csv(Path(candidate.csv_path))
             elif csv_root:
                 csv_guess = csv_root / f"{_sanitize_symbol(candidate.symbol)}_{candidate.timeframe}.csv"
+                base_guess = csv_root / f"{_sanitize_symbol(candidate.symbol)}_1m.csv"
                 if csv_guess.exists():
                     data_frame = _load_from_csv(csv_guess)
+                elif base_guess.exists() and can_aggregate("1m", candidate.timeframe):
+                    # старший таймфрейм собираем из минуток тем же кодом, что и живой фид
+                    data_frame = aggregate_frame(
+                        _load_from_csv(base_guess), candidate.timeframe, base_timeframe="1m"
+                    )
                 else:
                     data_frame = _fetch_ccxt(exchange, candidate.symbol, candidate.timeframe, start_ts, end_ts)
             else:
                 data_frame = _fetch_ccxt(exchange, candidate.symbol, candidate.timeframe, start_ts, end_ts)
-            price_cache[key] = data_frame
-        candles = price_cache[key]
-        window = candles.copy()
-        if start_ts:
-            window = window.loc[start_ts:]
-        if end_ts:
-            window = window.loc[:end_ts]
-        if window.empty:
-            results.append(BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0))
-            continue
-        results.append(_run_candidate_backtest(candidate, window, split_ratio))
+            price_cache[key] = compact_frame(data_frame) if compact else data_frame
+    return price_cache
+
 
+def evaluate_candidates(
+    candidates: Sequence[CandidateConfig],
+    price_cache: Dict[Tuple[str, str], pd.DataFrame],
+    *,
+    start_ts: pd.Timestamp | None = None,
+    end_ts: pd.Timestamp | None = None,
+    split_ratio: float = 0.7,
+    regime_gating: bool = False,
+    workers: int = 1,
+    min_in_sample_entries: int = 0,
+    pool: CandidatePool | None = None,
+) -> List[BacktestResult]:
+    """Метрики кандидатов по загруженным свечам в порядке ``candidates``.
+
+    Кандидаты с общим (symbol, timeframe) симулируются партиями, с ``workers > 1`` —
+    в пуле процессов. ``min_in_sample_entries`` отсекает безнадёжных кандидатов до
+    симуляции: с меньшим числом входов до in-sample границы результат нулевой.
+    ``pool`` переиспользует процессы и общую память между вызовами (``CandidatePool``
+    поверх того же ``price_cache``).
+    """
+
+    if (pool is not None or workers > 1) and len(candidates) > 1:
+        return _run_parallel(
+            candidates,
+            price_cache,
+            start_ts,
+            end_ts,
+            split_ratio,
+            regime_gating,
+            min_in_sample_entries,
+            workers,
+            pool,
+        )
+    return _run_serial(
+        candidates,
+        price_cache,
+        start_ts,
+        end_ts,
+        split_ratio,
+        regime_gating,
+        min_in_sample_entries,
+    )
+
+
+def run_backtests(
+    config_path: Path | str,
+    *,
+    start: str | None = None,
+    end: str | None = None,
+    save_csv: Path | None = None,
+    save_json: Path | None = None,
+    exchange: str = "binanceusdm",
+    csv_root: Path | None = None,
+    split_ratio: float = 0.7,
+    compact: bool = False,
+    regime_gating: bool = False,
+    workers: int = 1,
+) -> List[BacktestResult]:
+    """Запускает backtests для списка кандидатов с использованием vectorbt.
+
+    ``compact=True`` хранит загруженные свечи в ``float32`` (см. ``prod_core.data.compact``),
+    чтобы длинная история многих символов помещалась в память. ``regime_gating=True``
+    размечает режим каждого бара (``RegimeDetector.detect_series``) и пропускает входы
+    в режимах вне ``supported_regimes`` стратегии, как живой цикл.
+
+    ``workers > 1`` распределяет кандидатов по пулу процессов. Свечи каждого
+    (symbol, timeframe) загружаются один раз и передаются воркерам через общую
+    память (``shared_frames``), а не сериализуются в каждую задачу; результаты
+    идут в порядке кандидатов и совпадают с последовательным прогоном.
+    """
+
+    candidates = load_candidates(Path(config_path))
+    start_ts = pd.Timestamp(start, tz="UTC") if start else None
+    end_ts = pd.Timestamp(end, tz="UTC") if end else None
+    price_cache = load_price_frames(
+        candidates,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        exchange=exchange,
+        csv_root=csv_root,
+        compact=compact,
+    )
+    results = evaluate_candidates(
+        candidates,
+        price_cache,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        split_ratio=split_ratio,
+        regime_gating=regime_gating,
+        workers=workers,
+    )
     if save_csv:
         save_results(results, save_csv)
     if save_json:
@@ -470,6 +916,22 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--split-ratio", type=float, default=0.7, help="доля данных для in-sample (0..1)")
     parser.add_argument("--save-csv", help="куда сохранить результаты в CSV")
     parser.add_argument("--save-json", help="куда сохранить результаты в JSON")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="хранить свечи в float32 (экономия памяти на длинной истории)",
+    )
+    parser.add_argument(
+        "--regime-gating",
+        action="store_true",
+        help="входить только в режимах из supported_regimes стратегии",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="число процессов для параллельного прогона кандидатов (по умолчанию 1)",
+    )
     return parser
 
 
@@ -489,13 +951,20 @@ def main() -> None:
         exchange=args.exchange,
         csv_root=csv_root,
         split_ratio=args.split_ratio,
+        compact=args.compact,
+        regime_gating=args.regime_gating,
+        workers=args.workers,
     )
 
 
 __all__ = [
     "CandidateConfig",
     "BacktestResult",
+    "CandidatePool",
+    "STRATEGY_REGISTRY",
+    "evaluate_candidates",
     "load_candidates",
+    "load_price_frames",
     "run_backtests",
     "save_results",
     "build_strategy",
@@ -0,0 +1,117 @@
+"""Микро-бенчмарк CandleBuffer: колоночный кольцевой буфер против OrderedDict-версии."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+
+from prod_core.data.feed import CandleBuffer, CandleRecord
+
+
+class LegacyCandleBuffer:
+    """Прежняя реализация: пересортировка OrderedDict на каждый upsert."""
+
+    def __init__(self, symbol: str, timeframe: str, maxlen: int = 5000) -> None:
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.maxlen = maxlen
+        self._records: "OrderedDict[pd.Timestamp, CandleRecord]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def upsert(self, record: CandleRecord) -> None:
+        self._records[record.ts] = record
+        self._records = OrderedDict(sorted(self._records.items(), key=lambda item: item[0]))
+        while len(self._records) > self.maxlen:
+            self._records.popitem(last=False)
+
+
+def _records(count: int, start: pd.Timestamp) -> list[CandleRecord]:
+    step = timedelta(minutes=1)
+    return [
+        CandleRecord(
+            ts=start + step * i,
+            open=100.0 + i * 0.01,
+            high=100.5 + i * 0.01,
+            low=99.5 + i * 0.01,
+            close=100.2 + i * 0.01,
+            volume=10.0,
+            tf="1m",
+            symbol="BTC/USDT:USDT",
+            source="bench",
+        )
+        for i in range(count)
+    ]
+
+
+def _measure(
+    buffer: CandleBuffer | LegacyCandleBuffer,
+    records: list[CandleRecord],
+    late: list[CandleRecord],
+    ops: int,
+) -> dict[str, float]:
+    """Возвращает среднее время (мкс) append/replace-last/out-of-order на заполненном буфере.
+
+    ``late`` — бары, пропущенные при заполнении: их upsert — настоящая вставка в середину.
+    """
+
+    fresh = _records(ops, records[-1].ts + timedelta(minutes=1))
+
+    started = time.perf_counter()
+    for record in fresh:
+        buffer.upsert(record)
+    append_us = (time.perf_counter() - started) / ops * 1e6
+
+    started = time.perf_counter()
+    for _ in range(ops):
+        buffer.upsert(fresh[-1])
+    replace_us = (time.perf_counter() - started) / ops * 1e6
+
+    started = time.perf_counter()
+    for record in late:
+        buffer.upsert(record)
+    late_us = (time.perf_counter() - started) / max(1, len(late)) * 1e6
+    return {"append_us": append_us, "replace_us": replace_us, "out_of_order_us": late_us}
+
+
+def run(sizes: list[int], ops: int) -> pd.DataFrame:
+    rows = []
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    for size in sizes:
+        records = _records(size, base)
+        # каждый второй бар из середины истории приходит позже остальных
+        middle = len(records) // 2
+        late = records[middle : middle + 2 * ops : 2]
+        missing = {record.ts for record in late}
+        filled = [record for record in records if record.ts not in missing]
+
+        columnar = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=size)
+        for record in filled:
+            columnar.upsert(record)
+
+        legacy = LegacyCandleBuffer("BTC/USDT:USDT", "1m", maxlen=size)
+        # заполняем напрямую, иначе прогрев старой версии занимает O(n^2 log n)
+        legacy._records = OrderedDict((record.ts, record) for record in filled)
+
+        for name, buffer in (("columnar", columnar), ("ordered_dict", legacy)):
+            rows.append({"bars": size, "impl": name, **_measure(buffer, records, late, ops)})
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CandleBuffer.upsert.")
+    parser.add_argument("--sizes", default="500,5000,50000", help="размеры буфера через запятую")
+    parser.add_argument("--ops", type=int, default=100, help="операций на каждый сценарий")
+    args = parser.parse_args()
+    sizes = [int(item) for item in args.sizes.split(",") if item.strip()]
+    report = run(sizes, args.ops)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
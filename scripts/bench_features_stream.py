@@ -0,0 +1,71 @@
+"""Бенчмарк признаков на цикл: полный ``FeatureEngineer.build`` против потокового режима."""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from prod_core.data import FeatureEngineer
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def _candles(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    index = pd.date_range("2024-01-01", periods=rows, freq="1min", tz="UTC", name="ts")
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * 1.001,
+            "low": close * 0.999,
+            "close": close,
+            "volume": 10.0,
+        },
+        index=index,
+    )
+
+
+def run(buffer: int, cycles: int) -> pd.DataFrame:
+    candles = _candles(buffer + cycles)
+    frames = [candles.iloc[idx : idx + buffer] for idx in range(cycles + 1)]
+
+    full = FeatureEngineer()
+    started = time.perf_counter()
+    for frame in frames[1:]:
+        full.build(frame)
+    full_s = time.perf_counter() - started
+
+    streaming = FeatureEngineer(streaming=True)
+    started = time.perf_counter()
+    streaming.update(SYMBOL, "1m", frames[0])
+    warmup_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for frame in frames[1:]:
+        streamed = streaming.update(SYMBOL, "1m", frame)
+    stream_s = time.perf_counter() - started
+
+    # кадр сдвигается по кольцевому буферу: сверяем с build() по всей истории
+    assert streamed.equals(full.build(candles).iloc[-buffer:])
+    rows = [
+        {"mode": "build", "ms_per_cycle": full_s / cycles * 1e3},
+        {"mode": "streaming (warm-up)", "ms_per_cycle": warmup_s * 1e3},
+        {"mode": "streaming", "ms_per_cycle": stream_s / cycles * 1e3},
+    ]
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark streaming feature updates.")
+    parser.add_argument("--buffer", type=int, default=5000, help="свечей в буфере")
+    parser.add_argument("--cycles", type=int, default=200, help="циклов с одним новым баром")
+    args = parser.parse_args()
+    report = run(args.buffer, args.cycles)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.3f}"))
+
+
+if __name__ == "__main__":
+    main()
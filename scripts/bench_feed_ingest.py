@@ -0,0 +1,103 @@
+"""Бенчмарк ingest страницы ccxt: пакетный путь (``CandleBatch``) против поштучного."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.data.feed import CandleBatch, CandleBuffer, CandleRecord
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def _payload(count: int, start_ms: int) -> list[list[float]]:
+    return [
+        [start_ms + i * 60_000, 100.0 + i * 0.01, 100.5 + i * 0.01, 99.5 + i * 0.01, 100.2, 10.0]
+        for i in range(count)
+    ]
+
+
+def _legacy_ingest(buffer: CandleBuffer, payload: list[list[float]]) -> None:
+    """Прежний путь: pd.Timestamp и CandleRecord на каждую свечу, проверки и health поштучно."""
+
+    expected = timedelta(minutes=1)
+    for item in payload:
+        timestamp_ms, open_, high, low, close, volume = item[:6]
+        record = CandleRecord(
+            ts=pd.Timestamp(timestamp_ms, unit="ms", tz=timezone.utc),
+            open=float(open_),
+            high=float(high),
+            low=float(low),
+            close=float(close),
+            volume=float(volume),
+            tf="1m",
+            symbol=SYMBOL,
+            source="rest",
+        )
+        last_ts = buffer.last_timestamp()
+        if last_ts is not None and record.ts - last_ts > expected * 1.5:
+            raise RuntimeError("разрыв в синтетических данных")
+        buffer.upsert(record)
+        abs((datetime.now(timezone.utc) - record.ts).total_seconds())
+
+
+def _feed() -> MarketDataFeed:
+    spec = SymbolFeedSpec(
+        name=SYMBOL,
+        type="perp",
+        timeframes=("1m",),
+        primary_timeframe="1m",
+        backfill_bars=1000,
+        min_notional=10,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+    )
+    return MarketDataFeed(exchange_id="binanceusdm", symbols=[spec], rest_client=object(), use_websocket=False)
+
+
+async def run(page: int, pages: int) -> pd.DataFrame:
+    start_ms = pd.Timestamp("2024-01-01T00:00:00Z").value // 10**6
+    payloads = [_payload(page, start_ms + idx * page * 60_000) for idx in range(pages)]
+    buffer_size = page * pages
+
+    legacy = CandleBuffer(SYMBOL, "1m", maxlen=buffer_size)
+    started = time.perf_counter()
+    for payload in payloads:
+        _legacy_ingest(legacy, payload)
+    legacy_s = time.perf_counter() - started
+
+    feed = _feed()
+    feed._buffers[SYMBOL]["1m"] = CandleBuffer(SYMBOL, "1m", maxlen=buffer_size)
+    spec = feed.symbols[0]
+    started = time.perf_counter()
+    for payload in payloads:
+        await feed._ingest_batch(spec, "1m", CandleBatch.from_payload(payload, SYMBOL, "1m", "rest"))
+    batch_s = time.perf_counter() - started
+
+    assert (legacy.view().close == feed._buffers[SYMBOL]["1m"].view().close).all()
+    rows = [
+        {"path": "per-record", "ms_per_page": legacy_s / pages * 1e3},
+        {"path": "batch", "ms_per_page": batch_s / pages * 1e3},
+    ]
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark feed ingest of ccxt OHLCV pages.")
+    parser.add_argument("--page", type=int, default=1000, help="свечей на страницу")
+    parser.add_argument("--pages", type=int, default=20, help="количество страниц")
+    args = parser.parse_args()
+    report = asyncio.run(run(args.page, args.pages))
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
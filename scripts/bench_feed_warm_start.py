@@ -0,0 +1,111 @@
+"""Время restart-to-ready фида: холодный backfill через REST против тёплого старта из кэша."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.data.candle_cache import CandleCache
+
+
+class SlowExchange:
+    """Синтетическая биржа: каждая REST-страница стоит ``page_latency`` секунд.
+
+    Запросы сериализуются, как при ``enableRateLimit=True`` в ccxt.
+    """
+
+    def __init__(self, bars: int, page_latency: float) -> None:
+        start = pd.Timestamp("2024-01-01T00:00:00Z").value // 10**6
+        self._rows = [[start + i * 60_000, 100.0, 100.5, 99.5, 100.2, 10.0] for i in range(bars)]
+        self.page_latency = page_latency
+        self.pages = 0
+        self._throttle = threading.Lock()
+
+    def extend(self, bars: int) -> None:
+        last = self._rows[-1][0]
+        self._rows.extend(
+            [last + (i + 1) * 60_000, 100.0, 100.5, 99.5, 100.2, 10.0] for i in range(bars)
+        )
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000, params=None):
+        with self._throttle:
+            time.sleep(self.page_latency)
+            self.pages += 1
+        rows = self._rows if since is None else [row for row in self._rows if row[0] >= since]
+        return rows[:limit]
+
+    def milliseconds(self) -> int:
+        return int(self._rows[-1][0] + 60_000)
+
+    def close(self) -> None:
+        pass
+
+
+def _specs(symbols: int) -> list[SymbolFeedSpec]:
+    return [
+        SymbolFeedSpec(
+            name=f"SYM{idx}/USDT:USDT",
+            type="perp",
+            timeframes=("1m",),
+            primary_timeframe="1m",
+            backfill_bars=2000,
+            min_notional=10,
+            max_leverage=3,
+            quote_precision=2,
+            base_precision=3,
+            min_liquidity_usd=1_000_000,
+            max_spread_pct=0.1,
+        )
+        for idx in range(symbols)
+    ]
+
+
+async def _ready_time(exchange: SlowExchange, symbols: int, cache: CandleCache | None) -> float:
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=_specs(symbols),
+        rest_client=exchange,
+        use_websocket=False,
+        candle_cache=cache,
+    )
+    started = time.perf_counter()
+    await feed._backfill_initial()
+    return time.perf_counter() - started
+
+
+async def run(symbols: int, page_latency: float, downtime_bars: int) -> pd.DataFrame:
+    exchange = SlowExchange(3000, page_latency)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CandleCache(Path(tmp), "binanceusdm")
+        for name, feed_cache in (("cold (без кэша)", None), ("первый старт с кэшем", cache)):
+            exchange.pages = 0
+            seconds = await _ready_time(exchange, symbols, feed_cache)
+            rows.append({"scenario": name, "ready_s": seconds, "rest_pages": exchange.pages})
+        exchange.extend(downtime_bars)
+        exchange.pages = 0
+        seconds = await _ready_time(exchange, symbols, cache)
+        scenario = f"warm (+{downtime_bars} баров простоя)"
+        rows.append({"scenario": scenario, "ready_s": seconds, "rest_pages": exchange.pages})
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark feed restart-to-ready with/without candle cache.")
+    parser.add_argument("--symbols", type=int, default=10, help="количество символов (по одному 1m ряду)")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="задержка одной REST-страницы, секунды")
+    parser.add_argument("--downtime-bars", type=int, default=30, help="сколько баров прошло между рестартами")
+    args = parser.parse_args()
+    report = asyncio.run(run(args.symbols, args.page_latency, args.downtime_bars))
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Бенчмарк индикаторов: прежние pandas-реализации против ядер ``kernels`` и обёрток."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from prod_core.indicators import TechnicalIndicators, kernels
+
+PERIOD = 20
+
+
+def _legacy_true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    prev_close = close.shift(1)
+    components = pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()],
+        axis=1,
+    )
+    return components.max(axis=1)
+
+
+def _legacy_rsi(close: pd.Series, period: int) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.ewm(alpha=1 / period, min_periods=period).mean()
+    avg_loss = loss.ewm(alpha=1 / period, min_periods=period).mean()
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    return (100 - (100 / (1 + rs))).fillna(50.0)
+
+
+def _legacy_donchian(high: pd.Series, low: pd.Series, period: int) -> pd.DataFrame:
+    upper = high.rolling(window=period, min_periods=1).max()
+    lower = low.rolling(window=period, min_periods=1).min()
+    return pd.DataFrame({"upper": upper, "lower": lower, "middle": (upper + lower) / 2})
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _cases(
+    indicators: TechnicalIndicators,
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+) -> Dict[str, Dict[str, Callable[[], object]]]:
+    high_arr, low_arr, close_arr = (series.to_numpy() for series in (high, low, close))
+    return {
+        "true_range": {
+            "legacy": lambda: _legacy_true_range(high, low, close),
+            "wrapper": lambda: indicators.true_range(high, low, close),
+            "kernel": lambda: kernels.true_range(high_arr, low_arr, close_arr),
+        },
+        "ema": {
+            "legacy": lambda: close.ewm(span=PERIOD, adjust=False).mean(),
+            "wrapper": lambda: indicators.ema(close, PERIOD),
+            "kernel": lambda: kernels.ema(close_arr, PERIOD),
+        },
+        "atr": {
+            "legacy": lambda: _legacy_true_range(high, low, close)
+            .rolling(PERIOD, min_periods=1)
+            .mean(),
+            "wrapper": lambda: indicators.atr(high, low, close, PERIOD),
+            "kernel": lambda: kernels.atr(high_arr, low_arr, close_arr, PERIOD),
+        },
+        "donchian": {
+            "legacy": lambda: _legacy_donchian(high, low, PERIOD),
+            "wrapper": lambda: indicators.donchian_channels(high, low, PERIOD),
+            "kernel": lambda: kernels.donchian(high_arr, low_arr, PERIOD),
+        },
+        "rsi": {
+            "legacy": lambda: _legacy_rsi(close, 14),
+            "wrapper": lambda: indicators.rsi(close, 14),
+            "kernel": lambda: kernels.rsi(close_arr, 14),
+        },
+        "volatility": {
+            "legacy": lambda: close.pct_change().rolling(PERIOD, min_periods=1).std(),
+            "wrapper": lambda: indicators.volatility(close, PERIOD),
+            "kernel": lambda: kernels.volatility(close_arr, PERIOD),
+        },
+    }
+
+
+def run(sizes: List[int], repeat: int) -> pd.DataFrame:
+    indicators = TechnicalIndicators()
+    rows: List[Dict[str, object]] = []
+    for size in sizes:
+        rng = np.random.default_rng(size)
+        close_arr = 100 + np.cumsum(rng.normal(0, 1, size))
+        high_arr = close_arr + rng.uniform(0, 2, size)
+        low_arr = close_arr - rng.uniform(0, 2, size)
+        index = pd.date_range("2020-01-01", periods=size, freq="1min", tz="UTC")
+        high, low, close = (pd.Series(arr, index=index) for arr in (high_arr, low_arr, close_arr))
+        cases = _cases(indicators, high, low, close)
+        for name, variants in cases.items():
+            timings = {label: _timed(fn, repeat) * 1e3 for label, fn in variants.items()}
+            rows.append(
+                {
+                    "indicator": name,
+                    "bars": size,
+                    "legacy_ms": timings["legacy"],
+                    "wrapper_ms": timings["wrapper"],
+                    "kernel_ms": timings["kernel"],
+                    "speedup": timings["legacy"] / timings["kernel"],
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark indicator kernels against pandas.")
+    parser.add_argument(
+        "--sizes",
+        default="1000,100000,10000000",
+        help="размеры рядов через запятую",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер (берётся лучший)")
+    args = parser.parse_args()
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    report = run(sizes, args.repeat)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.3f}"))
+
+
+if __name__ == "__main__":
+    main()
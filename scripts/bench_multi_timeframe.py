@@ -0,0 +1,96 @@
+"""Бенчмарк as-of join старших таймфреймов: ``merge_asof`` против ``MultiTimeframeJoiner``."""
+
+from __future__ import annotations
+
+import argparse
+import time
+from functools import partial
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from prod_core.data.features import FeatureEngineer
+from prod_core.data.multi_timeframe import MultiTimeframeJoiner, join_asof
+
+HIGHER = {"5m": "5min", "15m": "15min", "1h": "1h"}
+
+
+def _candles(bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    index = pd.date_range("2024-01-01", periods=bars, freq="1min", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    spread = rng.uniform(0.0, 0.002, bars) * close
+    return pd.DataFrame(
+        {"open": close, "high": close + spread, "low": close - spread, "close": close},
+        index=index,
+    )
+
+
+def _merge_asof(features: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    joined = features["1m"]
+    for timeframe in HIGHER:
+        joined = pd.merge_asof(
+            joined,
+            features[timeframe].add_suffix(f"_{timeframe}"),
+            left_index=True,
+            right_index=True,
+        )
+    return joined.dropna()
+
+
+def run(sizes: List[int], steps: int) -> pd.DataFrame:
+    engineer = FeatureEngineer()
+    rows = []
+    for size in sizes:
+        candles = _candles(size + steps)
+        base = engineer.build(candles)
+        # старшие признаки на всей истории: в цикле меняется только объект кадра,
+        # когда открывается новый старший бар (как при чтении через FeatureCache)
+        higher_full = {
+            timeframe: engineer.build(
+                candles.resample(rule, label="left", closed="left")
+                .agg({"open": "first", "high": "max", "low": "min", "close": "last"})
+                .dropna()
+            )
+            for timeframe, rule in HIGHER.items()
+        }
+        cycles = []
+        higher: Dict[str, pd.DataFrame] = {}
+        for end in range(size, size + steps):
+            now = base.index[end - 1]
+            for timeframe, frame in higher_full.items():
+                count = int(frame.index.searchsorted(now, side="right"))
+                if timeframe not in higher or len(higher[timeframe]) != count:
+                    higher[timeframe] = frame.iloc[:count]
+            cycles.append({"1m": base.iloc[:end], **higher})
+
+        joiner = MultiTimeframeJoiner()
+        joiner.update("BTC", "1m", cycles[0])
+        timings = {}
+        for label, fn in (
+            ("merge_asof", _merge_asof),
+            ("join_asof", lambda f: join_asof(f["1m"], {tf: f[tf] for tf in HIGHER})),
+            ("incremental", partial(joiner.update, "BTC", "1m")),
+        ):
+            started = time.perf_counter()
+            for features in cycles[1:]:
+                fn(features)
+            timings[label] = (time.perf_counter() - started) / (len(cycles) - 1) * 1e3
+        last = cycles[-1]
+        assert joiner.update("BTC", "1m", last).equals(_merge_asof(last))
+        rows.append({"bars": size, **{f"{k}_ms": v for k, v in timings.items()}})
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark multi-timeframe as-of join.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="баров 1m через запятую")
+    parser.add_argument("--steps", type=int, default=300, help="новых баров 1m на замер")
+    args = parser.parse_args()
+    report = run([int(size) for size in args.sizes.split(",")], args.steps)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:,.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Отчёт о памяти свечей и признаков: ``float64`` против компактного режима.
+
+Считает байты на строку по (symbol, timeframe) на выборке и экстраполирует на
+вселенную ``--symbols`` × ``--years`` 1m-истории. С ``--csv-root`` берёт файлы
+``SYMBOL_TIMEFRAME.csv`` (как ``vectorbt_runner``), иначе — синтетические свечи.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from prod_core.data.compact import memory_report
+from prod_core.data.features import FeatureEngineer
+from prod_core.data.feed import CandleBuffer
+
+MINUTES_PER_YEAR = 365 * 24 * 60
+
+
+def _synthetic(bars: int) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    index = pd.date_range("2023-01-01", periods=bars, freq="1min", tz="UTC", name="ts")
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.0008, bars)))
+    spread = rng.uniform(0.0, 0.001, bars) * close
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 50, bars),
+            "tf": "1m",
+            "symbol": "SYN/USDT:USDT",
+            "source": np.where(rng.random(bars) < 0.99, "ws", "rest-gap"),
+        },
+        index=index,
+    )
+
+
+def _load(csv_root: Path) -> Dict[str, pd.DataFrame]:
+    frames: Dict[str, pd.DataFrame] = {}
+    for path in sorted(csv_root.glob("*_1m.csv")):
+        frame = pd.read_csv(path)
+        unit = "ms" if np.issubdtype(frame["timestamp"].dtype, np.number) else None
+        frame.index = pd.to_datetime(frame.pop("timestamp"), unit=unit, utc=True)
+        frames[path.stem.removesuffix("_1m")] = frame
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory report for candle and feature storage.")
+    parser.add_argument("--csv-root", help="каталог с CSV SYMBOL_1m.csv")
+    parser.add_argument("--bars", type=int, default=200_000, help="баров синтетической выборки")
+    parser.add_argument("--symbols", type=int, default=300, help="символов для экстраполяции")
+    parser.add_argument("--years", type=float, default=3.0, help="лет 1m-истории для экстраполяции")
+    args = parser.parse_args()
+
+    candles = _load(Path(args.csv_root)) if args.csv_root else {"SYN": _synthetic(args.bars)}
+    engineer = FeatureEngineer()
+    frames = {
+        symbol: {"candles": frame, "features": engineer.build(frame)}
+        for symbol, frame in candles.items()
+    }
+    report = memory_report(frames)
+    print(report.to_string(index=False))
+
+    rows = args.symbols * args.years * MINUTES_PER_YEAR
+    per_row = report.groupby("timeframe")[["bytes", "compact_bytes", "rows"]].sum()
+    print(f"\nЭкстраполяция: {args.symbols} символов × {args.years:g} лет 1m = {rows:,.0f} строк")
+    for kind, totals in per_row.iterrows():
+        full = totals["bytes"] / totals["rows"] * rows / 2**30
+        compact = totals["compact_bytes"] / totals["rows"] * rows / 2**30
+        print(f"  {kind:<9} float64 {full:8.1f} GiB   compact {compact:8.1f} GiB")
+    for compact in (False, True):
+        buffer = CandleBuffer("SYN/USDT:USDT", "1m", maxlen=1, compact=compact)
+        print(f"  CandleBuffer compact={compact}: {buffer.nbytes / 2:.0f} байт на бар ёмкости")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.data.aggregation import aggregate_frame, aggregate_ohlcv, can_aggregate
+from prod_core.data.feed import CandleRecord
+from tests.test_feed_integrity import FakeExchange, build_candles
+
+
+def make_spec(symbol: str, timeframes: tuple[str, ...], backfill_bars: int = 50) -> SymbolFeedSpec:
+    return SymbolFeedSpec(
+        name=symbol,
+        type="perp",
+        timeframes=timeframes,
+        primary_timeframe=timeframes[-1],
+        backfill_bars=backfill_bars,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+        poll_interval_seconds=0.1,
+        aggregate_timeframes=True,
+    )
+
+
+def random_frame(bars: int, start: str = "2024-01-01T00:07:00Z") -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range(start, periods=bars, freq="1min", tz="UTC")
+    close = 100 + np.cumsum(rng.normal(0, 0.5, bars))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = rng.uniform(0.1, 1.0, bars)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.uniform(1, 100, bars),
+        },
+        index=index,
+    )
+
+
+def test_aggregate_frame_matches_pandas_resample() -> None:
+    frame = random_frame(1000)
+    result = aggregate_frame(frame, "15m", drop_partial=False)
+    expected = frame.resample("15min", label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+    trimmed = aggregate_frame(frame, "15m")
+    # 00:07 — бакет 00:00 обрезан слева; последний бакет 16:30 ещё не закрыт
+    assert trimmed.index[0] == pd.Timestamp("2024-01-01T00:15:00Z")
+    assert trimmed.index[-1] == expected.index[-2]
+
+
+def test_aggregate_ohlcv_is_epoch_aligned() -> None:
+    ts = np.array([0, 60_000, 3_540_000, 3_600_000, 3_660_000], dtype=np.int64) + 14_400_000
+    values = np.arange(len(ts), dtype=np.float64)
+    bars = aggregate_ohlcv(ts, values, values + 1, values - 1, values, np.ones(len(ts)), 3_600_000)
+    assert bars.ts.tolist() == [14_400_000, 18_000_000]
+    assert bars.open.tolist() == [0.0, 3.0]
+    assert bars.close.tolist() == [2.0, 4.0]
+    assert bars.volume.tolist() == [3.0, 2.0]
+    assert bars.closed(60_000, 3_600_000).tolist() == [True, False]
+    assert can_aggregate("1m", "4h") and not can_aggregate("5m", "1m")
+
+
+def test_feed_derives_higher_timeframes_from_base() -> None:
+    asyncio.run(_test_feed_derives_higher_timeframes_from_base())
+
+
+async def _test_feed_derives_higher_timeframes_from_base() -> None:
+    symbol = "BTC/USDT:USDT"
+    exchange = FakeExchange({(symbol, "1m"): build_candles(2100)})
+    spec = make_spec(symbol, ("1m", "5m", "15m"))
+    feed = MarketDataFeed(exchange_id="binanceusdm", symbols=[spec], rest_client=exchange, use_websocket=False)
+
+    await feed._backfill_initial()
+    assert feed._subscribed_timeframes(spec) == ("1m",)  # type: ignore[attr-defined]
+    snapshot = feed.snapshot()
+    base = snapshot[symbol]["1m"]
+    expected = aggregate_frame(base, "15m", drop_partial=False).iloc[1:]
+    derived = snapshot[symbol]["15m"]
+    pd.testing.assert_frame_equal(derived[expected.columns], expected, check_freq=False)
+    assert set(derived["source"]) == {"agg-1m"}
+
+    subscription = feed.subscribe_bar_closes([(symbol, "15m")])
+    last = base.index[-1]
+    rollover = (last + pd.Timedelta(minutes=1)).ceil("15min")
+    records = [
+        CandleRecord(
+            ts=ts,
+            open=1.0,
+            high=1.0,
+            low=1.0,
+            close=1.0,
+            volume=1.0,
+            tf="1m",
+            symbol=symbol,
+            source="ws",
+        )
+        for ts in pd.date_range(last + pd.Timedelta(minutes=1), rollover, freq="1min")
+    ]
+    for record in records:
+        await feed._ingest_records(spec, "1m", [record], source="ws")  # type: ignore[attr-defined]
+
+    events = subscription.drain()
+    assert [event.open_ts_ms for event in events] == [int(expected.index[-1].timestamp() * 1000)]
+    snapshot = feed.snapshot()
+    expected = aggregate_frame(snapshot[symbol]["1m"], "15m", drop_partial=False).iloc[1:]
+    derived = snapshot[symbol]["15m"]
+    assert derived.index[-1] == rollover
+    pd.testing.assert_frame_equal(derived[expected.columns], expected, check_freq=False)
+
+
+def test_feed_falls_back_to_rest_when_base_history_is_short() -> None:
+    asyncio.run(_test_feed_falls_back_to_rest_when_base_history_is_short())
+
+
+async def _test_feed_falls_back_to_rest_when_base_history_is_short() -> None:
+    symbol = "BTC/USDT:USDT"
+    exchange = FakeExchange(
+        {
+            (symbol, "1m"): build_candles(2100),
+            (symbol, "15m"): build_candles(200, timeframe="15m"),
+        }
+    )
+    spec = make_spec(symbol, ("1m", "5m", "15m"), backfill_bars=200)
+    feed = MarketDataFeed(exchange_id="binanceusdm", symbols=[spec], rest_client=exchange, use_websocket=False)
+
+    await feed._backfill_initial()
+    snapshot = feed.snapshot()
+    assert set(snapshot[symbol]["5m"]["source"]) == {"agg-1m"}
+    assert set(snapshot[symbol]["15m"]["source"]) == {"rest"}
+    assert len(snapshot[symbol]["15m"]) >= 200
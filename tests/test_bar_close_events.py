@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+
+from prod_core.data import MarketDataFeed, MockMarketDataFeed, SymbolFeedSpec
+from prod_core.data.events import BarCloseBus, BarClosedEvent
+from prod_core.data.feed import CandleRecord, timeframe_to_timedelta
+from tests.test_feed_integrity import FakeExchange, build_candles
+
+
+def make_spec(symbol: str, timeframes: tuple[str, ...], backfill_bars: int = 50) -> SymbolFeedSpec:
+    return SymbolFeedSpec(
+        name=symbol,
+        type="perp",
+        timeframes=timeframes,
+        primary_timeframe=timeframes[0],
+        backfill_bars=backfill_bars,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+        poll_interval_seconds=0.1,
+    )
+
+
+def test_bus_filters_keys_and_drops_oldest() -> None:
+    asyncio.run(_test_bus_filters_keys_and_drops_oldest())
+
+
+async def _test_bus_filters_keys_and_drops_oldest() -> None:
+    bus = BarCloseBus()
+    subscription = bus.subscribe([("BTC", "1m")], maxsize=2)
+    for idx in range(3):
+        bus.publish(BarClosedEvent("BTC", "1m", idx, idx + 60_000, 0.0))
+    bus.publish(BarClosedEvent("ETH", "1m", 0, 60_000, 0.0))
+
+    events = subscription.drain()
+    assert [event.open_ts_ms for event in events] == [1, 2]
+    assert subscription.dropped == 1
+
+    bus.close()
+    assert await subscription.get(timeout=0.1) is None
+    assert subscription.closed
+
+
+def test_feed_publishes_bar_close_after_backfill() -> None:
+    asyncio.run(_test_feed_publishes_bar_close_after_backfill())
+
+
+async def _test_feed_publishes_bar_close_after_backfill() -> None:
+    symbol = "BTC/USDT:USDT"
+    exchange = FakeExchange({(symbol, "1m"): build_candles(60)})
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=[make_spec(symbol, ("1m",))],
+        rest_client=exchange,
+        use_websocket=False,
+    )
+    subscription = feed.subscribe_bar_closes([(symbol, "1m")])
+    await feed._backfill_initial()
+    assert subscription.drain() == [], "backfill не должен порождать события"
+
+    buffer = feed._buffers[symbol]["1m"]  # type: ignore[attr-defined]
+    last_ts = buffer.last_timestamp()
+    delta = timeframe_to_timedelta("1m")
+    record = CandleRecord(
+        ts=last_ts + delta,
+        open=1.0,
+        high=1.0,
+        low=1.0,
+        close=1.0,
+        volume=1.0,
+        tf="1m",
+        symbol=symbol,
+        source="ws",
+    )
+    await feed._append_record(buffer, delta, record)  # type: ignore[attr-defined]
+    await feed._append_record(buffer, delta, record)  # type: ignore[attr-defined]
+
+    events = subscription.drain()
+    assert len(events) == 1
+    assert events[0].open_ts_ms == int(last_ts.timestamp() * 1000)
+    assert events[0].close_ts_ms == events[0].open_ts_ms + 60_000
+
+
+def test_mock_feed_streams_bar_closes() -> None:
+    asyncio.run(_test_mock_feed_streams_bar_closes())
+
+
+async def _test_mock_feed_streams_bar_closes() -> None:
+    spec = make_spec("BTC/USDT:USDT", ("5m",))
+    feed = MockMarketDataFeed(symbols=[spec])
+    async with feed:
+        subscription = feed.subscribe_bar_closes([(spec.name, "5m")])
+        event = await subscription.get(timeout=2.0)
+    assert event is not None
+    assert event.key == (spec.name, "5m")
+    view = feed.snapshot_views([(spec.name, "5m")])[(spec.name, "5m")]
+    assert event.close_ts_ms <= view.last_timestamp_ms()
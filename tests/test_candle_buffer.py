@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prod_core.data.compact import (
+    FLOAT32_RELATIVE_ERROR,
+    compact_frame,
+    max_relative_error,
+    memory_report,
+    restore_frame,
+)
+from prod_core.data.features import FeatureEngineer
+from prod_core.data.feed import CandleBuffer, CandleRecord
+
+
+def make_record(ts: pd.Timestamp, price: float, source: str = "rest") -> CandleRecord:
+    return CandleRecord(
+        ts=ts,
+        open=price,
+        high=price + 1.0,
+        low=price - 1.0,
+        close=price + 0.5,
+        volume=10.0,
+        tf="1m",
+        symbol="BTC/USDT:USDT",
+        source=source,
+    )
+
+
+def test_buffer_appends_in_order_and_trims() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    buffer = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=5)
+    for i in range(12):
+        buffer.upsert(make_record(base + timedelta(minutes=i), 100.0 + i))
+
+    frame = buffer.to_frame()
+    assert len(buffer) == 5
+    assert list(frame.index) == [base + timedelta(minutes=i) for i in range(7, 12)]
+    assert frame["open"].tolist() == [107.0, 108.0, 109.0, 110.0, 111.0]
+    assert buffer.last_timestamp() == base + timedelta(minutes=11)
+
+
+def test_buffer_replaces_last_and_inserts_out_of_order() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    buffer = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=10)
+    for i in (0, 1, 3, 4):
+        buffer.upsert(make_record(base + timedelta(minutes=i), 100.0 + i))
+
+    buffer.upsert(make_record(base + timedelta(minutes=4), 200.0, source="ws"))
+    buffer.upsert(make_record(base + timedelta(minutes=2), 102.0, source="rest-gap"))
+    buffer.upsert(make_record(base + timedelta(minutes=1), 151.0))
+
+    frame = buffer.to_frame()
+    assert frame.index.is_monotonic_increasing
+    assert frame["open"].tolist() == [100.0, 151.0, 102.0, 103.0, 200.0]
+    assert frame["source"].tolist() == ["rest", "rest", "rest-gap", "rest", "ws"]
+    assert set(frame["symbol"]) == {"BTC/USDT:USDT"}
+    assert set(frame["tf"]) == {"1m"}
+
+
+def test_buffer_matches_sorted_reference_under_wraparound() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    buffer = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=8)
+    reference: dict[pd.Timestamp, float] = {}
+    # порядок с дублями и опозданиями, чтобы задеть компактизацию массива
+    order = [0, 1, 2, 5, 3, 4, 6, 7, 9, 8, 10, 11, 12, 11, 13, 15, 14, 16, 17, 18, 19, 20, 1]
+    for step, minute in enumerate(order):
+        ts = base + timedelta(minutes=minute)
+        buffer.upsert(make_record(ts, float(step)))
+        reference[ts] = float(step)
+        reference = dict(sorted(reference.items())[-8:])
+
+    frame = buffer.to_frame()
+    assert list(frame.index) == list(reference.keys())
+    assert frame["open"].tolist() == list(reference.values())
+
+
+def test_view_is_read_only_and_versioned() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    buffer = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=10)
+    for i in range(3):
+        buffer.upsert(make_record(base + timedelta(minutes=i), 100.0 + i))
+
+    view = buffer.view()
+    assert view.version == 3
+    assert view.close.base is not None, "срез должен ссылаться на память буфера"
+    assert not view.close.flags.writeable
+    pd.testing.assert_frame_equal(view.to_frame(), buffer.to_frame())
+
+    with pytest.raises(ValueError):
+        view.close[0] = 0.0
+
+    buffer.upsert(make_record(base + timedelta(minutes=2), 300.0))
+    assert buffer.view().version == view.version + 1
+
+
+def test_extend_appends_block_and_respects_maxlen() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    base_ms = int(base.timestamp() * 1000)
+    buffer = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=6)
+    for i in range(5):
+        buffer.upsert(make_record(base + timedelta(minutes=i), 100.0 + i))
+
+    for start, count in ((5, 3), (8, 4), (12, 20)):
+        ts = base_ms + 60_000 * np.arange(start, start + count, dtype=np.int64)
+        ohlcv = np.tile(np.arange(start, start + count, dtype=np.float64), (5, 1))
+        buffer.extend(ts, ohlcv, source="rest-gap")
+        view = buffer.view()
+        assert len(view) == 6
+        assert view.last_timestamp_ms() == int(ts[-1])
+        assert np.all(np.diff(view.ts) == 60_000)
+        assert view.open[-1] == start + count - 1
+
+    assert set(buffer.to_frame()["source"]) == {"rest-gap"}
+    with pytest.raises(ValueError):
+        buffer.extend(ts[:1], ohlcv[:, :1], source="late")
+
+
+def test_compact_buffer_matches_float64_within_bound() -> None:
+    base = pd.Timestamp("2024-01-01T00:00:00Z")
+    base_ms = int(base.timestamp() * 1000)
+    exact = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=8)
+    compact = CandleBuffer("BTC/USDT:USDT", "1m", maxlen=8, compact=True)
+    order = [0, 1, 2, 5, 3, 4, 6, 7, 9, 8, 10, 11, 12, 11, 13, 15, 14, 16]
+    for step, minute in enumerate(order):
+        record = make_record(base + timedelta(minutes=minute), 60_000.1 + step / 3, "ws")
+        exact.upsert(record)
+        compact.upsert(record)
+    ts = base_ms + 60_000 * np.arange(17, 21, dtype=np.int64)
+    ohlcv = np.tile(np.linspace(60_001.3, 60_007.7, 4), (5, 1))
+    exact.extend(ts, ohlcv, source="rest-gap")
+    compact.extend(ts, ohlcv, source="rest-gap")
+
+    reference = exact.to_frame()
+    frame = compact.to_frame()
+    assert frame["close"].dtype == np.float32
+    assert isinstance(frame["symbol"].dtype, pd.CategoricalDtype)
+    assert frame["source"].tolist() == reference["source"].tolist()
+    assert list(compact.view().source) == list(exact.view().source)
+    assert max_relative_error(reference, frame) <= FLOAT32_RELATIVE_ERROR
+    restored = restore_frame(frame)
+    assert restored["close"].dtype == np.float64 and restored["tf"].dtype == object
+    assert compact.nbytes == 2 * 8 * (8 + 5 * 4 + 1)  # ts int64, OHLCV float32, код источника
+
+
+def test_compact_features_and_memory_report() -> None:
+    from tests.test_features_no_lookahead import make_random_candles
+
+    candles = make_random_candles(2000)
+    candles["tf"] = "1m"
+    candles["symbol"] = "BTC/USDT:USDT"
+    features = FeatureEngineer().build(candles)
+    stored = compact_frame(features)
+    assert (stored.dtypes == np.float32).all()
+    assert max_relative_error(features, stored) <= FLOAT32_RELATIVE_ERROR
+
+    report = memory_report({"BTC/USDT:USDT": {"1m": candles, "features": features}})
+    assert list(report["timeframe"]) == ["1m", "features"]
+    candles_row = report.iloc[0]
+    assert candles_row["compact_bytes"] < candles_row["bytes"] / 4
+    assert (report["max_rel_error"] <= FLOAT32_RELATIVE_ERROR).all()
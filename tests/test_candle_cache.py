@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.data.candle_cache import CandleCache
+from tests.test_feed_integrity import FakeExchange, build_candles
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class CountingExchange(FakeExchange):
+    def __init__(self, book) -> None:
+        super().__init__(book)
+        self.calls: list[tuple[int | None, int]] = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit, params=None):
+        self.calls.append((since, limit))
+        return super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+def make_spec(backfill_bars: int = 500) -> SymbolFeedSpec:
+    return SymbolFeedSpec(
+        name=SYMBOL,
+        type="perp",
+        timeframes=("1m",),
+        primary_timeframe="1m",
+        backfill_bars=backfill_bars,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+        poll_interval_seconds=0.1,
+    )
+
+
+def make_feed(exchange: FakeExchange, cache: CandleCache) -> MarketDataFeed:
+    return MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=[make_spec()],
+        rest_client=exchange,
+        use_websocket=False,
+        candle_cache=cache,
+    )
+
+
+def test_warm_start_fetches_only_missing_bars(tmp_path: Path) -> None:
+    asyncio.run(_test_warm_start_fetches_only_missing_bars(tmp_path))
+
+
+async def _test_warm_start_fetches_only_missing_bars(tmp_path: Path) -> None:
+    candles = build_candles(2200)
+    cache = CandleCache(tmp_path, "binanceusdm")
+
+    cold_exchange = CountingExchange({(SYMBOL, "1m"): candles[:2100]})
+    cold = make_feed(cold_exchange, cache)
+    await cold._backfill_initial()
+    cached_last = cold.snapshot_views()[(SYMBOL, "1m")].last_timestamp_ms()
+    assert cache.path(SYMBOL, "1m").exists()
+    assert len(cold_exchange.calls) >= 2
+
+    warm_exchange = CountingExchange({(SYMBOL, "1m"): candles})
+    warm = make_feed(warm_exchange, cache)
+    await warm._backfill_initial()
+
+    assert [since for since, _ in warm_exchange.calls] == [cached_last]
+    view = warm.snapshot_views()[(SYMBOL, "1m")]
+    assert view.last_timestamp_ms() == candles[-1][0]
+    assert np.all(np.diff(view.ts) == 60_000)
+    assert {"cache", "rest"} <= set(view.source)
+    assert warm.backfill_seconds[(SYMBOL, "1m")] >= 0
+
+
+def test_stale_cache_is_ignored(tmp_path: Path) -> None:
+    asyncio.run(_test_stale_cache_is_ignored(tmp_path))
+
+
+async def _test_stale_cache_is_ignored(tmp_path: Path) -> None:
+    candles = build_candles(6000)
+    cache = CandleCache(tmp_path, "binanceusdm")
+    stale = np.array(candles[:100], dtype=np.float64).T
+    cache.write(SYMBOL, "1m", stale)
+
+    exchange = CountingExchange({(SYMBOL, "1m"): candles})
+    feed = make_feed(exchange, cache)
+    await feed._backfill_initial()
+
+    view = feed.snapshot_views()[(SYMBOL, "1m")]
+    assert "cache" not in set(view.source)
+    assert len(view) >= 2000
+
+
+def test_cache_tail_after_gap_does_not_shorten_backfill(tmp_path: Path) -> None:
+    asyncio.run(_test_cache_tail_after_gap_does_not_shorten_backfill(tmp_path))
+
+
+async def _test_cache_tail_after_gap_does_not_shorten_backfill(tmp_path: Path) -> None:
+    candles = build_candles(2200)
+    cache = CandleCache(tmp_path, "binanceusdm")
+    # разрыв у конца кэша: load отдаёт хвост из десятка баров
+    gapped = np.delete(np.array(candles[:2180], dtype=np.float64), 2170, axis=0)
+    cache.write(SYMBOL, "1m", gapped.T)
+    loaded = cache.load(SYMBOL, "1m")
+    assert loaded is not None and len(loaded) == 9
+
+    exchange = CountingExchange({(SYMBOL, "1m"): candles})
+    feed = make_feed(exchange, cache)
+    await feed._backfill_initial()
+
+    view = feed.snapshot_views()[(SYMBOL, "1m")]
+    assert len(view) >= feed._backfill_limit(make_spec(), "1m")
+    assert np.all(np.diff(view.ts) == 60_000)
+
+
+def test_cache_load_keeps_contiguous_tail_and_rejects_duplicates(tmp_path: Path) -> None:
+    cache = CandleCache(tmp_path, "binanceusdm")
+    rows = np.array(build_candles(50), dtype=np.float64)
+    gapped = np.delete(rows, 20, axis=0)
+    cache.write(SYMBOL, "1m", gapped.T)
+    loaded = cache.load(SYMBOL, "1m")
+    assert loaded is not None
+    assert len(loaded) == 29
+    assert loaded.ts[0] == rows[21, 0]
+
+    duplicated = np.vstack([rows[:10], rows[9:]])
+    cache.write(SYMBOL, "1m", duplicated.T)
+    assert cache.load(SYMBOL, "1m") is None
+
+    cache.path(SYMBOL, "1m").write_bytes(b"garbage")
+    assert cache.load(SYMBOL, "1m") is None
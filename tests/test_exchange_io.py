@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from prod_core.exchange_io import ExchangeCallTimeout, ExchangeExecutor, workers_for_budget
+from prod_core.monitor import TelemetryExporter
+
+MakeExecutor = Callable[..., ExchangeExecutor]
+
+
+@pytest.fixture
+def make_executor() -> Iterator[MakeExecutor]:
+    """Фабрика пулов: все созданные пулы закрываются и при упавшем тесте."""
+
+    executors: list[ExchangeExecutor] = []
+
+    def make(*args, **kwargs) -> ExchangeExecutor:
+        executor = ExchangeExecutor(*args, **kwargs)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_pool_size_follows_rate_budget(make_executor: MakeExecutor) -> None:
+    assert workers_for_budget(38.0) == 12
+    assert workers_for_budget(9.5) == 3
+    assert workers_for_budget(0.5) == 2
+    assert workers_for_budget(500.0) == 16
+    assert make_executor("bingx").max_workers == 3
+
+
+def test_queue_depth_and_wait_are_exported(make_executor: MakeExecutor) -> None:
+    asyncio.run(_test_queue_depth_and_wait_are_exported(make_executor))
+
+
+async def _test_queue_depth_and_wait_are_exported(make_executor: MakeExecutor) -> None:
+    registry = CollectorRegistry()
+    telemetry = TelemetryExporter(registry=registry)
+    depths: list[int] = []
+
+    def on_metrics(exchange: str, depth: int, wait: float, stuck: int) -> None:
+        depths.append(depth)
+        telemetry.record_exchange_io(exchange, depth, wait, stuck)
+
+    executor = make_executor("binanceusdm", 2, on_metrics=on_metrics)
+
+    def slow(value: int) -> int:
+        time.sleep(0.05)
+        return value * 2
+
+    results = await asyncio.gather(*(executor.run(slow, idx) for idx in range(6)))
+    executor.shutdown()
+
+    assert results == [idx * 2 for idx in range(6)]
+    assert max(depths) >= 1 and executor.queue_depth == 0
+    labels = {"exchange": "binanceusdm"}
+    assert registry.get_sample_value("exchange_io_wait_seconds_count", labels) == 6
+    # последние вызовы простояли в очереди минимум две «волны» по 50 мс
+    wait_sum = registry.get_sample_value("exchange_io_wait_seconds_sum", labels)
+    assert wait_sum is not None and wait_sum >= 0.15
+
+
+def test_stuck_calls_are_abandoned_and_pool_is_replaced(make_executor: MakeExecutor) -> None:
+    asyncio.run(_test_stuck_calls_are_abandoned_and_pool_is_replaced(make_executor))
+
+
+async def _test_stuck_calls_are_abandoned_and_pool_is_replaced(
+    make_executor: MakeExecutor,
+) -> None:
+    release = threading.Event()
+    executor = make_executor("bingx", 2, call_timeout=5.0)
+
+    stuck = [asyncio.create_task(executor.run(release.wait, timeout=0.1)) for _ in range(2)]
+    await asyncio.sleep(0.02)
+    queued = asyncio.create_task(executor.run(lambda: "ok"))
+
+    for task in stuck:
+        with pytest.raises(ExchangeCallTimeout):
+            await task
+    # оба потока старого пула заняты — очередь переехала в новый пул
+    assert await asyncio.wait_for(queued, timeout=1.0) == "ok"
+    assert executor.rotations == 1
+    assert executor.stuck_calls == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert executor.stuck_calls == 0
+    assert await executor.run(lambda: 42) == 42
+    executor.shutdown()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from prometheus_client import CollectorRegistry
+
+from brain_orchestrator.tools.base import ToolContext
+from prod_core.data.feature_cache import FeatureCache, frame_nbytes
+from prod_core.data.features import FeatureConfig, FeatureEngineer
+from prod_core.data.lookahead import LookaheadVerifier, check_truncation_point, warmup_bars
+from prod_core.monitor import TelemetryExporter
+from tests.test_features_no_lookahead import make_random_candles
+from tools.tools_market_regime_agent.feature_loader import FeatureLoaderTool
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def test_key_ignores_forming_bar_but_tracks_history_and_config() -> None:
+    cache = FeatureCache()
+    candles = make_random_candles(200)
+    base = cache.key(SYMBOL, "1m", candles)
+
+    forming = candles.copy()
+    forming.iloc[-1, forming.columns.get_loc("close")] *= 1.02
+    assert cache.key(SYMBOL, "1m", forming) == base
+
+    revised = candles.copy()
+    revised.iloc[-2, revised.columns.get_loc("low")] -= 0.5
+    assert cache.key(SYMBOL, "1m", revised) != base
+    # досыпанный разрыв в кольцевом буфере той же длины сдвигает первый бар
+    gapped = candles.drop(candles.index[50])
+    repaired = candles.iloc[1:]
+    assert cache.key(SYMBOL, "1m", gapped) != cache.key(SYMBOL, "1m", repaired)
+    assert cache.key(SYMBOL, "1m", candles.iloc[:-1]) != base
+    assert cache.key(SYMBOL, "1m", candles, config=FeatureConfig(ema_fast=5)) != base
+    assert cache.key(SYMBOL, "1m", candles, version=7).version == 7
+
+
+def test_lru_evicts_by_entries_and_bytes() -> None:
+    engineer = FeatureEngineer()
+    frames = [make_random_candles(100 + idx, seed=idx) for idx in range(4)]
+    features = [engineer.build(frame) for frame in frames]
+    sizes = [frame_nbytes(frame) for frame in features]
+
+    cache = FeatureCache(max_entries=2)
+    keys = [cache.key(SYMBOL, "1m", frame) for frame in frames]
+    cache.put(keys[0], features[0])
+    cache.put(keys[1], features[1])
+    assert cache.get(keys[0]) is features[0]  # keys[0] становится самым свежим
+    cache.put(keys[2], features[2])
+    assert cache.get(keys[1]) is None
+    assert len(cache) == 2 and cache.evictions == 1
+
+    cache = FeatureCache(max_bytes=sizes[0] + sizes[1] + sizes[2] - 1)
+    for key, frame in zip(keys[:3], features[:3]):
+        cache.put(key, frame)
+    assert cache.get(keys[0]) is None
+    assert cache.bytes == sizes[1] + sizes[2]
+
+    tiny = FeatureCache(max_bytes=sizes[0] - 1)
+    tiny.put(keys[0], features[0])
+    assert len(tiny) == 0 and tiny.bytes == 0
+
+
+def test_feature_loader_reads_through_cache_and_exports_counters() -> None:
+    registry = CollectorRegistry()
+    telemetry = TelemetryExporter(registry=registry)
+    cache = FeatureCache(on_metrics=telemetry.record_feature_cache)
+    tool = FeatureLoaderTool(cache=cache)
+    context = ToolContext(mode="paper", symbol=SYMBOL, timeframe="1m")
+    candles = make_random_candles(300)
+
+    first = tool.execute(context, candles=candles)[SYMBOL]["1m"]
+    second = tool.execute(context, candles=candles.copy())[SYMBOL]["1m"]
+    assert second is first
+    assert first.equals(FeatureEngineer().build(candles))
+
+    shadow = cache.get_or_build(SYMBOL, "1m", candles, lambda: first.copy(), consumer="shadow")
+    assert shadow is first
+
+    tool.execute(context, candles=candles.iloc[:-1])
+    labels = {"consumer": "market_regime"}
+    assert registry.get_sample_value("feature_cache_hits_total", labels) == 1
+    assert registry.get_sample_value("feature_cache_misses_total", labels) == 2
+    assert registry.get_sample_value("feature_cache_hits_total", {"consumer": "shadow"}) == 1
+    assert registry.get_sample_value("feature_cache_bytes") == cache.bytes > 0
+
+
+def test_truncation_check_accepts_streaming_and_catches_leak() -> None:
+    candles = make_random_candles(1500)
+    engineer = FeatureEngineer(streaming=True)
+    for end in range(1000, 1500, 50):
+        buffer = candles.iloc[end - 1000 : end]  # кольцевой буфер: поток помнит больше
+        features = engineer.update(SYMBOL, "1m", buffer)
+        for position in (warmup_bars() - 1, 700, 999):
+            assert check_truncation_point(buffer, features, position)
+
+    features = FeatureEngineer().build(candles)
+    leaked = features.copy()
+    leaked["ema_fast"] = candles["close"].ewm(span=12, adjust=False).mean()
+    assert not check_truncation_point(candles, leaked, 1200)
+
+
+def test_verifier_stays_within_budget_and_reports_violations() -> None:
+    registry = CollectorRegistry()
+    telemetry = TelemetryExporter(registry=registry)
+    verifier = LookaheadVerifier(0.5, seed=3, on_metrics=telemetry.record_lookahead_check)
+    candles = make_random_candles(800)
+    features = FeatureEngineer().build(candles)
+
+    assert verifier.observe(SYMBOL, "1m", candles, features, elapsed=0.0) is True
+    # долг первой проверки гасится только начислениями от расчёта признаков
+    assert verifier.observe(SYMBOL, "1m", candles, features, elapsed=0.0) is None
+    for _ in range(50):
+        verifier.observe(SYMBOL, "1m", candles, features, elapsed=0.001)
+    assert verifier.checks < 20
+
+    leaked = features.copy()
+    leaked["atr"] = leaked["atr"].shift(-1)
+    while verifier.observe(SYMBOL, "5m", candles, leaked, elapsed=1.0) is not False:
+        pass
+    assert verifier.violations == 1
+    assert registry.get_sample_value("lookahead_violations_total", {"timeframe": "5m"}) == 1
+    assert registry.get_sample_value("lookahead_checks_total", {"timeframe": "1m"}) >= 1
+
+    cache = FeatureCache(verifier=LookaheadVerifier(1.0))
+    cache.get_or_build(SYMBOL, "1m", candles, lambda: features)
+    assert cache.verifier.checks == 1
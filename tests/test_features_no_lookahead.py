@@ -1,6 +1,9 @@
+from dataclasses import astuple
+
+import numpy as np
 import pandas as pd
 
-from prod_core.data.features import FeatureEngineer
+from prod_core.data.features import FeatureConfig, FeatureEngineer
 
 
 def make_candles(rows: int = 50) -> pd.DataFrame:
@@ -34,4 +37,119 @@ def test_build_map_returns_dict() -> None:
     features = features_map["BTC/USDT:USDT"]["15m"]
     assert not features.empty
     assert FeatureEngineer.ensure_map_no_lookahead(candles_map, features_map)
-
+
+
+def make_random_candles(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    close[rows // 3 : rows // 3 + 40] = close[rows // 3 - 1]  # участок без движения
+    index = pd.date_range("2024-01-01", periods=rows, freq="1min", tz="UTC", name="ts")
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.01, rows)),
+            "low": close * (1 - rng.uniform(0, 0.01, rows)),
+            "close": close,
+            "volume": rng.uniform(1, 10, rows),
+            "funding_rate": rng.normal(0, 1e-4, rows),
+        },
+        index=index,
+    )
+
+
+def test_streaming_matches_build_bit_for_bit() -> None:
+    candles = make_random_candles(400)
+    reference = FeatureEngineer()
+    configs = (
+        FeatureConfig(),
+        FeatureConfig(ema_fast=1, ema_slow=2, atr_period=1, returns_lag=3, volatility_window=2),
+    )
+    for config in configs:
+        engineer = FeatureEngineer(streaming=True)
+        # сначала по одному бару, затем пачками по несколько новых баров
+        for end in [*range(1, 60), *range(60, len(candles) + 1, 7)]:
+            frame = candles.iloc[:end].copy()
+            # последний бар ещё формируется: его правка не должна менять признаки
+            frame.iloc[-1, frame.columns.get_loc("close")] *= 1.01
+            streamed = engineer.update("BTC/USDT:USDT", "1m", frame, config=config)
+            expected = reference.build(frame, config=config)
+            assert list(streamed.columns) == list(expected.columns)
+            assert streamed.equals(expected), end
+        stream = engineer._streams[("BTC/USDT:USDT", "1m")]
+        assert stream.rebuilds == 0
+        assert stream.bars_consumed == end - 1
+
+
+def test_panel_matches_build_per_symbol() -> None:
+    frames = {f"S{idx}": make_random_candles(300, seed=idx) for idx in range(6)}
+    frames["S1"] = frames["S1"].drop(columns="funding_rate")  # своя группа
+    frames["S2"] = frames["S2"].iloc[5:]  # другой индекс — поштучно
+    gapped = frames["S3"].copy()
+    gapped.iloc[100, gapped.columns.get_loc("close")] = np.nan  # пропуск — поштучно
+    frames["S3"] = gapped
+    engineer = FeatureEngineer()
+    configs = (
+        FeatureConfig(),
+        FeatureConfig(ema_fast=1, ema_slow=2, atr_period=1, returns_lag=3, volatility_window=2),
+    )
+    for config in configs:
+        panel = engineer.build_panel(frames, config=config)
+        assert list(panel) == list(frames)
+        for symbol, candles in frames.items():
+            expected = engineer.build(candles, config=config)
+            assert list(panel[symbol].columns) == list(expected.columns)
+            assert panel[symbol].equals(expected), symbol
+
+    features_map = engineer.build_map({symbol: {"5m": frame} for symbol, frame in frames.items()})
+    assert features_map["S4"]["5m"].equals(engineer.build(frames["S4"]))
+
+
+def test_sweep_blocks_match_build_per_config() -> None:
+    candles = make_random_candles(400)
+    engineer = FeatureEngineer()
+    configs = [
+        FeatureConfig(ema_fast=fast, atr_period=atr, volatility_window=window)
+        for fast in (5, 12)
+        for atr in (7, 14)
+        for window in (2, 30)
+    ]
+    configs.append(FeatureConfig(returns_lag=4))
+    sweep = engineer.sweep(candles, configs + configs[:1])
+    assert sweep.columns.names[-1] == "feature"
+    assert sweep.shape[1] == len(configs) * (len(FeatureEngineer.FEATURE_COLUMNS) + 1)
+    for config in configs:
+        block = sweep.loc[:, astuple(config)]
+        assert block.equals(engineer.build(candles, config=config))
+
+    gapped = candles.copy()
+    gapped.iloc[50, gapped.columns.get_loc("close")] = np.nan
+    fallback = engineer.sweep(gapped, configs[:2])
+    expected = engineer.build(gapped, config=configs[1])
+    assert fallback.loc[:, astuple(configs[1])].equals(expected.loc[fallback.index])
+
+
+def test_streaming_follows_ring_buffer_and_rebuilds_on_revision() -> None:
+    candles = make_random_candles(500).drop(columns="funding_rate")
+    reference = FeatureEngineer()
+    engineer = FeatureEngineer(streaming=True)
+    window = 200
+    earlier = {}
+    for end in range(window, len(candles) + 1):
+        streamed = engineer.update("ETH/USDT:USDT", "5m", candles.iloc[end - window : end])
+        if end % 50 == 0:
+            earlier[end] = (streamed, streamed.copy())
+    stream = engineer._streams[("ETH/USDT:USDT", "5m")]
+    # признаки отдаются без копии: переносы окна не меняют ранее выданные кадры
+    for frame, snapshot in earlier.values():
+        assert frame.equals(snapshot)
+    assert stream.rebuilds == 0
+    # состояние привязано к первому бару: равенство с build() по всей истории
+    assert streamed.equals(reference.build(candles).iloc[-window:])
+
+    # правка последнего закрытого бара — поток пересобирается
+    revised = candles.iloc[-window:].copy()
+    revised.iloc[-2, revised.columns.get_loc("high")] += 1.0
+    streamed = engineer.update("ETH/USDT:USDT", "5m", revised)
+    assert stream.rebuilds == 1
+    assert streamed.equals(reference.build(revised))
+
@@ -5,7 +5,12 @@ import pandas as pd
 import pytest
 
 from prod_core.data import FeedHealthStatus, MarketDataFeed, SymbolFeedSpec
-from prod_core.data.feed import CandleRecord, FeedIntegrityError, timeframe_to_timedelta
+from prod_core.data.feed import (
+    CandleBatch,
+    CandleRecord,
+    FeedIntegrityError,
+    timeframe_to_timedelta,
+)
 
 
 def build_candles(count: int, timeframe: str = "1m") -> List[List[float]]:
@@ -146,3 +151,172 @@ async def _test_gap_detection_without_fill_raises() -> None:
         await feed._append_record(buffer, expected_delta, record)  # type: ignore[attr-defined]
 
 
+def test_gap_fill_fetches_range_in_bulk_without_deadlock() -> None:
+    asyncio.run(_test_gap_fill_fetches_range_in_bulk_without_deadlock())
+
+
+async def _test_gap_fill_fetches_range_in_bulk_without_deadlock() -> None:
+    symbol = "BTC/USDT:USDT"
+    timeframe = "1m"
+    candles = build_candles(200, timeframe=timeframe)
+    book = {(symbol, timeframe): candles[:100]}
+    exchange = FakeExchange(book)
+    spec = SymbolFeedSpec(
+        name=symbol,
+        type="perp",
+        timeframes=(timeframe,),
+        primary_timeframe=timeframe,
+        backfill_bars=100,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+        poll_interval_seconds=2.0,
+    )
+    repairs: List[Tuple[str, str, int, float]] = []
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=[spec],
+        rest_client=exchange,
+        use_websocket=False,
+        on_gap_repaired=lambda *args: repairs.append(args),
+    )
+    await feed._backfill_initial()
+
+    book[(symbol, timeframe)] = candles
+    calls: List[int] = []
+    fetch = exchange.fetch_ohlcv
+
+    def counting_fetch(symbol, timeframe, since, limit, params=None):
+        calls.append(limit)
+        return fetch(symbol, timeframe, since, limit, params)
+
+    exchange.fetch_ohlcv = counting_fetch  # type: ignore[method-assign]
+    live = feed._normalize([candles[160]], symbol, timeframe, source="ws")  # type: ignore
+    ingest = feed._ingest_records(spec, timeframe, live, source="ws")  # type: ignore[attr-defined]
+    await asyncio.wait_for(ingest, timeout=5.0)
+
+    frame = feed.snapshot()[symbol][timeframe]
+    assert len(frame) == 161
+    assert (frame.index.to_series().diff().dropna() == timeframe_to_timedelta(timeframe)).all()
+    assert set(frame["source"].iloc[100:160]) == {"rest-gap"}
+    assert calls == [60]
+    assert len(repairs) == 1 and repairs[0][:3] == (symbol, timeframe, 60)
+
+
+def make_batch_feed(book: Dict[Tuple[str, str], List[List[float]]], **kwargs) -> MarketDataFeed:
+    spec = SymbolFeedSpec(
+        name="BTC/USDT:USDT",
+        type="perp",
+        timeframes=("1m",),
+        primary_timeframe="1m",
+        backfill_bars=100,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+    )
+    return MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=[spec],
+        rest_client=FakeExchange(book),
+        use_websocket=False,
+        **kwargs,
+    )
+
+
+def test_batch_ingest_dedups_reorders_and_fills_gaps() -> None:
+    asyncio.run(_test_batch_ingest_dedups_reorders_and_fills_gaps())
+
+
+async def _test_batch_ingest_dedups_reorders_and_fills_gaps() -> None:
+    symbol, timeframe = "BTC/USDT:USDT", "1m"
+    candles = build_candles(200, timeframe=timeframe)
+    feed = make_batch_feed({(symbol, timeframe): candles})
+    spec = feed.symbols[0]
+    health: List[FeedHealthStatus] = []
+    feed.on_health_change = lambda *args: health.append(args[2])
+
+    revised = [candles[49][0], 1.0, 2.0, 0.5, 1.5, 99.0]
+    payload = candles[:50] + [candles[30], revised] + candles[50:80] + candles[120:130]
+    batch = CandleBatch.from_payload(payload, symbol, timeframe, "rest")
+    assert batch.ohlcv.shape == (5, len(payload))
+    await feed._ingest_batch(spec, timeframe, batch)  # type: ignore[attr-defined]
+
+    frame = feed.snapshot()[symbol][timeframe]
+    assert len(frame) == 130
+    assert (frame.index.to_series().diff().dropna() == timeframe_to_timedelta(timeframe)).all()
+    assert frame["close"].iloc[49] == 1.5
+    assert set(frame["source"].iloc[80:120]) == {"rest-gap"}
+    assert set(frame["source"].iloc[120:]) == {"rest"}
+    # здоровье оценивается один раз на пакет
+    assert len(health) == 1
+
+    # старые бары внутри пакета обновляют буфер на месте
+    update = CandleBatch.from_payload([candles[10][:5] + [7.0], candles[129]], symbol, timeframe, "ws")
+    await feed._ingest_batch(spec, timeframe, update)  # type: ignore[attr-defined]
+    frame = feed.snapshot()[symbol][timeframe]
+    assert len(frame) == 130 and frame["volume"].iloc[10] == 7.0
+
+
+def test_batch_ingest_without_gap_fill_keeps_prefix_and_raises() -> None:
+    asyncio.run(_test_batch_ingest_without_gap_fill_keeps_prefix_and_raises())
+
+
+async def _test_batch_ingest_without_gap_fill_keeps_prefix_and_raises() -> None:
+    symbol, timeframe = "BTC/USDT:USDT", "1m"
+    candles = build_candles(50, timeframe=timeframe)
+    feed = make_batch_feed({(symbol, timeframe): candles}, allow_gap_fill=False)
+    batch = CandleBatch.from_payload(candles[:20] + candles[30:], symbol, timeframe, "rest")
+
+    with pytest.raises(FeedIntegrityError):
+        await feed._ingest_batch(feed.symbols[0], timeframe, batch)  # type: ignore[attr-defined]
+    assert len(feed.snapshot()[symbol][timeframe]) == 20
+
+
+def test_snapshot_views_filters_keys_and_tracks_versions() -> None:
+    asyncio.run(_test_snapshot_views_filters_keys_and_tracks_versions())
+
+
+async def _test_snapshot_views_filters_keys_and_tracks_versions() -> None:
+    symbol = "BTC/USDT:USDT"
+    candles = {
+        (symbol, "1m"): build_candles(60, timeframe="1m"),
+        (symbol, "5m"): build_candles(60, timeframe="5m"),
+    }
+    exchange = FakeExchange(candles)
+    spec = SymbolFeedSpec(
+        name=symbol,
+        type="perp",
+        timeframes=("1m", "5m"),
+        primary_timeframe="5m",
+        backfill_bars=50,
+        min_notional=50,
+        max_leverage=3,
+        quote_precision=2,
+        base_precision=3,
+        min_liquidity_usd=1_000_000,
+        max_spread_pct=0.1,
+        poll_interval_seconds=2.0,
+    )
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=[spec],
+        rest_client=exchange,
+        use_websocket=False,
+    )
+    await feed._backfill_initial()
+
+    views = feed.snapshot_views([(symbol, "5m")])
+    assert list(views) == [(symbol, "5m")]
+    view = views[(symbol, "5m")]
+    frame = feed.snapshot()[symbol]["5m"]
+    assert view.last_timestamp_ms() == int(frame.index[-1].timestamp() * 1000)
+    assert (view.close == frame["close"].to_numpy()).all()
+
+    assert feed.snapshot_views([(symbol, "5m")])[(symbol, "5m")].version == view.version
+    assert feed.snapshot_views([(symbol, "5m")], min_bars=10_000) == {}
@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
 
-from prod_core.indicators import TechnicalIndicators
+from prod_core.indicators import DonchianState, TechnicalIndicators
+from prod_core.strategies.breakout_4h import Breakout4HStrategy
 
 
 def test_ema_matches_pandas() -> None:
@@ -30,3 +31,122 @@ def test_donchian_channels_bounds() -> None:
     assert set(channels.columns) == {"upper", "lower", "middle"}
     assert (channels["upper"] >= channels["middle"]).all()
     assert (channels["lower"] <= channels["middle"]).all()
+
+
+def _legacy_true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    prev_close = close.shift(1)
+    components = pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()],
+        axis=1,
+    )
+    return components.max(axis=1)
+
+
+def _legacy_rsi(close: pd.Series, period: int) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.ewm(alpha=1 / period, min_periods=period).mean()
+    avg_loss = loss.ewm(alpha=1 / period, min_periods=period).mean()
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    return (100 - (100 / (1 + rs))).fillna(50.0)
+
+
+def _random_ohlc(rows: int, seed: int, with_gaps: bool) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    close[rows // 2 : rows // 2 + 15] = close[rows // 2 - 1]
+    frame = pd.DataFrame(
+        {
+            "high": close + rng.uniform(0, 2, rows),
+            "low": close - rng.uniform(0, 2, rows),
+            "close": close,
+        },
+        index=pd.date_range("2024-01-01", periods=rows, freq="5min", tz="UTC"),
+    )
+    if with_gaps:
+        for column in frame.columns:
+            frame.loc[frame.sample(frac=0.05, random_state=seed).index, column] = np.nan
+    return frame
+
+
+def test_kernels_match_previous_pandas_implementations() -> None:
+    indicators = TechnicalIndicators()
+    for seed, with_gaps in ((1, False), (2, True)):
+        frame = _random_ohlc(700, seed, with_gaps)
+        high, low, close = frame["high"], frame["low"], frame["close"]
+        pd.testing.assert_series_equal(
+            indicators.true_range(high, low, close),
+            _legacy_true_range(high, low, close),
+            check_exact=True,
+        )
+        for period in (1, 3, 14, 55):
+            pd.testing.assert_series_equal(
+                indicators.ema(close, period),
+                close.ewm(span=period, adjust=False).mean(),
+                check_exact=True,
+            )
+            pd.testing.assert_series_equal(
+                indicators.atr(high, low, close, period),
+                _legacy_true_range(high, low, close).rolling(period, min_periods=1).mean(),
+                check_exact=True,
+            )
+            channels = indicators.donchian_channels(high, low, period)
+            upper = high.rolling(period, min_periods=1).max()
+            lower = low.rolling(period, min_periods=1).min()
+            expected = pd.DataFrame({"upper": upper, "lower": lower, "middle": (upper + lower) / 2})
+            pd.testing.assert_frame_equal(channels, expected, check_exact=True)
+            pd.testing.assert_series_equal(
+                indicators.rsi(close, period), _legacy_rsi(close, period), check_exact=True
+            )
+            # пропуски не заполняются: прежний fill_method="pad" устарел в pandas
+            returns = close.pct_change(fill_method=None)
+            pd.testing.assert_series_equal(
+                indicators.volatility(close, period),
+                returns.rolling(period, min_periods=1).std(),
+                check_exact=True,
+            )
+
+
+def test_kernels_accept_short_and_integer_inputs() -> None:
+    indicators = TechnicalIndicators()
+    series = pd.Series([5, 3, 8], dtype=int)
+    assert indicators.true_range(series, series - 1, series).tolist() == [1.0, 3.0, 5.0]
+    assert indicators.donchian_channels(series[:1], series[:1], 20)["middle"].tolist() == [5.0]
+    assert indicators.rsi(series.iloc[:0]).empty
+
+
+def test_donchian_state_matches_full_history_on_live_buffer() -> None:
+    indicators = TechnicalIndicators()
+    frame = _random_ohlc(400, 3, with_gaps=True)
+    state = DonchianState(20)
+    for end in range(2, 400):
+        # кольцевой буфер на 120 баров: начало кадра сдвигается вместе с концом
+        candles = frame.iloc[max(0, end - 120) : end]
+        expected = indicators.donchian_channels(candles["high"], candles["low"], 20).iloc[-2]
+        upper, lower, middle = state.update(candles)
+        values = expected[["upper", "lower", "middle"]].to_numpy()
+        assert np.array_equal([upper, lower, middle], values, equal_nan=True), end
+    assert state.rebuilds == 1
+    assert state.bars_consumed == 398
+
+    # правка закрытого бара внутри окна — пересборка по последним period барам
+    revised = frame.iloc[280:400].copy()
+    revised.iloc[-5, revised.columns.get_loc("high")] += 100.0
+    expected = indicators.donchian_channels(revised["high"], revised["low"], 20).iloc[-2]
+    assert state.update(revised)[0] == expected["upper"]
+    assert state.rebuilds == 2
+    assert state.update(revised.iloc[:1]) is None
+
+
+def test_breakout_strategy_signals_unchanged_with_streaming_channels() -> None:
+    frame = _random_ohlc(300, 4, with_gaps=False)
+    frame["symbol"] = "BTC/USDT:USDT"
+    features = pd.DataFrame({"atr": 1.5}, index=frame.index)
+    streaming = Breakout4HStrategy()
+    # подкласс индикаторов отключает потоковое состояние: полный расчёт каналов
+    full = Breakout4HStrategy(indicators=type("Custom", (TechnicalIndicators,), {})())
+    for end in range(2, 300):
+        candles = frame.iloc[:end]
+        assert streaming._generate(candles, features) == full._generate(candles, features), end
+    assert streaming._channels["BTC/USDT:USDT"].rebuilds == 1
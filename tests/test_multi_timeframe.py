@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import pandas as pd
+
+from brain_orchestrator.tools.base import ToolContext
+from prod_core.data.feature_cache import FeatureCache
+from prod_core.data.features import FeatureEngineer
+from prod_core.data.multi_timeframe import MultiTimeframeJoiner, join_asof, joined_key
+from tests.test_features_no_lookahead import make_random_candles
+from tools.tools_market_regime_agent.feature_loader import FeatureLoaderTool
+
+
+def resample(candles: pd.DataFrame, rule: str) -> pd.DataFrame:
+    aggregated = candles.resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    return aggregated.dropna()
+
+
+def candles_at(minutes: pd.DataFrame, end: int) -> Dict[str, pd.DataFrame]:
+    buffer = minutes.iloc[:end]
+    return {"1m": buffer, "5m": resample(buffer, "5min"), "15m": resample(buffer, "15min")}
+
+
+def reference_join(features: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    joined = features["1m"]
+    for timeframe in ("5m", "15m"):
+        joined = pd.merge_asof(
+            joined,
+            features[timeframe].add_suffix(f"_{timeframe}"),
+            left_index=True,
+            right_index=True,
+        )
+    return joined.dropna()
+
+
+def test_incremental_join_matches_merge_asof_and_rebuilds_on_revision() -> None:
+    minutes = make_random_candles(700)
+    engineer = FeatureEngineer()
+    joiner = MultiTimeframeJoiner()
+    for end in range(300, 420):
+        features = {tf: engineer.build(frame) for tf, frame in candles_at(minutes, end).items()}
+        joined = joiner.update("BTC", "1m", features)
+        assert joined.equals(reference_join(features)), end
+    assert joiner.rebuilds == 1
+    assert joiner.rows_appended == 119
+
+    # тот же бар без изменений — тот же объект
+    assert joiner.update("BTC", "1m", features) is joined
+
+    # правка старшего бара, уже попавшего в объединённые строки
+    revised = dict(features)
+    frame = features["15m"].copy()
+    frame.iloc[5, frame.columns.get_loc("ema_fast")] += 1.0
+    revised["15m"] = frame
+    assert joiner.update("BTC", "1m", revised).equals(reference_join(revised))
+    assert joiner.rebuilds == 2
+
+
+def test_joined_view_has_no_lookahead() -> None:
+    minutes = make_random_candles(600)
+    candles = candles_at(minutes, 600)
+    engineer = FeatureEngineer()
+    features = {tf: engineer.build(frame) for tf, frame in candles.items()}
+    joined = MultiTimeframeJoiner().update("ETH", "1m", features)
+    assert MultiTimeframeJoiner.ensure_no_lookahead(candles, joined, "1m")
+
+    # строка 15m с меткой L известна только с момента L: сдвиг на бар раньше — утечка
+    early = features["15m"].copy()
+    early.index = early.index - pd.Timedelta(minutes=15)
+    leaky = join_asof(features["1m"], {"5m": features["5m"], "15m": early})
+    assert not MultiTimeframeJoiner.ensure_no_lookahead(candles, leaky, "1m")
+
+
+def test_feature_loader_publishes_joined_frame_for_higher_candles() -> None:
+    minutes = make_random_candles(600)
+    tool = FeatureLoaderTool(cache=FeatureCache())
+    context = ToolContext(mode="paper", symbol="BTC", timeframe="1m")
+
+    plain = tool.execute(context, candles=minutes.iloc[:500])
+    assert joined_key("1m") not in plain["BTC"]
+
+    for end in (500, 501):
+        candles = candles_at(minutes, end)
+        higher = {tf: candles[tf] for tf in ("5m", "15m")}
+        features = tool.execute(context, candles=candles["1m"], higher_candles=higher)["BTC"]
+        assert features[joined_key("1m")].equals(reference_join(features))
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from research_lab.backtests.param_search import (
+    ParamRange,
+    SearchSpace,
+    grid_points,
+    latin_hypercube_points,
+    load_results,
+    load_search_spaces,
+    run_search,
+    sample_candidates,
+)
+from tests.test_vectorbt_runner import _random_walk_candles
+
+
+def _space() -> SearchSpace:
+    return SearchSpace(
+        strategy="breakout_4h",
+        symbol="BTC/USDT:USDT",
+        timeframe="5m",
+        params={
+            "channel_period": ParamRange(low=5, high=30, steps=6, integer=True),
+            "min_breakout_factor": ParamRange(low=0.0, high=0.001, steps=2),
+        },
+    )
+
+
+def test_grid_and_latin_hypercube_cover_space() -> None:
+    space = _space()
+    points = list(grid_points(space))
+    assert len(points) == 12
+    assert {point["channel_period"] for point in points} == {5, 10, 15, 20, 25, 30}
+
+    samples = list(latin_hypercube_points(space, 10, seed=3))
+    factors = np.array([point["min_breakout_factor"] for point in samples])
+    # ровно одна точка в каждом из 10 слоёв диапазона
+    assert sorted(np.floor(factors / 0.001 * 10).astype(int)) == list(range(10))
+    periods = [point["channel_period"] for point in samples]
+    assert all(5 <= period <= 30 and period == round(period) for period in periods)
+
+    ids = [candidate.candidate_id for candidate in sample_candidates(space, "grid")]
+    assert len(ids) == len(set(ids)) == 12
+    assert ids == [candidate.candidate_id for candidate in sample_candidates(space, "grid")]
+
+
+def test_search_space_rejects_unknown_parameter(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="no_such_param"):
+        SearchSpace("range_reversion_5m", "BTC/USDT:USDT", "5m", {"no_such_param": ParamRange()})
+
+    spec = tmp_path / "spaces.json"
+    spec.write_text(
+        json.dumps(
+            {
+                "spaces": [
+                    {
+                        "strategy": "breakout_4h",
+                        "symbol": "BTC/USDT:USDT",
+                        "timeframe": "5m",
+                        "params": {"channel_period": {"low": 4, "high": 9, "steps": 3}},
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    (space,) = load_search_spaces(spec)
+    assert space.params["channel_period"].integer
+    assert space.params["channel_period"].grid() == [4.0, 6.0, 9.0]
+
+
+def test_run_search_streams_prunes_and_resumes(tmp_path: Path) -> None:
+    frame = _random_walk_candles(600, 11)
+    frame.insert(0, "timestamp", frame.index.view("int64") // 1_000_000)
+    frame.to_csv(tmp_path / "BTC_USDT_USDT_5m.csv", index=False)
+    space = SearchSpace(
+        strategy="range_reversion_5m",
+        symbol="BTC/USDT:USDT",
+        timeframe="5m",
+        params={"deviation_threshold": ParamRange(values=(0.001, 0.002, 0.004, 5.0))},
+    )
+    results_path = tmp_path / "search.jsonl"
+
+    ranked = run_search([space], results_path, csv_root=tmp_path, batch_size=3, top=2)
+    header, *rows = [
+        json.loads(line) for line in results_path.read_text(encoding="utf-8").splitlines()
+    ]
+    assert header["run"]["split_ratio"] == 0.7
+    assert len(rows) == 4
+    statuses = {row["params"]["deviation_threshold"]: row["status"] for row in rows}
+    # недостижимый порог: ни одного входа in-sample, кандидат отсечён без симуляции
+    assert statuses[5.0] == "pruned"
+    assert len(ranked) <= 2
+    assert all(result.trades > 0 for _, result in ranked)
+
+    again = run_search([space], results_path, csv_root=tmp_path, batch_size=3)
+    assert again == []
+    assert len(results_path.read_text(encoding="utf-8").splitlines()) == 5
+
+    # метрики с другим разбиением несравнимы: в тот же файл не дописываются
+    with pytest.raises(ValueError, match="different run settings"):
+        run_search([space], results_path, csv_root=tmp_path, split_ratio=0.5)
+    assert len(results_path.read_text(encoding="utf-8").splitlines()) == 5
+
+    table = load_results(results_path)
+    assert len(table) == 4
+    assert list(table["pf_oos"]) == sorted(table["pf_oos"], reverse=True)
+
+    # пул процессов общий для всех партий пространства; метрики как у serial-прогона
+    parallel_path = tmp_path / "parallel.jsonl"
+    run_search([space], parallel_path, csv_root=tmp_path, batch_size=2, workers=2)
+    assert load_results(parallel_path).equals(table)
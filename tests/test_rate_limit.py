@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.rate_limit import RateLimiter, RequestPriority, ohlcv_weight
+from tests.test_feed_integrity import FakeExchange, build_candles
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_refills_and_keeps_reserve_for_live() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(10.0, 20.0, clock=clock)
+
+    while limiter.try_acquire(5.0, RequestPriority.BACKFILL) == 0.0:
+        pass
+    # backfill не опускает ведро ниже 25% ёмкости
+    assert limiter.tokens >= 5.0
+    assert limiter.try_acquire(5.0, RequestPriority.BACKFILL) > 0
+    assert limiter.try_acquire(5.0, RequestPriority.LIVE) == 0.0
+
+    wait = limiter.try_acquire(1.0, RequestPriority.LIVE)
+    assert wait == 0.1
+    clock.now += wait
+    assert limiter.try_acquire(1.0, RequestPriority.LIVE) == 0.0
+
+    limiter.penalize(2.0)
+    clock.now += 1.0
+    assert limiter.try_acquire(1.0, RequestPriority.LIVE) > 0
+    assert limiter.requests[RequestPriority.BACKFILL] == 3
+
+
+def test_live_request_overtakes_backfill_queue() -> None:
+    asyncio.run(_test_live_request_overtakes_backfill_queue())
+
+
+async def _test_live_request_overtakes_backfill_queue() -> None:
+    limiter = RateLimiter(100.0, 4.0)
+    order: list[str] = []
+
+    async def request(name: str, priority: RequestPriority) -> None:
+        await limiter.acquire(1.0, priority=priority)
+        order.append(name)
+
+    backfill = [
+        asyncio.create_task(request(f"backfill-{idx}", RequestPriority.BACKFILL)) for idx in range(20)
+    ]
+    await asyncio.sleep(0.02)
+    await request("live", RequestPriority.LIVE)
+    await asyncio.gather(*backfill)
+    assert order.index("live") < 10
+
+
+class WindowedExchange(FakeExchange):
+    """Биржа, считающая превышения веса запросов за скользящую секунду (будущие 429)."""
+
+    def __init__(self, book, limit_per_second: float) -> None:
+        super().__init__(book)
+        self.limit_per_second = limit_per_second
+        self.history: list[tuple[float, float]] = []
+        self.violations = 0
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit, params=None):
+        now = time.monotonic()
+        self.history.append((now, ohlcv_weight(limit)))
+        used = sum(weight for ts, weight in self.history if now - ts < 1.0)
+        if used > self.limit_per_second:
+            self.violations += 1
+        return super().fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+def test_parallel_backfill_stays_within_exchange_limit() -> None:
+    asyncio.run(_test_parallel_backfill_stays_within_exchange_limit())
+
+
+async def _test_parallel_backfill_stays_within_exchange_limit() -> None:
+    symbols = [f"SYM{idx}/USDT:USDT" for idx in range(6)]
+    exchange = WindowedExchange({(symbol, "1m"): build_candles(2100) for symbol in symbols}, 40.0)
+    specs = [
+        SymbolFeedSpec(
+            name=symbol,
+            type="perp",
+            timeframes=("1m",),
+            primary_timeframe="1m",
+            backfill_bars=500,
+            min_notional=50,
+            max_leverage=3,
+            quote_precision=2,
+            base_precision=3,
+            min_liquidity_usd=1_000_000,
+            max_spread_pct=0.1,
+        )
+        for symbol in symbols
+    ]
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=specs,
+        rest_client=exchange,
+        use_websocket=False,
+        rate_limiter=RateLimiter(25.0, 15.0),
+    )
+    await feed._backfill_initial()
+
+    assert exchange.violations == 0
+    assert len(exchange.history) >= 12
+    assert all(len(frame) >= 500 for frame in (feed.snapshot()[s]["1m"] for s in symbols))
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import gc
+
+import numpy as np
+import pandas as pd
+
+from brain_orchestrator.regimes import MarketRegime, RegimeDetector
+
+
+def _random_features(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ema_slow = 100 + rng.normal(0, 1, rows)
+    frame = pd.DataFrame(
+        {
+            "ema_fast": ema_slow * (1 + rng.normal(0, 0.002, rows)),
+            "ema_slow": ema_slow,
+            "volatility": rng.uniform(0, 0.06, rows),
+            "return_lag": rng.normal(0, 0.02, rows),
+        },
+        index=pd.date_range("2024-01-01", periods=rows, freq="15min", tz="UTC"),
+    )
+    frame.iloc[::17, 0] = np.nan
+    return frame
+
+
+def test_detect_series_matches_bar_by_bar_detect() -> None:
+    detector = RegimeDetector()
+    for frame in (_random_features(500, 1), _random_features(200, 2).drop(columns="return_lag")):
+        series = detector.detect_series(frame)
+        expected = [detector._classify(frame.iloc[: i + 1]) for i in range(len(frame))]
+        assert series.tolist() == [int(regime) for regime in expected]
+        assert set(series.unique()) >= {1, 2, 3} and series.index.equals(frame.index)
+    assert detector.detect_series(pd.DataFrame()).empty
+
+
+def test_detect_caches_label_per_feature_frame() -> None:
+    detector = RegimeDetector()
+    frame = _random_features(50, 3)
+    regime = detector.detect(frame)
+    assert detector.detect(frame) is regime and detector.cache_hits == 1
+
+    # новый кадр с правкой последней строки — новая версия признаков
+    revised = frame.copy()
+    revised.iloc[-1] = [110.0, 100.0, 0.01, 0.0]
+    assert detector.detect(revised) is MarketRegime.TREND_UP
+    assert detector.cache_hits == 1
+
+    del frame, revised
+    gc.collect()
+    assert not detector._labels
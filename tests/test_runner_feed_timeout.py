@@ -4,6 +4,7 @@ import asyncio
 from pathlib import Path
 
 from prod_core import runner as runner_module
+from prod_core.data.events import BarCloseBus
 
 
 class DummyFeed:
@@ -28,6 +29,12 @@ class DummyFeed:
     def snapshot(self, *, min_bars: int | None = None):
         return {}
 
+    def snapshot_views(self, keys=None, *, min_bars: int | None = None):
+        return {}
+
+    def subscribe_bar_closes(self, keys=None, **kwargs):
+        return BarCloseBus().subscribe(keys)
+
     def status(self):
         return {}
 
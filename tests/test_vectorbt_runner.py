@@ -5,10 +5,23 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import vectorbt as vbt
 
+from brain_orchestrator.regimes import MarketRegime
+from prod_core.data.compact import compact_frame
+from prod_core.data.feature_cache import FeatureCache
+from prod_core.data.features import FeatureEngineer
+from research_lab.backtests import shared_frames
+from research_lab.backtests.shared_frames import SharedFrameStore, attach_frame
 from research_lab.backtests.vectorbt_runner import (
     BacktestResult,
     CandidateConfig,
+    _compute_max_drawdown,
+    _generate_signals,
+    _load_from_csv,
+    _profit_factor,
+    _run_candidate_batch,
+    build_strategy,
     load_candidates,
     run_backtests,
     save_results,
@@ -35,6 +48,95 @@ def _build_sample_csv(path: Path) -> None:
     frame.to_csv(path, index=False)
 
 
+def _random_walk_candles(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, rows)))
+    spread = rng.uniform(0.0, 0.004, rows) * close
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.uniform(1, 10, rows),
+            "funding_rate": rng.normal(0, 0.001, rows),
+        },
+        index=pd.date_range("2024-01-01", periods=rows, freq="5min", tz="UTC"),
+    )
+
+
+def _legacy_generate_signals(strategy, candles, features):
+    """Прежний прогон: стратегия на каждом баре получает весь префикс истории."""
+
+    index = features.index
+    candles = candles.loc[index]
+    series = [pd.Series(False, index=index) for _ in range(4)]
+    long_entries, long_exits, short_entries, short_exits = series
+    position = None
+    entry_idx = -1
+    min_hold = max(1, strategy.min_hold_bars)
+    for idx in range(len(index)):
+        slice_candles = candles.iloc[: idx + 1]
+        slice_features = features.iloc[: idx + 1]
+        if len(slice_candles) < 2 or slice_features.empty:
+            continue
+        signals = strategy._generate(slice_candles, slice_features)
+        if position is None:
+            chosen = next((s.side for s in signals if s.side in ("long", "short")), None)
+            if chosen is not None:
+                (long_entries if chosen == "long" else short_entries).iloc[idx] = True
+                position = chosen
+                entry_idx = idx
+            continue
+        if idx - entry_idx < min_hold:
+            continue
+        (long_exits if position == "long" else short_exits).iloc[idx] = True
+        position = None
+        entry_idx = -1
+    if position is not None:
+        (long_exits if position == "long" else short_exits).iloc[-1] = True
+    return long_entries, long_exits, short_entries, short_exits
+
+
+def _legacy_candidate_backtest(candidate, candles, split_ratio):
+    """Прежний бэктест кандидата: отдельный вызов from_signals на каждого."""
+
+    strategy = build_strategy(candidate)
+    features = FeatureEngineer().build(candles)
+    candles = candles.loc[features.index]
+    long_entries, long_exits, short_entries, short_exits = _generate_signals(
+        strategy, candles, features
+    )
+    zero = BacktestResult(candidate.candidate_id, candidate.strategy, 0.0, 0.0, 0.0, 0.0, 0)
+    if long_entries.sum() == 0 and short_entries.sum() == 0:
+        return zero
+    close = candles["close"]
+    portfolio = vbt.Portfolio.from_signals(
+        close,
+        entries=long_entries,
+        exits=long_exits,
+        short_entries=short_entries,
+        short_exits=short_exits,
+        freq=strategy.timeframe,
+    )
+    records = portfolio.trades.records
+    trades = int(portfolio.trades.count())
+    if trades == 0:
+        return zero
+    pnl = records["pnl"]
+    split_idx = max(1, min(len(close) - 1, int(len(close) * split_ratio)))
+    pf_is = _profit_factor(pnl[records["exit_idx"] < split_idx])
+    pf_oos = _profit_factor(pnl[records["exit_idx"] >= split_idx])
+    max_dd = _compute_max_drawdown(portfolio.value())
+    returns = portfolio.returns().dropna()
+    base_returns = close.pct_change().reindex(returns.index).fillna(0.0)
+    corr = float(returns.corr(base_returns)) if len(returns) > 1 else 0.0
+    corr = 0.0 if np.isnan(corr) else corr
+    return BacktestResult(
+        candidate.candidate_id, candidate.strategy, pf_is, pf_oos, max_dd, corr, trades
+    )
+
+
 def test_load_candidates_parses_symbol_and_timeframe(tmp_path: Path) -> None:
     config_path = tmp_path / "candidates.json"
     config_path.write_text(
@@ -100,7 +202,141 @@ def test_run_backtests_on_csv_dataset(tmp_path: Path) -> None:
     assert result.candidate_id == "cand-rr"
     assert result.trades >= 1
 
+    compact = run_backtests(
+        config_path,
+        start="2024-01-01",
+        end="2024-01-02",
+        csv_root=tmp_path,
+        split_ratio=0.6,
+        compact=True,
+    )
+    assert compact[0].trades == result.trades
+
     out_csv = tmp_path / "results.csv"
     save_results(results, out_csv)
     saved = pd.read_csv(out_csv)
     assert {"candidate_id", "pf_is", "pf_oos", "max_dd", "corr", "trades"} <= set(saved.columns)
+
+
+def test_regime_gating_filters_entries_in_bulk(tmp_path: Path) -> None:
+    csv_path = tmp_path / "BTC_USDT_USDT_5m.csv"
+    _build_sample_csv(csv_path)
+    candles = _load_from_csv(csv_path)
+    features = FeatureEngineer().build(candles)
+    candles = candles.loc[features.index]
+    strategy = build_strategy(CandidateConfig("range_reversion_5m", "cand-rr", {}))
+
+    ungated = _generate_signals(strategy, candles, features)
+    supported = pd.Series(int(strategy.supported_regimes[0]), index=features.index)
+    for expected, actual in zip(ungated, _generate_signals(strategy, candles, features, supported)):
+        assert actual.equals(expected)
+
+    # режим вне supported_regimes на всех барах — входов нет, как у generate_signals
+    blocked = pd.Series(int(MarketRegime.PANIC), index=features.index)
+    entries = _generate_signals(strategy, candles, features, blocked)
+    assert not entries[0].any() and not entries[2].any()
+    assert ungated[0].any() or ungated[2].any()
+
+
+def test_windowed_replay_matches_full_prefix_replay() -> None:
+    candles = _random_walk_candles(600, 7)
+    features = FeatureEngineer().build(candles)
+    candles = candles.loc[features.index]
+    candidates = [
+        CandidateConfig("breakout_4h", "bo", {"channel_period": 5}),
+        CandidateConfig("range_reversion_5m", "rr", {"deviation_threshold": 0.01}),
+        CandidateConfig("volatility_expansion_15m", "ve", {"vol_threshold": 0.004}),
+        CandidateConfig("funding_reversion", "fr", {"funding_threshold": 0.0015}),
+    ]
+    for candidate in candidates:
+        expected = _legacy_generate_signals(build_strategy(candidate), candles, features)
+        bar_by_bar = build_strategy(candidate)
+        bar_by_bar.generate_signal_series = lambda *_: None
+        for strategy in (build_strategy(candidate), bar_by_bar):
+            actual = _generate_signals(strategy, candles, features)
+            for expected_series, actual_series in zip(expected, actual):
+                assert actual_series.equals(expected_series), candidate.strategy
+        assert expected[0].sum() + expected[2].sum() >= 3, candidate.strategy
+
+
+def test_signal_series_match_bar_by_bar_generate() -> None:
+    candles = _random_walk_candles(400, 11)
+    features = FeatureEngineer().build(candles)
+    candles = candles.loc[features.index]
+    # пропуски в признаках: сравнения с NaN должны совпадать с построчной версией
+    features.iloc[::37] = np.nan
+    candidates = [
+        CandidateConfig("breakout_4h", "bo", {"channel_period": 4}),
+        CandidateConfig("range_reversion_5m", "rr", {"deviation_threshold": 0.005}),
+        CandidateConfig("volatility_expansion_15m", "ve", {"vol_threshold": 0.003}),
+        CandidateConfig("funding_reversion", "fr", {"funding_threshold": 0.001}),
+    ]
+    for candidate in candidates:
+        strategy = build_strategy(candidate)
+        long_series, short_series = strategy.generate_signal_series(candles, features)
+        for idx in range(1, len(features)):
+            signals = strategy._generate(candles.iloc[: idx + 1], features.iloc[: idx + 1])
+            side = next((s.side for s in signals if s.side in ("long", "short")), None)
+            assert long_series.iloc[idx] == (side == "long"), (candidate.strategy, idx)
+            assert short_series.iloc[idx] == (side == "short"), (candidate.strategy, idx)
+        assert long_series.any() and short_series.any(), candidate.strategy
+
+
+def test_parallel_backtests_match_serial_order_and_results(tmp_path: Path) -> None:
+    for symbol, seed in (("BTC_USDT_USDT", 1), ("ETH_USDT_USDT", 2)):
+        frame = _random_walk_candles(400, seed).drop(columns="funding_rate")
+        frame.insert(0, "timestamp", frame.index.asi8 // 1_000_000)
+        frame.to_csv(tmp_path / f"{symbol}_5m.csv", index=False)
+    candidates = [
+        {
+            "strategy": strategy,
+            "candidate_id": f"{strategy}-{symbol[:3]}-{threshold}",
+            "symbol": symbol,
+            "timeframe": "5m",
+            "deviation_threshold": threshold,
+            "vol_threshold": threshold,
+        }
+        for symbol in ("BTC/USDT:USDT", "ETH/USDT:USDT")
+        for strategy in ("range_reversion_5m", "volatility_expansion_15m")
+        for threshold in (0.002, 0.004)
+    ]
+    config_path = tmp_path / "candidates.json"
+    config_path.write_text(json.dumps({"candidates": candidates}), encoding="utf-8")
+
+    serial = run_backtests(config_path, csv_root=tmp_path)
+    parallel = run_backtests(config_path, csv_root=tmp_path, workers=2)
+    assert [r.candidate_id for r in parallel] == [c["candidate_id"] for c in candidates]
+    assert parallel == serial
+    assert sum(r.trades for r in serial) > 0
+
+
+def test_shared_frame_roundtrip_without_copy() -> None:
+    frame = compact_frame(_random_walk_candles(50, 3))
+    with SharedFrameStore() as store:
+        spec = store.share(frame)
+        shared = attach_frame(spec)
+        pd.testing.assert_frame_equal(shared, frame, check_freq=False)
+        assert attach_frame(spec) is shared
+        assert not shared["close"].to_numpy().flags.writeable
+        block, attached = shared_frames._ATTACHED.pop(spec.name)
+        del shared, attached
+        block.close()
+
+
+def test_batched_simulation_matches_per_candidate_runs() -> None:
+    candles = _random_walk_candles(500, 5)
+    candidates = [
+        CandidateConfig("range_reversion_5m", f"rr-{i}", {"deviation_threshold": 0.002 * i})
+        for i in range(1, 6)
+    ]
+    candidates += [
+        CandidateConfig("volatility_expansion_15m", "ve", {"vol_threshold": 0.004}),
+        CandidateConfig("breakout_4h", "bo", {"channel_period": 6}),
+        CandidateConfig("funding_reversion", "fr", {"funding_threshold": 0.0015}),
+        # без входов: нулевой результат вне партии
+        CandidateConfig("range_reversion_5m", "rr-none", {"deviation_threshold": 10.0}),
+    ]
+    expected = [_legacy_candidate_backtest(c, candles, 0.6) for c in candidates]
+    batched = _run_candidate_batch(candidates, candles, 0.6, feature_cache=FeatureCache())
+    assert batched == expected
+    assert expected[-1].trades == 0 and all(r.trades > 0 for r in expected[:-1])
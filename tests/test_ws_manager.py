@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Tuple
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from prod_core.data import MarketDataFeed, SymbolFeedSpec
+from prod_core.data.ws_manager import WebSocketManager, WsShard, plan_shards
+from tests.test_feed_integrity import FakeExchange, build_candles
+
+HISTORY_BARS = 100
+
+
+class LocalKlineServer:
+    """Локальный WS-стенд: шлёт 1m-свечи по подписке ``{"subscribe": [[symbol, tf], ...]}``."""
+
+    def __init__(self, history: Dict[str, List[List[float]]]) -> None:
+        self.next_ts = {symbol: rows[-1][0] + 60_000 for symbol, rows in history.items()}
+        self.connections: List[web.WebSocketResponse] = []
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/ws", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.url = f"http://127.0.0.1:{port}/ws"
+
+    async def stop(self) -> None:
+        for ws in self.connections:
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections.append(ws)
+        subscribe = await ws.receive_json()
+        pairs = [tuple(pair) for pair in subscribe["subscribe"]]
+        sender = asyncio.create_task(self._send_klines(ws, pairs))
+        async for _ in ws:  # отвечаем на close-фрейм клиента
+            pass
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        return ws
+
+    async def _send_klines(self, ws: web.WebSocketResponse, pairs: List[tuple]) -> None:
+        while not ws.closed:
+            for symbol, timeframe in pairs:
+                ts = self.next_ts[symbol]
+                self.next_ts[symbol] = ts + 60_000
+                candle = [ts, 1.0, 1.5, 0.5, 1.2, 3.0]
+                await ws.send_json({"symbol": symbol, "timeframe": timeframe, "candle": candle})
+            await asyncio.sleep(0.02)
+
+
+class LocalWsClient:
+    """Минимальный клиент с интерфейсом ccxt.pro ``watch_ohlcv_for_symbols``."""
+
+    has = {"watchOHLCVForSymbols": True}
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._session: aiohttp.ClientSession | None = None
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+
+    async def watch_ohlcv_for_symbols(self, pairs):
+        if self._ws is None:
+            self._session = aiohttp.ClientSession()
+            self._ws = await self._session.ws_connect(self.url)
+            await self._ws.send_json({"subscribe": pairs})
+        message = await self._ws.receive()
+        if message.type != aiohttp.WSMsgType.TEXT:
+            raise ConnectionError("соединение закрыто сервером")
+        data = message.json()
+        return {data["symbol"]: {data["timeframe"]: [data["candle"]]}}
+
+    async def close(self) -> None:
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+
+
+def test_plan_shards_bounds_connections_and_keeps_symbols_together() -> None:
+    keys = [(f"S{idx:02d}", tf) for idx in range(10) for tf in ("1m", "5m")]
+    shards = plan_shards(keys, max_connections=3, streams_per_connection=8)
+    assert len(shards) == 3
+    assert sorted(key for shard in shards for key in shard.keys) == sorted(keys)
+    assert [len(shard.keys) for shard in shards] == [8, 6, 6]
+    owners = {symbol: shard.index for shard in shards for symbol, _ in shard.keys}
+    assert all(owners[symbol] == shard.index for shard in shards for symbol, _ in shard.keys)
+    # символ с большим числом таймфреймов не дробится, пустые шарды не создаются
+    wide = [("A", tf) for tf in ("1m", "5m", "15m", "1h")] + [("B", "1m")]
+    assert [len(shard.keys) for shard in plan_shards(wide, 3, 2)] == [4, 1]
+    assert len(plan_shards(keys[:4], max_connections=3, streams_per_connection=8)) == 1
+
+
+class FlakyWsClient:
+    """WS-заглушка: ``deliver`` свечей, затем обрыв соединения."""
+
+    has = {"watchOHLCVForSymbols": True}
+
+    def __init__(self, deliver: int) -> None:
+        self.deliver = deliver
+
+    async def watch_ohlcv_for_symbols(self, pairs):
+        await asyncio.sleep(0)
+        if self.deliver <= 0:
+            raise ConnectionError("обрыв")
+        self.deliver -= 1
+        return {pairs[0][0]: {pairs[0][1]: [[0, 1.0, 1.0, 1.0, 1.0, 1.0]]}}
+
+
+def test_shard_backoff_resets_after_recovery() -> None:
+    asyncio.run(_test_shard_backoff_resets_after_recovery())
+
+
+async def _test_shard_backoff_resets_after_recovery() -> None:
+    # два обрыва без данных, затем шард оживает и снова падает
+    clients = iter([FlakyWsClient(0), FlakyWsClient(0), FlakyWsClient(3), FlakyWsClient(0)])
+    received: List[Tuple[str, str]] = []
+    delays: List[float] = []
+
+    async def on_candles(symbol: str, timeframe: str, candles: list) -> None:
+        received.append((symbol, timeframe))
+
+    manager = WebSocketManager(lambda: next(clients), [("BTC/USDT:USDT", "1m")], on_candles)
+
+    async def record_delay(shard: WsShard, delay: float) -> None:
+        delays.append(delay)
+        if len(delays) == 4:
+            manager.stop()
+
+    manager._bridge_with_rest = record_delay  # type: ignore[method-assign]
+    await asyncio.wait_for(manager.run(), timeout=5.0)
+
+    assert delays == [1.0, 2.0, 1.0, 2.0]
+    assert len(received) == 3
+    assert manager.shards[0].failures == 4
+
+
+def test_handler_bug_is_not_swallowed_as_reconnect() -> None:
+    asyncio.run(_test_handler_bug_is_not_swallowed_as_reconnect())
+
+
+async def _test_handler_bug_is_not_swallowed_as_reconnect() -> None:
+    async def on_candles(symbol: str, timeframe: str, candles: list) -> None:
+        raise KeyError(symbol)
+
+    manager = WebSocketManager(lambda: FlakyWsClient(1), [("BTC/USDT:USDT", "1m")], on_candles)
+    with pytest.raises(KeyError):
+        await asyncio.wait_for(manager.run(), timeout=5.0)
+    assert manager.shards[0].failures == 0
+
+
+def test_feed_multiplexes_symbols_and_reconnects_single_shard() -> None:
+    asyncio.run(_test_feed_multiplexes_symbols_and_reconnects_single_shard())
+
+
+async def _test_feed_multiplexes_symbols_and_reconnects_single_shard() -> None:
+    symbols = [f"SYM{idx:02d}/USDT:USDT" for idx in range(24)]
+    history = {symbol: build_candles(HISTORY_BARS) for symbol in symbols}
+    server = LocalKlineServer(history)
+    await server.start()
+    specs = [
+        SymbolFeedSpec(
+            name=symbol,
+            type="perp",
+            timeframes=("1m",),
+            primary_timeframe="1m",
+            backfill_bars=50,
+            min_notional=50,
+            max_leverage=3,
+            quote_precision=2,
+            base_precision=3,
+            min_liquidity_usd=1_000_000,
+            max_spread_pct=0.1,
+        )
+        for symbol in symbols
+    ]
+    feed = MarketDataFeed(
+        exchange_id="binanceusdm",
+        symbols=specs,
+        rest_client=FakeExchange({(symbol, "1m"): rows for symbol, rows in history.items()}),
+        ws_client_factory=lambda: LocalWsClient(server.url),
+        ws_max_connections=3,
+        ws_streams_per_connection=8,
+    )
+
+    async def wait_for_bars(extra: int) -> None:
+        while any(len(feed.snapshot()[symbol]["1m"]) < HISTORY_BARS + extra for symbol in symbols):
+            await asyncio.sleep(0.02)
+
+    try:
+        await feed.start()
+        await asyncio.wait_for(wait_for_bars(3), timeout=10.0)
+        assert len(server.connections) == 3
+
+        await server.connections[0].close()
+        await asyncio.wait_for(wait_for_bars(8), timeout=10.0)
+
+        manager = feed._ws_manager  # type: ignore[attr-defined]
+        assert manager is not None
+        assert [shard.failures for shard in manager.shards] == [1, 0, 0]
+        assert len(server.connections) == 4
+        assert not server.connections[1].closed and not server.connections[2].closed
+        assert feed._use_websocket  # type: ignore[attr-defined]
+        for symbol in symbols:
+            frame = feed.snapshot()[symbol]["1m"]
+            assert frame.index.is_monotonic_increasing
+            assert "ws" in set(frame["source"])
+    finally:
+        await feed.stop()
+        await server.stop()
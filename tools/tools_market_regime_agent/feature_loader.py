@@ -2,8 +2,15 @@
 
 from __future__ import annotations
 
+from functools import partial
+from typing import Dict
+
+import pandas as pd
+
 from brain_orchestrator.tools.base import BaseTool, ToolContext, ToolSpec
 from prod_core.data import FeatureEngineer
+from prod_core.data.feature_cache import FeatureCache, get_feature_cache
+from prod_core.data.multi_timeframe import MultiTimeframeJoiner, joined_key
 
 
 class FeatureLoaderTool:
@@ -17,15 +24,20 @@ class FeatureLoaderTool:
         cost_hint_ms=20,
     )
 
-    def __init__(self) -> None:
-        self._engineer = FeatureEngineer()
+    def __init__(self, cache: FeatureCache | None = None) -> None:
+        # Инструмент живёт весь прогон: признаки продвигаются только на новые бары.
+        self._engineer = FeatureEngineer(streaming=True)
+        self._cache = cache if cache is not None else get_feature_cache()
+        self._joiner = MultiTimeframeJoiner()
 
     def execute(self, context: ToolContext, **kwargs):
         candles = kwargs["candles"]
         timeframe = context.timeframe or kwargs.get("timeframe") or "primary"
+        # свечи старших таймфреймов того же символа: {timeframe: DataFrame}
+        higher_candles: Dict[str, pd.DataFrame] = kwargs.get("higher_candles") or {}
 
         if isinstance(candles, dict):
-            return self._engineer.build_map(candles)
+            return self._build_map(candles)
 
         symbol = context.symbol
         if not symbol:
@@ -34,9 +46,39 @@ class FeatureLoaderTool:
         candles_map = {
             symbol: {
                 timeframe: candles,
+                **higher_candles,
             }
         }
-        return self._engineer.build_map(candles_map)
+        result = self._build_map(candles_map)
+        if higher_candles and context.timeframe:
+            # признаки старших таймфреймов as-of на индексе базового, без look-ahead
+            per_timeframe = result[symbol]
+            per_timeframe[joined_key(timeframe)] = self._joiner.update(
+                symbol, timeframe, dict(per_timeframe)
+            )
+        return result
+
+    def _build_map(
+        self,
+        candles_map: Dict[str, Dict[str, pd.DataFrame]],
+    ) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """Аналог ``FeatureEngineer.build_map`` с чтением через общий кэш признаков."""
+
+        result: Dict[str, Dict[str, pd.DataFrame]] = {}
+        for symbol, per_timeframe in candles_map.items():
+            result[symbol] = {}
+            for timeframe, frame in per_timeframe.items():
+                if frame.empty:
+                    result[symbol][timeframe] = frame.copy()
+                    continue
+                result[symbol][timeframe] = self._cache.get_or_build(
+                    symbol,
+                    timeframe,
+                    frame,
+                    partial(self._engineer.update, symbol, timeframe, frame),
+                    consumer="market_regime",
+                )
+        return result
 
 
 def register_tools(registry) -> None: